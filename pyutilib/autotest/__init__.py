@@ -14,7 +14,7 @@ import pyutilib.component.core
 pyutilib.component.core.PluginGlobals.add_env('pyutilib.autotest')
 
 from pyutilib.autotest.plugins import ITestDriver, TestDriverFactory, ITestParser, TestDriverBase
-from pyutilib.autotest.driver import run, main, create_test_suites
+from pyutilib.autotest.driver import run, main, create_test_suites, clear_config_cache
 import pyutilib.autotest.yaml_plugin
 import pyutilib.autotest.json_plugin
 import pyutilib.autotest.default_testdriver
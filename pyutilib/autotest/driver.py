@@ -8,13 +8,17 @@
 #  _________________________________________________________________________
 #
 
-__all__ = ['run', 'main', 'create_test_suites']
+__all__ = ['run', 'main', 'create_test_suites', 'clear_config_cache']
 
 import sys
 import optparse
 import re
 import os
+import time
+import hashlib
+import multiprocessing
 from os.path import dirname, abspath
+from unittest import TestLoader, TextTestResult
 
 import pyutilib.th as unittest
 from pyutilib.misc import Options
@@ -120,15 +124,21 @@ def create_test_suites(filename=None, config=None, _globals=None, options=None):
             raise IOError(
                 "Unknown file type.  Cannot load test configuration from file '%s'"
                 % filename)
-        config = service.load_test_config(filename)
-    #service.print_test_config(config)
-    validate_test_config(config)
+        with open(filename, 'rb') as INPUT:
+            key = (ftype, hashlib.sha1(INPUT.read()).hexdigest())
+        test_config = _config_cache.get(key, None)
+        if test_config is None:
+            test_config = _TestConfig(service.load_test_config(filename))
+            _config_cache[key] = test_config
+    else:
+        test_config = _TestConfig(config)
+    config = test_config.config
     #
     # Evaluate Python expressions
     #
     for item in config.get('python', []):
         try:
-            exec(item, _globals)
+            exec(test_config.compile(item), _globals)
         except Exception:
             err = sys.exc_info()[1]
             print("ERROR executing '%s'" % item)
@@ -144,11 +154,119 @@ def create_test_suites(filename=None, config=None, _globals=None, options=None):
     # Generate suite
     #
     for suite in config.get('suites', {}):
-        create_test_suite(suite, config, _globals, options)
+        create_test_suite(suite, config, _globals, options, test_config)
+
+
+#
+# The test configurations that have been loaded from files, keyed by
+# the file type and the SHA-1 digest of the file contents.
+#
+_config_cache = {}
+
+
+def clear_config_cache():
+    """Discard the cached test configurations."""
+    _config_cache.clear()
+
+
+class _TestConfig(object):
+    """
+    A validated test configuration, with the compiled Python
+    expressions and the expanded tests of its suites.
+    """
+
+    def __init__(self, config):
+        validate_test_config(config)
+        self.config = config
+        self._code = {}
+        self._tests = {}
+
+    def compile(self, item):
+        """Returns the compiled code of a Python expression."""
+        code = self._code.get(item, None)
+        if code is None:
+            code = self._code[item] = compile(item, '<autotest>', 'exec')
+        return code
+
+    def tests(self, suite, testname_format):
+        """
+        Returns a list of the tests in a suite.  Each test is a list
+        [test_name, solver, problem, item, options], where options is
+        the dictionary of merged options or None if it has not been
+        computed by :func:`test_options`.
+        """
+        key = (suite, testname_format)
+        tests = self._tests.get(key, None)
+        if tests is not None:
+            return tests
+        suite_config = self.config['suites'][suite]
+        tests = []
+        if 'tests' in suite_config:
+            for item in suite_config['tests']:
+                tests.append([item['solver'], item['problem'], item])
+        else:
+            for solver in suite_config['solvers']:
+                for problem in suite_config['problems']:
+                    tests.append([solver, problem, {}])
+        for test in tests:
+            if testname_format is None:
+                test_name = test[0] + "_" + test[1]
+            else:
+                test_name = testname_format % (test[0], test[1])
+            test.insert(0, test_name)
+            test.append(None)
+        self._tests[key] = tests
+        return tests
+
+    def test_options(self, suite, test):
+        """
+        Returns the options of a test, which merge the problem, solver
+        and test options.
+        """
+        if test[4] is not None:
+            return test[4]
+        test_name, solver, problem, item, _ = test
+        config = self.config
+        _options = {}
+        #
+        problem_options = config['suites'][suite]['problems'][problem]
+        if not problem_options is None and 'problem' in problem_options:
+            _problem = problem_options['problem']
+        else:
+            _problem = problem
+        for attr, value in config['problems'].get(_problem, {}).items():
+            _options[attr] = _str(value)
+        if not problem_options is None:
+            for attr, value in problem_options.items():
+                _options[attr] = _str(value)
+        #
+        solver_options = config['suites'][suite]['solvers'][solver]
+        if not solver_options is None and 'solver' in solver_options:
+            _solver = solver_options['solver']
+        else:
+            _solver = solver
+        _name = _solver
+        for attr, value in config['solvers'].get(_solver, {}).items():
+            _options[attr] = _str(value)
+            if attr == 'name':
+                _name = value
+        if not solver_options is None:
+            for attr, value in solver_options.items():
+                _options[attr] = _str(value)
+        #
+        for key in item:
+            if key not in ['problem', 'solver']:
+                _options[key] = _str(item[key])
+        #
+        _options['solver'] = _str(_name)
+        _options['problem'] = _str(_problem)
+        _options['suite'] = _str(suite)
+        test[4] = _options
+        return _options
 
 
 @unittest.nottest
-def create_test_suite(suite, config, _globals, options):
+def create_test_suite(suite, config, _globals, options, test_config=None):
     #
     # Skip suite creation if the options categores do not intersect with the list of test suite categories
     #
@@ -160,6 +278,8 @@ def create_test_suite(suite, config, _globals, options):
                 break
         if not flag:
             return
+    if test_config is None:
+        test_config = _TestConfig(config)
     #
     # Create test driver
     #
@@ -172,7 +292,11 @@ def create_test_suite(suite, config, _globals, options):
         options = cls._options[None]
         cls._test_driver.setUpClass(cls, options)
 
-    _globals[suite] = type(
+    if options.lazy:
+        metaclass = _LazyTestSuite
+    else:
+        metaclass = type
+    _globals[suite] = metaclass(
         str(suite),
         (unittest.TestCase,), {'setUpClass': classmethod(setUpClassFn)})
     _globals[suite]._options[None] = options
@@ -182,24 +306,16 @@ def create_test_suite(suite, config, _globals, options):
     #
     # Create test functions
     #
-    tests = []
-    if 'tests' in config['suites'][suite]:
-        for item in config['suites'][suite]['tests']:
-            tests.append((item['solver'], item['problem'], item))
-    else:
-        for solver in config['suites'][suite]['solvers']:
-            for problem in config['suites'][suite]['problems']:
-                tests.append((solver, problem, {}))
-    #
-    for solver, problem, item in tests:
-        ##sname = solver
-        if options.testname_format is None:
-            test_name = solver + "_" + problem
-        else:
-            test_name = options.testname_format % (solver, problem)
+    currdir = _str(options.currdir)
+
+    def add_test(test):
         #
         def fn(testcase, name, suite):
             options = testcase._options[suite, name]
+            if options is None:
+                options = Options(**test_config.test_options(suite, test))
+                options.currdir = currdir
+                testcase._options[suite, name] = options
             fn.test_driver.setUp(testcase, options)
             ans = fn.test_driver.run_test(testcase, name, options)
             fn.test_driver.tearDown(testcase, options)
@@ -207,44 +323,252 @@ def create_test_suite(suite, config, _globals, options):
 
         fn.test_driver = _globals['test_driver']
         #
-        _options = Options()
-        #
-        problem_options = config['suites'][suite]['problems'][problem]
-        if not problem_options is None and 'problem' in problem_options:
-            _problem = problem_options['problem']
-        else:
-            _problem = problem
-        for attr, value in config['problems'].get(_problem, {}).items():
-            _options[attr] = _str(value)
-        if not problem_options is None:
-            for attr, value in problem_options.items():
-                _options[attr] = _str(value)
+        # With the 'lazy' option, the options are merged when the test
+        # is executed
         #
-        solver_options = config['suites'][suite]['solvers'][solver]
-        if not solver_options is None and 'solver' in solver_options:
-            _solver = solver_options['solver']
+        if options.lazy:
+            _options = None
         else:
-            _solver = solver
-        _name = _solver
-        for attr, value in config['solvers'].get(_solver, {}).items():
-            _options[attr] = _str(value)
-            if attr == 'name':
-                _name = value
-        if not solver_options is None:
-            for attr, value in solver_options.items():
-                _options[attr] = _str(value)
-        #
-        for key in item:
-            if key not in ['problem', 'solver']:
-                _options[key] = _str(item[key])
-        #
-        _options.solver = _str(_name)
-        _options.problem = _str(_problem)
-        _options.suite = _str(suite)
-        _options.currdir = _str(options.currdir)
+            _options = Options(**test_config.test_options(suite, test))
+            _options.currdir = currdir
         #
         _globals[suite].add_fn_test(
-            name=test_name, fn=fn, suite=suite, options=_options)
+            name=test[0], fn=fn, suite=suite, options=_options)
+
+    if options.lazy:
+        _globals[suite]._add_test = staticmethod(add_test)
+        _globals[suite]._lazy_tests = dict(
+            (_test_method_name(test[0]), test)
+            for test in test_config.tests(suite, options.testname_format))
+    else:
+        for test in test_config.tests(suite, options.testname_format):
+            add_test(test)
+
+
+def _test_method_name(name):
+    """The name of the method that add_fn_test creates for a test."""
+    return "test_" + name.replace("/", "_").replace("\\", "_").replace(
+        ".", "_")
+
+
+class _LazyTestSuite(type):
+    """
+    The metaclass of the test suites that are created with the 'lazy'
+    option.  A test method is created when it is first accessed, so a
+    suite with many tests can be created quickly when only some of the
+    tests are executed.
+    """
+
+    def __dir__(cls):
+        names = set()
+        for base in cls.__mro__:
+            names.update(base.__dict__)
+        names.update(cls.__dict__.get('_lazy_tests', ()))
+        return sorted(names)
+
+    def __getattr__(cls, name):
+        tests = cls.__dict__.get('_lazy_tests', {})
+        if not name in tests:
+            raise AttributeError("type object '%s' has no attribute '%s'" %
+                                 (cls.__name__, name))
+        cls._add_test(tests.pop(name))
+        return type.__getattribute__(cls, name)
+
+
+#
+# Parallel test execution
+#
+# The test suites are created dynamically, so they cannot be pickled
+# and sent to the worker processes.  Instead, the workers are forked
+# after the tests are collected, and they receive the indices of the
+# tests in _parallel_tests.  Each worker returns the outcome of its
+# tests as (index, outcome, text) tuples, which are replayed into a
+# TextTestResult in the parent process.
+#
+_parallel_tests = []
+_parallel_buffer = False
+# The test classes that have been setup in a worker, and the
+# setUpClass errors (or None)
+_worker_classes = {}
+
+
+class _RemoteError(object):
+    """The formatted traceback of an error in a worker process."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class _ParallelTestResult(TextTestResult):
+    """A TextTestResult that reports errors from worker processes."""
+
+    def _exc_info_to_string(self, err, test):
+        if isinstance(err, _RemoteError):
+            return err.text
+        return TextTestResult._exc_info_to_string(self, err, test)
+
+
+def _fork_context():
+    """
+    Returns the multiprocessing context that forks worker processes,
+    or None if fork is not supported on this platform.
+    """
+    if sys.platform.startswith('win'):
+        return None
+    try:
+        return multiprocessing.get_context('fork')
+    except AttributeError:  #pragma:nocover
+        # Python 2 always forks on POSIX platforms
+        return multiprocessing
+    except ValueError:  #pragma:nocover
+        return None
+
+
+def _tear_down_classes():
+    for cls, err in _worker_classes.items():
+        if err is None:
+            try:
+                cls.tearDownClass()
+            except Exception:
+                pass
+    _worker_classes.clear()
+
+
+def _setup_class(cls):
+    """
+    Call setUpClass once for each test class in a worker.  Returns
+    None, or an (outcome, text) tuple if setUpClass failed.
+    """
+    if cls in _worker_classes:
+        return _worker_classes[cls]
+    if not _worker_classes:
+        multiprocessing.util.Finalize(
+            None, _tear_down_classes, exitpriority=10)
+    try:
+        cls.setUpClass()
+        err = None
+    except unittest.SkipTest:
+        err = ('skip', str(sys.exc_info()[1]))
+    except Exception:
+        result = unittest.TestResult()
+        text = result._exc_info_to_string(sys.exc_info(), None)
+        err = ('error', "Error in %s.setUpClass:\n%s" % (cls.__name__, text))
+    _worker_classes[cls] = err
+    return err
+
+
+def _run_parallel_chunk(indices):
+    """Run a list of tests in a worker process."""
+    records = []
+    for i in indices:
+        test = _parallel_tests[i]
+        err = _setup_class(test.__class__)
+        if err is not None:
+            records.append((i, err[0], err[1]))
+            continue
+        result = unittest.TestResult()
+        result.buffer = _parallel_buffer
+        test(result)
+        if result.errors:
+            records.append((i, 'error', result.errors[0][1]))
+        elif result.failures:
+            records.append((i, 'failure', result.failures[0][1]))
+        elif result.skipped:
+            records.append((i, 'skip', result.skipped[0][1]))
+        elif result.expectedFailures:
+            records.append((i, 'expected_failure',
+                            result.expectedFailures[0][1]))
+        elif result.unexpectedSuccesses:
+            records.append((i, 'unexpected_success', None))
+        else:
+            records.append((i, 'success', None))
+    return records
+
+
+def _replay_records(result, records):
+    for i, outcome, text in records:
+        test = _parallel_tests[i]
+        result.startTest(test)
+        if outcome == 'success':
+            result.addSuccess(test)
+        elif outcome == 'failure':
+            result.addFailure(test, _RemoteError(text))
+        elif outcome == 'error':
+            result.addError(test, _RemoteError(text))
+        elif outcome == 'skip':
+            result.addSkip(test, text)
+        elif outcome == 'expected_failure':
+            result.addExpectedFailure(test, _RemoteError(text))
+        else:
+            result.addUnexpectedSuccess(test)
+        result.stopTest(test)
+
+
+def _flatten_tests(suite, tests):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            _flatten_tests(test, tests)
+        else:
+            tests.append(test)
+    return tests
+
+
+@unittest.nottest
+def run_tests_parallel(suite, jobs, verbosity=1, failfast=False,
+                       buffer=False, stream=None):
+    """
+    Run the tests in a unittest suite with a pool of worker processes.
+
+    The tests are sent to the workers in chunks of consecutive tests,
+    so tests in the same TestCase class usually run in the same worker.
+    Each worker calls setUpClass once for every class it runs tests
+    from.  The results are printed like the TextTestRunner output, and
+    the TestResult object is returned.  If worker processes cannot be
+    forked on this platform, then the tests are run serially.
+    """
+    global _parallel_tests, _parallel_buffer
+    # Python 2's TextTestRunner does not default to sys.stderr
+    runner = unittest.TextTestRunner(stream=stream or sys.stderr,
+                                     verbosity=verbosity,
+                                     failfast=failfast, buffer=buffer,
+                                     resultclass=_ParallelTestResult)
+    ctx = _fork_context()
+    if ctx is None or jobs <= 1:
+        return runner.run(suite)
+
+    tests = _flatten_tests(suite, [])
+    chunksize = max(1, len(tests) // (4 * jobs))
+    chunks = [list(range(i, min(i + chunksize, len(tests))))
+              for i in range(0, len(tests), chunksize)]
+
+    def run_pool(result):
+        # Buffered output would be written by every worker
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pool = ctx.Pool(min(jobs, len(chunks)))
+        closed = False
+        try:
+            for records in pool.imap_unordered(_run_parallel_chunk, chunks):
+                _replay_records(result, records)
+                if result.shouldStop:
+                    break
+            else:
+                pool.close()
+                closed = True
+        finally:
+            # The pool is stopped if the tests were stopped or failed
+            if not closed:
+                pool.terminate()
+            pool.join()
+
+    _parallel_tests = tests
+    _parallel_buffer = buffer
+    try:
+        if tests:
+            return runner.run(run_pool)
+        return runner.run(suite)
+    finally:
+        _parallel_tests = []
 
 
 def cleanup(_globals, suites):
@@ -319,6 +643,22 @@ def run(argv, _globals=None):
         default=False,
         help='Buffer stdout and stderr durring test runs')
     #
+    parser.add_option(
+        '-j',
+        '--jobs',
+        action='store',
+        dest='jobs',
+        type='int',
+        default=1,
+        help='Run the tests in parallel with this number of processes')
+    #
+    parser.add_option(
+        '--lazy',
+        action='store_true',
+        dest='lazy',
+        default=False,
+        help='Merge the options of each test when the test is executed')
+    #
     parser.add_option(
         '--cat',
         '--category',
@@ -376,6 +716,7 @@ Examples:
     options.verbose = _options.verbose
     options.quiet = _options.quiet
     options.categories = _options.categories
+    options.lazy = _options.lazy
     _argv = []
     for arg in args[1:]:
         if os.path.exists(arg):
@@ -388,7 +729,7 @@ Examples:
     suites = []
     categories = set()
     for key in _globals.keys():
-        if type(_globals[key]) is type and issubclass(_globals[key],
+        if isinstance(_globals[key], type) and issubclass(_globals[key],
                                                       unittest.TestCase):
             suites.append(key)
             for c in _globals[key].suite_categories:
@@ -398,7 +739,7 @@ Examples:
     #
     if _options.help_tests and not _globals is None:
         suite = _globals.get(_options.help_tests, None)
-        if not type(suite) is type:
+        if not isinstance(suite, type):
             print("Test suite '%s' not found!" % str(_options.help_tests))
             return cleanup(_globals, suites)
         tests = []
@@ -444,6 +785,36 @@ Examples:
             print("")
         return cleanup(_globals, suites)
     #
+    # Run the tests with a pool of worker processes
+    #
+    if _options.jobs > 1:
+        loader = TestLoader()
+        suite = unittest.TestSuite()
+        for name in _argv or sorted(suites):
+            parts = name.split('.', 1)
+            if not parts[0] in suites:
+                print("Test suite '%s' not found!" % parts[0])
+                cleanup(_globals, suites)
+                sys.exit(True)
+            if len(parts) == 1:
+                suite.addTest(loader.loadTestsFromTestCase(_globals[name]))
+            else:
+                suite.addTest(
+                    loader.loadTestsFromName(parts[1], _globals[parts[0]]))
+        verbosity = 1
+        if _options.quiet:
+            verbosity = 0
+        if _options.verbose or _options.debug:
+            verbosity = 2
+        result = run_tests_parallel(
+            suite,
+            _options.jobs,
+            verbosity=verbosity,
+            failfast=_options.failfast,
+            buffer=_options.buffer)
+        cleanup(_globals, suites)
+        sys.exit(not result.wasSuccessful())
+    #
     # Reset the value of sys.argv per the expectations of the unittest module
     #
     tmp = [args[0]]
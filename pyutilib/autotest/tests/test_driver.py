@@ -4,12 +4,13 @@
 #
 
 import os
+import re
 import sys
 from os.path import abspath, dirname, join
 currdir = dirname(abspath(__file__)) + os.sep
 
 import pyutilib.th as unittest
-from pyutilib.misc import setup_redirect, reset_redirect
+from pyutilib.misc import setup_redirect, reset_redirect, Options
 import pyutilib.autotest
 import pyutilib.subprocess
 from pyutilib.dev.entry_point import run_entry_point
@@ -111,6 +112,82 @@ class TestYaml(pyutilib.th.TestCase):
         self.assertFileEqualsBaseline(
             currdir + 'test6.out', currdir + 'test6.txt', filter=filter)
 
+    def test7(self):
+        # run --jobs 3 example1.yml
+        setup_redirect(currdir + 'test7.out')
+        try:
+            self.driver('--jobs', '3', currdir + 'example1.yml')
+        except SystemExit as e:
+            rc = e.code
+        finally:
+            reset_redirect()
+        self.assertEqual(rc, False)
+        with open(currdir + 'test7.out') as INPUT:
+            output = INPUT.read()
+        os.remove(currdir + 'test7.out')
+        # The tests finish in any order.  The workers and the runner
+        # write to the same file, so the output of a test can share a
+        # line with other output, and the test names are found in the
+        # whole output rather than line by line.
+        with open(currdir + 'test5.txt') as INPUT:
+            baseline = INPUT.read()
+        self.assertEqual(
+            sorted(re.findall('run_test (\\w+)', output)),
+            sorted(re.findall('run_test (\\w+)', baseline)))
+        self.assertIn('Ran 12 tests', output)
+        self.assertEqual(output.splitlines()[-1], 'OK')
+
+    def test8(self):
+        # run --lazy --jobs 2 example1.yml suite2.test_s1_p2
+        setup_redirect(currdir + 'test8.out')
+        try:
+            self.driver('--lazy', '--jobs', '2', currdir + 'example1.yml',
+                        'suite2.test_s1_p2')
+        except SystemExit as e:
+            rc = e.code
+        finally:
+            reset_redirect()
+        self.assertEqual(rc, False)
+        with open(currdir + 'test8.out') as INPUT:
+            output = INPUT.read()
+        os.remove(currdir + 'test8.out')
+        self.assertEqual(re.findall('run_test (\\w+)', output), ['s1_p2'])
+        self.assertIn("option2: 'p2_option2'", output)
+        self.assertIn('Ran 1 test', output)
+
+    def test_config_cache(self):
+        pyutilib.autotest.clear_config_cache()
+        options = Options(categories=['x_suite2'], lazy=True)
+        g1 = {}
+        pyutilib.autotest.create_test_suites(
+            filename=currdir + 'example1.yml', _globals=g1, options=options)
+        self.assertEqual(len(pyutilib.autotest.driver._config_cache), 1)
+        self.assertEqual(sorted(k for k in g1 if k.startswith('suite')),
+                         ['suite2'])
+        self.assertEqual(
+            [t for t in dir(g1['suite2']) if t.startswith('test_')],
+            ['test_s1_p1', 'test_s1_p2', 'test_s1_p3', 'test_s3_p1',
+             'test_s3_p2', 'test_s3_p3'])
+        # The test methods are created when they are accessed, and the
+        # options are merged when the tests are executed
+        self.assertNotIn('test_s1_p2', g1['suite2'].__dict__)
+        self.assertTrue(callable(getattr(g1['suite2'], 'test_s1_p2')))
+        self.assertIn('test_s1_p2', g1['suite2'].__dict__)
+        self.assertIsNone(g1['suite2']._options['suite2', 's1_p2'])
+        self.assertRaises(AttributeError, getattr, g1['suite2'], 'test_s2_p2')
+        options = Options(categories=['x_suite2'])
+        g2 = {}
+        pyutilib.autotest.create_test_suites(
+            filename=currdir + 'example1.yml', _globals=g2, options=options)
+        self.assertEqual(len(pyutilib.autotest.driver._config_cache), 1)
+        self.assertEqual(
+            g2['suite2']._options['suite2', 's3_p2'],
+            Options(option1='p2_opt1', option2='p2_option2', problem='p2',
+                    solver='s3', soption1='s3_opt1', suite='suite2',
+                    currdir=currdir))
+        pyutilib.autotest.clear_config_cache()
+        self.assertEqual(len(pyutilib.autotest.driver._config_cache), 0)
+
 
 class TestJson(pyutilib.th.TestCase):
 
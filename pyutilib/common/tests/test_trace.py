@@ -0,0 +1,139 @@
+#
+# Unit Tests for pyutilib.common.trace
+#
+
+import json
+import sys
+
+from six import StringIO
+
+import pyutilib.th as unittest
+from pyutilib.common import trace
+from pyutilib.misc.timing import HierarchicalTimer
+
+
+class TestTrace(unittest.TestCase):
+
+    def tearDown(self):
+        for sink in trace._sinks:
+            trace.remove_sink(sink)
+
+    def test_no_sinks(self):
+        self.assertFalse(trace.tracing())
+        with trace.span('a', 'test', x=1) as s:
+            s.set_attribute('y', 2)
+        self.assertIs(s, trace._null_span)
+
+    def test_ring_buffer(self):
+        sink = trace.RingBufferSink(maxlen=3)
+        with sink:
+            self.assertTrue(trace.tracing())
+            for i in range(5):
+                with trace.span('a%d' % i, 'test', i=i) as s:
+                    s.set_attribute('j', -i)
+            try:
+                with trace.span('err', 'test'):
+                    raise ValueError()
+            except ValueError:
+                pass
+        self.assertFalse(trace.tracing())
+        with trace.span('ignored'):
+            pass
+        self.assertEqual([s.name for s in sink.spans], ['a3', 'a4', 'err'])
+        self.assertEqual(sink.spans[0].attributes, {'i': 3, 'j': -3})
+        self.assertEqual(sink.spans[-1].attributes, {'error': 'ValueError'})
+        self.assertGreaterEqual(sink.spans[0].duration, 0)
+        sink.clear()
+        self.assertEqual(len(sink.spans), 0)
+
+    def test_categories(self):
+        sink = trace.RingBufferSink(categories=['keep'])
+        with sink:
+            with trace.span('a', 'keep'):
+                with trace.span('b', 'drop'):
+                    pass
+        self.assertEqual([s.name for s in sink.spans], ['a'])
+
+    def test_traced(self):
+
+        @trace.traced
+        def f(x):
+            return x + 1
+
+        @trace.traced('g', 'test')
+        def g(x):
+            return f(x)
+
+        self.assertEqual(g(1), 2)
+        with trace.RingBufferSink() as sink:
+            self.assertEqual(g(1), 2)
+        self.assertEqual([s.name[-1:] for s in sink.spans], ['f', 'g'])
+        self.assertEqual(sink.spans[1].category, 'test')
+
+    def test_chrome_trace(self):
+        with trace.ChromeTraceSink() as sink:
+            with trace.span('outer', 'test', obj=object()):
+                with trace.span('inner', 'test', n=1):
+                    pass
+        out = StringIO()
+        sink.write(out)
+        ans = json.loads(out.getvalue())
+        events = ans['traceEvents']
+        self.assertEqual([e['name'] for e in events], ['inner', 'outer'])
+        self.assertEqual(set(e['ph'] for e in events), set(['X']))
+        inner, outer = events
+        self.assertEqual(inner['args'], {'n': 1})
+        self.assertTrue(outer['args']['obj'].startswith('<object'))
+        self.assertEqual(inner['tid'], outer['tid'])
+        self.assertLessEqual(outer['ts'], inner['ts'])
+        self.assertGreaterEqual(outer['ts'] + outer['dur'],
+                                inner['ts'] + inner['dur'])
+
+    def test_timer_sink(self):
+        timer = HierarchicalTimer()
+        with trace.TimerSink(timer):
+            for i in range(2):
+                with trace.span('outer'):
+                    with trace.span('inner'):
+                        pass
+        regions = timer.to_dict()['regions']
+        self.assertEqual(regions[0]['name'], 'outer')
+        self.assertEqual(regions[0]['calls'], 2)
+        self.assertEqual(regions[0]['children'][0]['calls'], 2)
+
+    def test_library_spans(self):
+        import pyutilib.workflow
+        import pyutilib.subprocess
+        from pyutilib.component.core import ExtensionPoint, IPluginLoader
+
+        class TaskA(pyutilib.workflow.Task):
+
+            def __init__(self, *args, **kwds):
+                pyutilib.workflow.Task.__init__(self, *args, **kwds)
+                self.inputs.declare('x')
+                self.outputs.declare('z')
+
+            def execute(self):
+                self.z = self.x + 1
+
+        A = TaskA()
+        w = pyutilib.workflow.Workflow()
+        w.add(A)
+        ep = ExtensionPoint(IPluginLoader)
+        with trace.RingBufferSink() as sink:
+            self.assertEqual(w(x=1).z, 2)
+            ep.extensions()
+            pyutilib.subprocess.run_command(
+                [sys.executable, '-c', 'pass'], define_signal_handlers=False)
+        spans = dict((s.category, s) for s in sink.spans)
+        self.assertEqual(spans['workflow'].attributes['type'], 'Workflow')
+        self.assertEqual(spans['plugin'].attributes['interface'],
+                         'IPluginLoader')
+        self.assertEqual(spans['subprocess'].attributes['rc'], 0)
+        self.assertEqual(
+            [s.attributes['type'] for s in sink.spans
+             if s.category == 'workflow'], ['TaskA', 'Workflow'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,319 @@
+#  _________________________________________________________________________
+#
+#  PyUtilib: A Python utility library.
+#  Copyright (c) 2008 Sandia Corporation.
+#  This software is distributed under the BSD License.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  _________________________________________________________________________
+"""
+A lightweight tracing API.
+
+Instrumented code marks the regions it executes as spans:
+
+    >>> from pyutilib.common import trace
+    >>> with trace.span('solve', 'app', solver='glpk') as s:
+    ...     s.set_attribute('status', 'ok')
+
+Spans are only created while at least one sink is registered with
+:func:`add_sink`; otherwise :func:`span` returns a shared no-op object,
+so instrumentation that is not being traced costs a function call and
+a test.  Each registered sink is told when a span starts and ends.
+This module provides sinks that keep the most recent spans in memory
+(:class:`RingBufferSink`), write the spans in the Chrome trace-event
+format (:class:`ChromeTraceSink`), and time the spans with a
+:class:`pyutilib.misc.timing.HierarchicalTimer` (:class:`TimerSink`).
+
+The library traces workflow tasks ('workflow'), extension point
+queries ('plugin'), subprocesses ('subprocess') and Pyro dispatcher
+requests ('pyro').
+"""
+
+__all__ = ('span', 'traced', 'add_sink', 'remove_sink', 'tracing',
+           'Span', 'TraceSink', 'RingBufferSink', 'ChromeTraceSink',
+           'TimerSink')
+
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+try:
+    default_timer = time.perf_counter
+except AttributeError:                              #pragma:nocover
+    default_timer = time.time
+
+try:
+    _get_ident = threading.get_ident
+except AttributeError:                              #pragma:nocover
+    _get_ident = threading._get_ident
+
+#
+# The registered sinks.  This is replaced (never modified), so it can be
+# iterated without a lock.
+#
+_sinks = ()
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink):
+    """Register a sink that receives the spans."""
+    global _sinks
+    with _sinks_lock:
+        if sink not in _sinks:
+            _sinks = _sinks + (sink,)
+
+
+def remove_sink(sink):
+    """Unregister a sink."""
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(s for s in _sinks if s is not sink)
+
+
+def tracing():
+    """Return :const:`True` if any sinks are registered."""
+    return bool(_sinks)
+
+
+class Span(object):
+    """A traced region of code.
+
+    The start and end times are in seconds from an arbitrary reference
+    time (:func:`time.perf_counter`).  If the region raises an
+    exception, then the name of the exception class is stored in the
+    'error' attribute.
+    """
+
+    __slots__ = ('name', 'category', 'attributes', 'thread', 'start', 'end',
+                 '_sinks')
+
+    def __init__(self, name, category, attributes):
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.thread = None
+        self.start = None
+        self.end = None
+        self._sinks = ()
+
+    def set_attribute(self, key, value):
+        """Set an attribute of the span."""
+        self.attributes[key] = value
+
+    @property
+    def duration(self):
+        """The elapsed time of the span, in seconds."""
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def __enter__(self):
+        self.thread = _get_ident()
+        # The sinks registered when the span starts receive the end of
+        # the span, even if the registered sinks change in between.
+        self._sinks = _sinks
+        for sink in self._sinks:
+            sink.span_start(self)
+        self.start = default_timer()
+        return self
+
+    def __exit__(self, et, ev, tb):
+        self.end = default_timer()
+        if et is not None:
+            self.attributes['error'] = et.__name__
+        for sink in self._sinks:
+            sink.span_end(self)
+
+    def __repr__(self):
+        return "Span(%r, %r, %r)" % (self.name, self.category,
+                                     self.attributes)
+
+
+class _NullSpan(object):
+    """The span that is returned when nothing is being traced."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, et, ev, tb):
+        pass
+
+_null_span = _NullSpan()
+
+
+def span(name, category='', **attributes):
+    """Return a context manager that traces a region of code.
+
+    Args:
+        name (str): the name of the span
+        category (str): the category of the span (e.g., 'workflow')
+        **attributes: additional information about the span.  Values
+            should be JSON-serializable if the spans are written with
+            :class:`ChromeTraceSink`.
+    """
+    if not _sinks:
+        return _null_span
+    return Span(name, category, attributes)
+
+
+def traced(name=None, category=''):
+    """A decorator that traces each call of a function.
+
+    This can be used as ``@traced`` or ``@traced('name', 'category')``;
+    the default span name is the qualified name of the function.
+    """
+    if callable(name):
+        return traced()(name)
+
+    def decorator(func):
+        span_name = name
+        if span_name is None:
+            span_name = getattr(func, '__qualname__', func.__name__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwds):
+            if not _sinks:
+                return func(*args, **kwds)
+            with Span(span_name, category, {}):
+                return func(*args, **kwds)
+
+        return wrapper
+
+    return decorator
+
+
+class TraceSink(object):
+    """The base class for trace sinks.
+
+    Sinks are called from the thread that executes the span, so sinks
+    that are used in multithreaded code must be thread-safe.
+
+    Args:
+        categories: an optional collection of the span categories that
+            are recorded (default: all categories)
+    """
+
+    def __init__(self, categories=None):
+        if categories is not None:
+            categories = frozenset(categories)
+        self.categories = categories
+
+    def span_start(self, span):
+        """Called when a span starts."""
+        pass
+
+    def span_end(self, span):
+        """Called when a span ends."""
+        pass
+
+    def __enter__(self):
+        add_sink(self)
+        return self
+
+    def __exit__(self, et, ev, tb):
+        remove_sink(self)
+
+
+class RingBufferSink(TraceSink):
+    """A sink that keeps the most recently completed spans in memory.
+
+    Args:
+        maxlen (int): the maximum number of spans that are kept
+        categories: an optional collection of the span categories that
+            are recorded
+    """
+
+    def __init__(self, maxlen=10000, categories=None):
+        TraceSink.__init__(self, categories)
+        self.spans = collections.deque(maxlen=maxlen)
+
+    def span_end(self, span):
+        if self.categories is None or span.category in self.categories:
+            self.spans.append(span)
+
+    def clear(self):
+        """Discard the spans."""
+        self.spans.clear()
+
+
+class ChromeTraceSink(TraceSink):
+    """A sink that records the spans as Chrome trace events.
+
+    The events are written with :func:`write` as a JSON object that can
+    be loaded in chrome://tracing or Perfetto.  Each span is recorded
+    as a complete ('X') event when it ends.
+
+    Args:
+        categories: an optional collection of the span categories that
+            are recorded
+    """
+
+    def __init__(self, categories=None):
+        TraceSink.__init__(self, categories)
+        self.events = []
+        self._pid = os.getpid()
+        self._epoch = default_timer()
+
+    def span_end(self, span):
+        if self.categories is not None and \
+           span.category not in self.categories:
+            return
+        self.events.append({
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': (span.start - self._epoch) * 1e6,
+            'dur': (span.end - span.start) * 1e6,
+            'pid': self._pid,
+            'tid': span.thread,
+            'args': span.attributes
+        })
+
+    def to_dict(self):
+        """Return the trace as a dictionary."""
+        return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def write(self, ostream):
+        """Write the trace to a file name or an output stream.
+
+        Attribute values that are not JSON-serializable are written as
+        strings.
+        """
+        if not hasattr(ostream, 'write'):
+            with open(ostream, 'w') as OUTPUT:
+                return self.write(OUTPUT)
+        json.dump(self.to_dict(), ostream, default=str)
+
+
+class TimerSink(TraceSink):
+    """A sink that times the spans with a hierarchical timer.
+
+    Args:
+        timer (HierarchicalTimer): the timer (default: a new
+            :class:`pyutilib.misc.timing.HierarchicalTimer`)
+        categories: an optional collection of the span categories that
+            are recorded
+    """
+
+    def __init__(self, timer=None, categories=None):
+        TraceSink.__init__(self, categories)
+        if timer is None:
+            from pyutilib.misc.timing import HierarchicalTimer
+            timer = HierarchicalTimer()
+        self.timer = timer
+
+    def span_start(self, span):
+        if self.categories is None or span.category in self.categories:
+            self.timer.start(span.name)
+
+    def span_end(self, span):
+        if self.categories is None or span.category in self.categories:
+            self.timer.stop(span.name)
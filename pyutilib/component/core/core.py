@@ -25,6 +25,7 @@ import re
 import sys
 import weakref
 from six import itervalues, string_types
+from pyutilib.common import trace
 import logging
 logger = logging.getLogger('pyutilib.component.core')
 
@@ -268,6 +269,15 @@ class ExtensionPoint(object):
         TODO - Can this support caching?
         How would that relate to the weakref test?
         """
+        if not trace._sinks:
+            return self._extensions(all, key)
+        with trace.span('ExtensionPoint.extensions', 'plugin',
+                        interface=self.interface.__name__, key=key) as span:
+            ans = self._extensions(all, key)
+            span.set_attribute('count', len(ans))
+            return ans
+
+    def _extensions(self, all, key):
         strkey = str(key)
         ans = set()
         remove = set()
@@ -1,7 +1,12 @@
 import os
 import sys
 import glob
+import shutil
 import optparse
+import subprocess
+import tempfile
+import threading
+import time
 
 import pyutilib.subprocess
 from pyutilib.th import TestCase
@@ -90,6 +95,23 @@ def run(package, basedir, argv, use_exec=use_exec, env=None):
         dest='dryrun',
         default=False,
         help='Dry run: collect but do not execute the tests')
+    parser.add_option(
+        '-j',
+        '--jobs',
+        action='store',
+        dest='jobs',
+        type='int',
+        default=1,
+        help='Run the tests in this number of parallel processes.  The '
+        'tests are scheduled with the durations of previous runs.')
+    parser.add_option(
+        '--durations',
+        action='store',
+        dest='durations',
+        default=None,
+        help='A file with the history of the test durations, which is '
+        'updated after the tests run (default: durations.json when '
+        'running parallel tests)')
 
     options, args = parser.parse_args(argv)
 
@@ -224,6 +246,24 @@ def run(package, basedir, argv, use_exec=use_exec, env=None):
                 targets.update(glob.glob(arg))
             else:
                 targets.add(arg)
+
+    if options.jobs > 1 or options.durations:
+        # The durations plugin is not a nose entry point, so nose is
+        # run with the pyutilib.th.nose_durations script
+        cmd[0:1] = [sys.executable, '-m', 'pyutilib.th.nose_durations']
+        if options.jobs > 1 and options.coverage:
+            print("WARNING: tests are not run in parallel when computing "
+                  "coverage information")
+            options.jobs = 1
+        if options.durations is None:
+            options.durations = 'durations.json'
+        options.durations = os.path.abspath(options.durations)
+        if options.jobs > 1:
+            return _run_parallel(cmd, sorted(targets), options, env,
+                                 package[0])
+        cmd.extend(['--with-durations',
+                    '--durations-file=' + options.durations])
+
     cmd.extend(list(targets))
 
     print("Running...\n    %s\n" % (
@@ -256,6 +296,126 @@ def run(package, basedir, argv, use_exec=use_exec, env=None):
     return rc
 
 
+def _run_parallel(cmd, targets, options, env, package):
+    """
+    Run the tests with parallel nose processes.  The tests are collected,
+    grouped by their test class (or module), and the groups are assigned
+    to the processes with the longest-processing-time-first rule using
+    the durations of previous runs.
+    """
+    from pyutilib.th.nose_durations import DurationHistory, schedule_groups
+
+    if options.xunit:
+        cmd.remove('--xunit-file=TEST-' + package + '.xml')
+        cmd.remove('--with-xunit')
+    history = DurationHistory(options.durations)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        #
+        # Collect the tests
+        #
+        collect_file = os.path.join(tmpdir, 'collect.json')
+        collect_cmd = [x for x in cmd if x != '--collect-only'] + \
+            ['--collect-only', '--with-durations',
+             '--durations-file=' + collect_file] + targets
+        with open(os.devnull, 'w') as DEVNULL:
+            rc = subprocess.call(collect_cmd, env=env, stdout=DEVNULL,
+                                 stderr=subprocess.STDOUT)
+        if rc or not os.path.exists(collect_file):
+            print("ERROR: failed to collect the tests:\n    %s" %
+                  ' '.join(collect_cmd))
+            return rc or 1
+        collected = DurationHistory(collect_file)
+        bins, loads = schedule_groups(collected, history, options.jobs)
+        unscheduled = sorted(test_id for test_id, info in
+                             collected.tests.items() if info['group'] is None)
+        if unscheduled:
+            # These tests cannot be passed to a worker, so the run fails
+            print("ERROR: the following tests are not in a file, so "
+                  "they cannot be run in parallel:\n    %s" %
+                  '\n    '.join(unscheduled))
+        print("Scheduled %d tests in %d groups on %d processes "
+              "(predicted makespan %.2fs)\n" % (
+                  len(collected) - len(unscheduled),
+                  sum(len(b) for b in bins), len(bins),
+                  max(loads) if loads else 0.0))
+        if options.dryrun:
+            for i, groups in enumerate(bins):
+                print("Process %d (predicted %.2fs):" % (i, loads[i]))
+                for group in groups:
+                    print("    " + group)
+            return 0
+        if not bins:
+            return 1 if unscheduled else 0
+        #
+        # Run the processes
+        #
+        if options.output:
+            ostream = open(options.output, 'w')
+            sys.stdout.write(
+                "Redirecting output to file '%s' ..." % options.output)
+        else:
+            ostream = sys.stdout
+        sys.stdout.flush()
+        workers = []
+        start = time.time()
+        for i, groups in enumerate(bins):
+            worker_cmd = cmd + ['--with-durations', '--durations-file=' +
+                                os.path.join(tmpdir, 'durations.%d.json' % i)]
+            if options.xunit:
+                worker_cmd += ['--with-xunit', '--xunit-file=TEST-%s.%d.xml'
+                               % (package, i)]
+            outfile = os.path.join(tmpdir, 'output.%d.txt' % i)
+            with open(outfile, 'w') as OUTPUT:
+                proc = subprocess.Popen(worker_cmd + groups, env=env,
+                                        stdout=OUTPUT,
+                                        stderr=subprocess.STDOUT)
+            workers.append([proc, outfile, None])
+
+        def wait(worker):
+            worker[0].wait()
+            worker[2] = time.time() - start
+
+        # Each process is waited for in a thread, so the elapsed time of
+        # each process is recorded when it finishes
+        waiters = [threading.Thread(target=wait, args=(w,)) for w in workers]
+        for th in waiters:
+            th.start()
+        for th in waiters:
+            th.join()
+        #
+        # Report the results, and update the history
+        #
+        rc = 0
+        for i, (proc, outfile, elapsed) in enumerate(workers):
+            ostream.write("=" * 70 + "\nProcess %d\n" % i + "=" * 70 + "\n")
+            with open(outfile, 'r') as INPUT:
+                ostream.write(INPUT.read())
+            ostream.write("\n")
+            rc = rc or proc.returncode
+            durations_file = os.path.join(tmpdir, 'durations.%d.json' % i)
+            if os.path.exists(durations_file):
+                worker_history = DurationHistory(durations_file)
+                history.merge(worker_history)
+                history.record_overhead(elapsed - worker_history.total())
+        history.save(options.durations)
+        ostream.write("%-10s %10s %10s %8s\n" %
+                      ('Process', 'Predicted', 'Actual', 'Groups'))
+        for i, (proc, outfile, elapsed) in enumerate(workers):
+            ostream.write("%-10d %9.2fs %9.2fs %8d\n" %
+                          (i, loads[i], elapsed, len(bins[i])))
+        ostream.write("Makespan: predicted %.2fs, actual %.2fs\n" % (
+            max(loads), max(w[2] for w in workers)))
+        if unscheduled:
+            ostream.write("%d tests were not run\n" % len(unscheduled))
+            rc = rc or 1
+        if ostream is not sys.stdout:
+            ostream.close()
+        return rc
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
 def runPyUtilibTests(argv=None, use_exec=use_exec):
     if argv is None:
         argv = sys.argv
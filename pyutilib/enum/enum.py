@@ -126,12 +126,31 @@ class EnumImmutableError(TypeError, EnumException):
 class EnumValue(object):
     """ A specific value of an enumerated type. """
 
+    __slots__ = ('__enumtype', '__index', '__key')
+
     def __init__(self, enumtype, index, key):
         """ Set up a new instance. """
         self.__enumtype = enumtype
         self.__index = index
         self.__key = key
 
+    def __getstate__(self):
+        state = (self.__enumtype, self.__index, self.__key)
+        # Subclasses without __slots__ may have other attributes
+        if getattr(self, '__dict__', None):
+            state += (self.__dict__,)
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # Values pickled before EnumValue declared __slots__
+            state = (state.pop('_EnumValue__enumtype'),
+                     state.pop('_EnumValue__index'),
+                     state.pop('_EnumValue__key'), state)
+        self.__enumtype, self.__index, self.__key = state[:3]
+        if len(state) > 3 and state[3]:
+            self.__dict__.update(state[3])
+
     def __get_enumtype(self):
         return self.__enumtype
 
@@ -204,7 +223,7 @@ class EnumValue(object):
         (Called in response to 'self == other'.)
         """
         try:
-            return self.index == other.index
+            return self.__index == other.index
         except Exception:
             return NotImplemented
 
@@ -214,7 +233,7 @@ class EnumValue(object):
         (Called in response to 'self != other'.)
         """
         try:
-            return self.index != other.index
+            return self.__index != other.index
         except Exception:
             return NotImplemented
 
@@ -261,6 +280,35 @@ class Enum(object):
 
         super(Enum, self).__setattr__('_keys', keys)
         super(Enum, self).__setattr__('_values', values)
+        #
+        # Index the keys and values, so lookups and membership tests
+        # do not scan the values.  EnumValue objects hash and compare
+        # by their index, so the value set matches the same objects as
+        # a scan of the value list.
+        #
+        self._index_values()
+
+    def _index_values(self):
+        key_map = {}
+        for value in self._values:
+            key_map.setdefault(value.key, value)
+        super(Enum, self).__setattr__('_key_map', key_map)
+        super(Enum, self).__setattr__('_value_set', frozenset(self._values))
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_key_map']
+        del state['_value_set']
+        return state
+
+    def __getattr__(self, name):
+        # The indices are not pickled.  They are rebuilt when they are
+        # first used, because the values may not be unpickled yet when
+        # the enumeration is.
+        if name in ('_key_map', '_value_set'):
+            self._index_values()
+            return self.__dict__[name]
+        raise AttributeError(name)
 
     def __call__(self, index):
         #
@@ -268,15 +316,32 @@ class Enum(object):
         # with this index
         #
         if isinstance(index, int):
-            return self[index]
+            return self._values[index]
         #
         # If the index is not a string, then try coercing it
         #
         if not isinstance(index, six.string_types):
-            tmp = str(index)
-        else:
-            tmp = index
-        return getattr(self, tmp)
+            index = str(index)
+        try:
+            return self._key_map[index]
+        except KeyError:
+            return getattr(self, index)
+
+    def values_from(self, keys):
+        """ Return a list with the value for each key in a sequence.
+
+        The keys may be strings, integer indices or values, as for
+        :func:`__call__`.  This is faster than calling the enumeration
+        for each key, e.g., to convert a column of data.
+        """
+        if not isinstance(keys, (list, tuple)):
+            keys = list(keys)
+        key_map = self._key_map
+        try:
+            return [key_map[key] for key in keys]
+        except (KeyError, TypeError):
+            # Not all of the keys are strings
+            return [self(key) for key in keys]
 
     def __setattr__(self, name, value):
         raise EnumImmutableError(name)
@@ -300,12 +365,13 @@ class Enum(object):
         return iter(self._values)
 
     def __contains__(self, value):
-        is_member = False
         if isinstance(value, six.string_types):
-            is_member = (value in self._keys)
-        else:
-            try:
-                is_member = (value in self._values)
-            except Exception:
-                is_member = False
-        return is_member
+            return value in self._key_map
+        if isinstance(value, EnumValue):
+            return value in self._value_set
+        # Other objects may compare equal to a value (e.g. objects with
+        # an index attribute), so they are compared with each value.
+        try:
+            return value in self._values
+        except Exception:
+            return False
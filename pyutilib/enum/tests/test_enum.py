@@ -461,6 +461,61 @@ class Test_Enum(unittest.TestCase):
             for key in params['keys']:
                 self.assertTrue(key in enumtype)
 
+    def test_membership_other(self):
+        # Enumeration should not contain other keys and values.
+        for enumtype, params in self.valid_values.items():
+            self.assertFalse('bogus' in enumtype)
+            self.assertFalse(0 in enumtype)
+            self.assertFalse([] in enumtype)
+            self.assertFalse(None in enumtype)
+
+    def test_membership_index(self):
+        # Enumeration should contain objects that compare equal to a value.
+        class Indexed(object):
+
+            def __init__(self, index):
+                self.index = index
+
+        for enumtype, params in self.valid_values.items():
+            self.assertTrue(Indexed(1) in enumtype)
+            self.assertFalse(Indexed(len(params['keys'])) in enumtype)
+
+    def test_call(self):
+        # Enumeration should return values by key, index or value.
+        for enumtype, params in self.valid_values.items():
+            for i, key in enumerate(params['keys']):
+                value = params['values'][key]
+                self.assertEqual(enumtype(key), value)
+                self.assertEqual(enumtype(i), value)
+                self.assertIs(enumtype(value), enumtype(key))
+            self.assertRaises(AttributeError, enumtype, 'bogus')
+            self.assertRaises(IndexError, enumtype, len(params['keys']))
+
+    def test_values_from(self):
+        # Enumeration should convert a sequence of keys to values.
+        for enumtype, params in self.valid_values.items():
+            keys = params['keys']
+            values = [params['values'][key] for key in keys]
+            self.assertEqual(enumtype.values_from(keys), values)
+            self.assertEqual(enumtype.values_from(iter(keys[::-1])),
+                             values[::-1])
+            self.assertEqual(
+                enumtype.values_from([keys[0], 1, values[2]]), values[:3])
+            self.assertRaises(AttributeError, enumtype.values_from,
+                              [keys[0], 'bogus'])
+
+    def test_pickle(self):
+        # Enumeration values should survive pickling with their enum.
+        import pickle
+        for enumtype, params in self.valid_values.items():
+            key = params['keys'][1]
+            for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+                value = pickle.loads(pickle.dumps(enumtype(key), protocol))
+                self.assertEqual(value.key, key)
+                self.assertEqual(value.index, 1)
+                self.assertTrue(value in value.enumtype)
+                self.assertIs(value.enumtype(key), value)
+
     def test_add_attribute(self):
         # Enumeration should refuse attribute addition.
         for enumtype, params in self.valid_values.items():
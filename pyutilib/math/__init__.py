@@ -9,4 +9,5 @@
 #
 
 from pyutilib.math.numtypes import infinity, nan, is_nan, is_finite
-from pyutilib.math.util import approx_equal, as_number, isint, argmax, argmin, mean, median, factorial, perm
+from pyutilib.math.util import isclose, approx_equal, as_number, isint, argmax, argmin, mean, median, factorial, perm, numpy_available
+from pyutilib.math.stats import RunningStats, RunningMedian, QuantileSketch
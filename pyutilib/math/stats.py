@@ -0,0 +1,326 @@
+#  _________________________________________________________________________
+#
+#  PyUtilib: A Python utility library.
+#  Copyright (c) 2008 Sandia Corporation.
+#  This software is distributed under the BSD License.
+#  Under the terms of Contract DE-AC04-94AL85000 with Sandia Corporation,
+#  the U.S. Government retains certain rights in this software.
+#  _________________________________________________________________________
+"""
+Accumulators that compute statistics of a stream of values without
+storing the values.
+"""
+
+from __future__ import division
+
+__all__ = ['RunningStats', 'RunningMedian', 'QuantileSketch']
+
+import heapq
+import math
+
+from pyutilib.math.util import numpy_available, _is_buffer
+if numpy_available:
+    import numpy
+
+
+class RunningStats(object):
+    """
+    Accumulates the count, mean, variance, minimum and maximum of a
+    stream of values in a single pass, using Welford's algorithm.
+
+    Accumulators for different parts of a stream can be combined with
+    :func:`merge`.
+    """
+
+    __slots__ = ('count', 'min', 'max', '_mean', '_m2')
+
+    def __init__(self, values=None):
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        if values is not None:
+            self.update(values)
+
+    def add(self, value):
+        """Add a value to the accumulator."""
+        self.count += 1
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self.count == 1:
+            self.min = value
+            self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+
+    def update(self, values):
+        """
+        Add the values from an iterable to the accumulator.  NumPy
+        arrays and buffers are summarized with NumPy when it is
+        available.
+        """
+        if numpy_available and _is_buffer(values):
+            values = numpy.asarray(values, dtype=float).ravel()
+            if len(values) == 0:
+                return
+            batch = RunningStats()
+            batch.count = len(values)
+            batch._mean = float(values.mean())
+            batch._m2 = float(((values - batch._mean)**2).sum())
+            batch.min = float(values.min())
+            batch.max = float(values.max())
+            self.merge(batch)
+            return
+        add = self.add
+        for value in values:
+            add(value)
+
+    def merge(self, other):
+        """Add the values summarized by another accumulator."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self._mean = other._mean
+            self._m2 = other._m2
+            self.min = other.min
+            self.max = other.max
+            return
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        if other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+
+    @property
+    def mean(self):
+        """The mean of the values."""
+        if self.count == 0:
+            raise ArithmeticError(
+                "Attempting to compute the mean of a zero-length list")
+        return self._mean
+
+    def variance(self, ddof=0):
+        """
+        Returns the variance of the values.  The sum of the squared
+        deviations is divided by ``count - ddof``, so ``ddof=1`` gives
+        the sample variance.
+        """
+        if self.count - ddof <= 0:
+            raise ArithmeticError(
+                "Attempting to compute the variance of %d values with "
+                "ddof=%d" % (self.count, ddof))
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        """Returns the standard deviation of the values."""
+        return math.sqrt(self.variance(ddof))
+
+    def __len__(self):
+        return self.count
+
+
+class RunningMedian(object):
+    """
+    Computes the exact median of a stream of values.
+
+    The values are kept in two heaps: a max-heap with the lower half of
+    the values and a min-heap with the upper half.  Adding a value
+    takes O(log n) time, and the median is available in O(1) time.
+    """
+
+    __slots__ = ('_low', '_high')
+
+    def __init__(self, values=None):
+        # _low stores the negated values, so it is a max-heap
+        self._low = []
+        self._high = []
+        if values is not None:
+            self.update(values)
+
+    def add(self, value):
+        """Add a value to the estimator."""
+        low = self._low
+        high = self._high
+        if not low or value <= -low[0]:
+            heapq.heappush(low, -value)
+            if len(low) > len(high) + 1:
+                heapq.heappush(high, -heapq.heappop(low))
+        else:
+            heapq.heappush(high, value)
+            if len(high) > len(low):
+                heapq.heappush(low, -heapq.heappop(high))
+
+    def update(self, values):
+        """Add the values from an iterable to the estimator."""
+        add = self.add
+        for value in values:
+            add(value)
+
+    def merge(self, other):
+        """Add the values of another estimator."""
+        for value in other._low:
+            self.add(-value)
+        self.update(other._high)
+
+    @property
+    def median(self):
+        """The median of the values."""
+        if not self._low:
+            raise ArithmeticError(
+                "Attempting to compute the median of a zero-length list")
+        if len(self._low) > len(self._high):
+            return -self._low[0]
+        return (-self._low[0] + self._high[0]) / 2.0
+
+    def __len__(self):
+        return len(self._low) + len(self._high)
+
+
+class QuantileSketch(object):
+    """
+    Estimates the quantiles of a stream of values in bounded memory.
+
+    This is a merging t-digest: the values are summarized by weighted
+    centroids, and the centroids near the tails hold fewer values than
+    those near the median, so extreme quantiles are estimated
+    accurately.  The number of centroids is proportional to the
+    compression parameter.  Sketches of different parts of a stream
+    can be combined with :func:`merge`.
+    """
+
+    __slots__ = ('compression', 'count', 'min', 'max', '_centroids',
+                 '_buffer', '_buffer_size')
+
+    def __init__(self, compression=100, values=None):
+        if compression < 10:
+            raise ValueError("The compression must be at least 10")
+        self.compression = compression
+        self.count = 0
+        self.min = None
+        self.max = None
+        # sorted list of [mean, weight] lists
+        self._centroids = []
+        self._buffer = []
+        self._buffer_size = 5 * int(compression)
+        if values is not None:
+            self.update(values)
+
+    def add(self, value, weight=1):
+        """Add a value to the sketch."""
+        if self.count == 0:
+            self.min = value
+            self.max = value
+        elif value < self.min:
+            self.min = value
+        elif value > self.max:
+            self.max = value
+        self.count += weight
+        self._buffer.append([value, weight])
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+    def update(self, values):
+        """Add the values from an iterable to the sketch."""
+        add = self.add
+        for value in values:
+            add(value)
+
+    def merge(self, other):
+        """Add the values summarized by another sketch."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.min = other.min
+            self.max = other.max
+        else:
+            if other.min < self.min:
+                self.min = other.min
+            if other.max > self.max:
+                self.max = other.max
+        self.count += other.count
+        self._buffer.extend([c[0], c[1]] for c in other._centroids)
+        self._buffer.extend([c[0], c[1]] for c in other._buffer)
+        self._compress()
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        items = self._centroids + self._buffer
+        items.sort()
+        self._buffer = []
+        total = float(self.count)
+        # The scale function k(q) = delta/(2 pi) asin(2q - 1) limits the
+        # size of each centroid to the weight between k and k+1
+        scale = self.compression / (2 * math.pi)
+
+        def weight_limit(weight_so_far):
+            k = scale * math.asin(2 * weight_so_far / total - 1) + 1
+            if k >= scale * math.pi / 2:
+                return total
+            return total * (math.sin(k / scale) + 1) / 2
+
+        centroids = []
+        current = items[0]
+        weight_so_far = 0
+        limit = weight_limit(0)
+        for item in items[1:]:
+            if weight_so_far + current[1] + item[1] <= limit:
+                current[1] += item[1]
+                current[0] += (item[0] - current[0]) * item[1] / current[1]
+            else:
+                centroids.append(current)
+                weight_so_far += current[1]
+                limit = weight_limit(weight_so_far)
+                current = item
+        centroids.append(current)
+        self._centroids = centroids
+
+    def quantile(self, q):
+        """
+        Returns an estimate of the q-th quantile (0 <= q <= 1) of the
+        values.
+        """
+        if (q < 0) or (q > 1):
+            raise ValueError("The quantile must be in the range [0,1]")
+        if self.count == 0:
+            raise ArithmeticError(
+                "Attempting to compute a quantile of a zero-length list")
+        self._compress()
+        centroids = self._centroids
+        target = q * self.count
+        # Interpolate between the centers of the centroids, and between
+        # the minimum (maximum) and the first (last) centroid
+        prev_mean = self.min
+        prev_center = 0.0
+        weight_so_far = 0
+        for mean, weight in centroids:
+            center = weight_so_far + weight / 2.0
+            if target <= center:
+                if center == prev_center:
+                    return mean
+                return prev_mean + (mean - prev_mean) * \
+                    (target - prev_center) / (center - prev_center)
+            prev_mean = mean
+            prev_center = center
+            weight_so_far += weight
+        if self.count == prev_center:
+            return self.max
+        return prev_mean + (self.max - prev_mean) * \
+            (target - prev_center) / (self.count - prev_center)
+
+    @property
+    def median(self):
+        """An estimate of the median of the values."""
+        return self.quantile(0.5)
+
+    def __len__(self):
+        return self.count
@@ -3,6 +3,9 @@
 #
 #
 
+import array
+import random
+import sys
 import unittest
 import pyutilib.math
 
@@ -65,6 +68,117 @@ class MathDebug(unittest.TestCase):
         except ArithmeticError:
             pass
 
+    def test_buffers(self):
+        # Verify that buffers and arrays are handled
+        a = array.array('d', [3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 5.0])
+        self.assertEqual(pyutilib.math.median(a), 3.5)
+        self.assertEqual(pyutilib.math.median(a[:-1]), 3.0)
+        self.assertEqual(pyutilib.math.mean(a), 3.75)
+        if sys.version_info[0] >= 3:
+            # Python 2 memoryviews do not support arrays
+            self.assertEqual(pyutilib.math.mean(memoryview(a)), 3.75)
+        self.assertEqual(pyutilib.math.argmax(a), 5)
+        self.assertEqual(pyutilib.math.argmin(a), 1)
+        # ties are resolved as with lists
+        b = array.array('i', [1, 5, 5, 0, 0])
+        self.assertEqual(pyutilib.math.argmax(b), pyutilib.math.argmax(list(b)))
+        self.assertEqual(pyutilib.math.argmin(b), pyutilib.math.argmin(list(b)))
+        self.assertRaises(ArithmeticError, pyutilib.math.median,
+                          array.array('d'))
+        self.assertRaises(ArithmeticError, pyutilib.math.mean,
+                          array.array('d'))
+
+    def test_mean_iterator(self):
+        # Verify that mean() accepts iterators
+        self.assertEqual(pyutilib.math.mean(iter([1, 2, 3, 4])), 2.5)
+        self.assertRaises(ArithmeticError, pyutilib.math.mean, iter([]))
+
+    def test_isclose(self):
+        # Verify that isclose() compares scalars and sequences
+        self.assertTrue(pyutilib.math.isclose(1.0, 1.0 + 1e-10))
+        self.assertFalse(pyutilib.math.isclose(1.0, 1.1))
+        self.assertTrue(pyutilib.math.isclose(0.0, 1e-10, abs_tol=1e-9))
+        ans = pyutilib.math.isclose([1.0, 2.0, 0.0], [1.0, 2.1, 1e-10],
+                                    abs_tol=1e-9)
+        self.assertEqual(list(ans), [True, False, True])
+        ans = pyutilib.math.isclose(1.0, (1.0, 2.0))
+        self.assertEqual(list(ans), [True, False])
+        self.assertRaises(ValueError, pyutilib.math.isclose, [1.0, 2.0, 3.0],
+                          [1.0, 2.0])
+
+    def test_approx_equal(self):
+        # Verify that approx_equal() compares scalars and sequences
+        self.assertTrue(pyutilib.math.approx_equal(1.0, 1.0, None, None))
+        self.assertFalse(pyutilib.math.approx_equal(1.0, 2.5, 1e-8, 1e-8))
+        ans = pyutilib.math.approx_equal([1.0, 1.0, 0.0, 3.0],
+                                         [1.0, 2.5, 0.0, -3.0], None, None)
+        expected = [pyutilib.math.approx_equal(x, y, None, None)
+                    for x, y in zip([1.0, 1.0, 0.0, 3.0], [1.0, 2.5, 0.0, -3.0])]
+        self.assertEqual(list(ans), expected)
+
+    def test_running_stats(self):
+        # Verify that RunningStats() matches the statistics of a list
+        values = [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]
+        stats = pyutilib.math.RunningStats(iter(values))
+        self.assertEqual(len(stats), 8)
+        self.assertAlmostEqual(stats.mean, 5.0)
+        self.assertAlmostEqual(stats.variance(), 4.0)
+        self.assertAlmostEqual(stats.std(), 2.0)
+        self.assertAlmostEqual(stats.variance(ddof=1), 32.0 / 7)
+        self.assertEqual(stats.min, 2.0)
+        self.assertEqual(stats.max, 9.0)
+        # Merge accumulators for parts of the values
+        stats = pyutilib.math.RunningStats(values[:3])
+        other = pyutilib.math.RunningStats(array.array('d', values[3:]))
+        stats.merge(other)
+        stats.merge(pyutilib.math.RunningStats())
+        self.assertEqual(len(stats), 8)
+        self.assertAlmostEqual(stats.mean, 5.0)
+        self.assertAlmostEqual(stats.variance(), 4.0)
+        self.assertEqual(stats.min, 2.0)
+        self.assertEqual(stats.max, 9.0)
+        stats = pyutilib.math.RunningStats()
+        self.assertRaises(ArithmeticError, getattr, stats, 'mean')
+        self.assertRaises(ArithmeticError, stats.variance)
+
+    def test_running_median(self):
+        # Verify that RunningMedian() matches median()
+        random.seed(1)
+        values = [random.randint(0, 100) for i in range(101)]
+        stats = pyutilib.math.RunningMedian()
+        for i, value in enumerate(values):
+            stats.add(value)
+            self.assertEqual(stats.median, pyutilib.math.median(values[:i + 1]))
+        self.assertEqual(len(stats), 101)
+        stats = pyutilib.math.RunningMedian(values[:40])
+        stats.merge(pyutilib.math.RunningMedian(values[40:]))
+        self.assertEqual(stats.median, pyutilib.math.median(values))
+        stats = pyutilib.math.RunningMedian()
+        self.assertRaises(ArithmeticError, getattr, stats, 'median')
+
+    def test_quantile_sketch(self):
+        # Verify that QuantileSketch() is exact for a few values
+        values = [5.0, 1.0, 4.0, 2.0, 3.0, 6.0]
+        stats = pyutilib.math.QuantileSketch(values=values)
+        self.assertEqual(stats.median, pyutilib.math.median(values))
+        self.assertEqual(stats.quantile(0), 1.0)
+        self.assertEqual(stats.quantile(1), 6.0)
+        self.assertRaises(ValueError, stats.quantile, 1.5)
+        self.assertRaises(ArithmeticError, pyutilib.math.QuantileSketch().quantile, 0.5)
+        self.assertRaises(ValueError, pyutilib.math.QuantileSketch, 1)
+        # Verify the accuracy of the estimates for many values
+        random.seed(1)
+        values = [random.random() for i in range(20000)]
+        stats = pyutilib.math.QuantileSketch(values=values[:10000])
+        other = pyutilib.math.QuantileSketch(values=values[10000:])
+        stats.merge(other)
+        self.assertEqual(len(stats), 20000)
+        self.assertLess(len(stats._centroids), 200)
+        values.sort()
+        for q in (0.001, 0.1, 0.5, 0.9, 0.999):
+            self.assertAlmostEqual(stats.quantile(q), values[int(q * 19999)],
+                                   delta=0.005)
+
     def test_factorial(self):
         # Verify that factorial() works
         self.assertEqual(pyutilib.math.factorial(0), 1)
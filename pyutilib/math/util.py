@@ -8,16 +8,58 @@
 #  _________________________________________________________________________
 
 __all__ = ['isclose', 'approx_equal', 'as_number', 'isint', 'argmax', 'argmin', 'mean',
-           'median', 'factorial', 'perm']
+           'median', 'factorial', 'perm', 'numpy_available']
 
+import array
 import math
 import sys
 import six
 from six.moves import zip
 from six.moves import xrange
 
+try:
+    import numpy
+    numpy_available = True
+except ImportError:
+    numpy_available = False
 
-def isclose(a, b, rel_tol=1e-9, abs_tol=0.0):
+try:
+    _buffer_types = (array.array, memoryview)
+except NameError:  #pragma:nocover
+    # Python 2.6
+    _buffer_types = (array.array,)
+
+
+def _is_buffer(arg):
+    """
+    Returns true if the argument is a NumPy array or an object that
+    exports a buffer of numbers (array.array or memoryview).
+    """
+    if isinstance(arg, _buffer_types):
+        return True
+    return numpy_available and isinstance(arg, numpy.ndarray)
+
+
+def _is_sequence(arg):
+    return isinstance(arg, (list, tuple)) or _is_buffer(arg)
+
+
+def _elementwise(func, a, b, *args):
+    """
+    Apply a scalar comparison to the elements of two sequences, or to
+    a sequence and a scalar.  Returns a list of the results.
+    """
+    if not _is_sequence(a):
+        return [func(a, y, *args) for y in b]
+    if not _is_sequence(b):
+        return [func(x, b, *args) for x in a]
+    if len(a) != len(b):
+        raise ValueError("Cannot compare sequences with lengths %d and %d" %
+                         (len(a), len(b)))
+    return [func(x, y, *args) for x, y in zip(a, b)]
+
+
+def _isclose(a, b, rel_tol, abs_tol):
     diff = math.fabs(a-b)
     if diff <= rel_tol*max(math.fabs(a),math.fabs(b)):
         return True
@@ -26,11 +68,53 @@ def isclose(a, b, rel_tol=1e-9, abs_tol=0.0):
     return False
 
 
+def isclose(a, b, rel_tol=1e-9, abs_tol=0.0):
+    """
+    Returns true if a and b are equal within a relative or an absolute
+    tolerance.
+
+    If a or b is a list, tuple, array or buffer, then the values are
+    compared elementwise and the result is a boolean NumPy array (or a
+    list of booleans if NumPy is not available).
+    """
+    if not (_is_sequence(a) or _is_sequence(b)):
+        return _isclose(a, b, rel_tol, abs_tol)
+    if not numpy_available:
+        return _elementwise(_isclose, a, b, rel_tol, abs_tol)
+    a = numpy.asarray(a, dtype=float)
+    b = numpy.asarray(b, dtype=float)
+    diff = numpy.fabs(a - b)
+    return (diff <= rel_tol * numpy.maximum(numpy.fabs(a), numpy.fabs(b))) | \
+        (diff <= abs_tol)
+
+
 def approx_equal(A, B, abstol, reltol):
+    """
+    Returns true if A and B are equal within an absolute or a relative
+    tolerance.
+
+    If A or B is a list, tuple, array or buffer, then the values are
+    compared elementwise and the result is a boolean NumPy array (or a
+    list of booleans if NumPy is not available).
+    """
     if abstol is None:
         abstol = 1e-8
     if reltol is None:
         reltol = 1e-8
+    if not (_is_sequence(A) or _is_sequence(B)):
+        return _approx_equal(A, B, abstol, reltol)
+    if not numpy_available:
+        return _elementwise(_approx_equal, A, B, abstol, reltol)
+    A = numpy.asarray(A, dtype=float)
+    B = numpy.asarray(B, dtype=float)
+    diff = A - B
+    denom = numpy.where(numpy.fabs(B) > numpy.fabs(A), B, A)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        relError = numpy.fabs(numpy.floor_divide(diff, denom))
+    return (numpy.fabs(diff) <= abstol) | (relError <= reltol)
+
+
+def _approx_equal(A, B, abstol, reltol):
     if math.fabs(A - B) <= abstol:
         return True
     if math.fabs(B) > math.fabs(A):
@@ -105,20 +189,42 @@ def isint(arg):
 
 def argmax(array):
     """ Return the index to the maximum element of an array """
+    if numpy_available and _is_buffer(array):
+        # Ties resolve to the last index, as in the pure-Python version
+        values = numpy.asarray(array)
+        return len(values) - 1 - int(numpy.argmax(values[::-1]))
     return max(zip(array, xrange(len(array))))[1]
 
 
 def argmin(array):
     """ Return the index to the maximum element of an array """
+    if numpy_available and _is_buffer(array):
+        return int(numpy.argmin(numpy.asarray(array)))
     return min(zip(array, xrange(len(array))))[1]
 
 
 def mean(mylist):
     """
-    Returns the mean value of a list
+    Returns the mean value of a list.
+
+    NumPy arrays and buffers are summed with NumPy when it is
+    available, and iterators are consumed without building a list.
     """
-    total = 1.0 * sum(mylist)
-    length = len(mylist)
+    if numpy_available and _is_buffer(mylist):
+        values = numpy.asarray(mylist)
+        if values.size == 0:
+            raise ArithmeticError(
+                "Attempting to compute the mean of a zero-length list")
+        return float(numpy.mean(values))
+    if not hasattr(mylist, '__len__'):
+        total = 0.0
+        length = 0
+        for value in mylist:
+            total += value
+            length += 1
+    else:
+        total = 1.0 * sum(mylist)
+        length = len(mylist)
     if length == 0.0:
         raise ArithmeticError(
             "Attempting to compute the mean of a zero-length list")
@@ -126,9 +232,31 @@ def mean(mylist):
 
 
 if sys.version_info < (3, 0):
-    from pyutilib.math.median2 import median
+    from pyutilib.math.median2 import median as _median
 else:
-    from pyutilib.math.median3 import median
+    from pyutilib.math.median3 import median as _median
+
+
+def median(mylist):
+    """
+    Returns the median value of a list
+
+    The median of a NumPy array or buffer is found in linear time with
+    numpy.partition when NumPy is available.  Otherwise, the values are
+    sorted.
+    """
+    if not (numpy_available and _is_buffer(mylist)):
+        return _median(mylist)
+    values = numpy.asarray(mylist).ravel()
+    n = len(values)
+    if n == 0:
+        raise ArithmeticError(
+            "Attempting to compute the median of a zero-length list")
+    ndx = n // 2
+    if n % 2 == 1:
+        return numpy.partition(values, ndx)[ndx].item()
+    values = numpy.partition(values, (ndx - 1, ndx))
+    return (values[ndx - 1].item() + values[ndx].item()) / 2.0
 
 
 def factorial(z):
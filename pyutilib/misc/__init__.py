@@ -11,9 +11,9 @@ import pyutilib.misc.GlobalData
 from pyutilib.misc.archivereader import ArchiveReaderFactory, ArchiveReader,\
            ZipArchiveReader, TarArchiveReader, DirArchiveReader, FileArchiveReader,\
            GzipFileArchiveReader, BZ2FileArchiveReader
-from pyutilib.misc.comparison import compare_file_with_numeric_values, compare_file, compare_large_file
-from pyutilib.misc.cross import cross, cross_iter, flattened_cross_iter
-from pyutilib.misc.dict_with_default import SparseMapping
+from pyutilib.misc.comparison import compare_file_with_numeric_values, compare_file, compare_large_file, compare_files_parallel
+from pyutilib.misc.cross import cross, cross_iter, flattened_cross_iter, CrossProduct
+from pyutilib.misc.dict_with_default import SparseMapping, ArraySparseMapping
 from pyutilib.misc.factory import Factory
 from pyutilib.misc.format_io import format_float, format_io
 from pyutilib.misc.gc_manager import PauseGC
@@ -22,10 +22,10 @@ from pyutilib.misc.import_file import import_file, run_file
 from pyutilib.misc.indent_io import StreamIndenter
 from pyutilib.misc.log_config import LogHandler
 from pyutilib.misc.method import add_method, add_method_by_name
-from pyutilib.misc.misc import deprecated, tostr, flatten, flatten_list, recursive_flatten_tuple, flatten_tuple, handleRemoveReadonly, rmtree, quote_split, traceit, tuplize, find_files, search_file, sort_index, count_lines, Bunch, Container, Options, create_hardlink, executable_extension
-from pyutilib.misc.pyyaml_util import yaml_fix, json_fix, load_yaml, load_json, extract_subtext, compare_repn, compare_strings, compare_yaml_files, compare_json_files, simple_yaml_parser
+from pyutilib.misc.misc import deprecated, tostr, flatten, flatten_list, recursive_flatten_tuple, flatten_tuple, handleRemoveReadonly, rmtree, quote_split, traceit, tuplize, find_files, search_file, clear_search_cache, sort_index, count_lines, Bunch, Container, Options, LightContainer, LightOptions, create_hardlink, executable_extension
+from pyutilib.misc.pyyaml_util import yaml_fix, json_fix, load_yaml, load_json, extract_subtext, compare_repn, find_repn_difference, RepnDifference, compare_strings, compare_yaml_files, compare_json_files, simple_yaml_parser, load_repn_file, set_baseline_cache_dir
 from pyutilib.misc.redirect_io import capture_output, setup_redirect, reset_redirect
 from pyutilib.misc.singleton import Singleton, MonoState
 from pyutilib.misc.tee_io import TeeStream, ConsoleBuffer
 from pyutilib.misc.xml_utils import get_xml_text, escape, compare_xml_files
-from pyutilib.misc.visitor import SimpleVisitor, ValueVisitor
+from pyutilib.misc.visitor import SimpleVisitor, ValueVisitor, VisitCache
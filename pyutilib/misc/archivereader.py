@@ -13,6 +13,9 @@ __all__ = ['ArchiveReaderFactory', 'ArchiveReader', 'ZipArchiveReader',
 
 import os
 import sys
+import copy
+import bisect
+import threading
 import tempfile
 import shutil
 import posixpath
@@ -45,6 +48,11 @@ try:
 except:
     pass
 
+try:
+    from os import scandir as _scandir
+except ImportError:
+    _scandir = None
+
 _WindowsError = None
 try:
     _WindowsError = WindowsError
@@ -187,18 +195,70 @@ class ArchiveReader(object):
         if (self._maxdepth is not None) and (self._maxdepth < 0):
             raise ValueError("maxdepth must be >= 0")
 
-        self._names_list = []
+        # The member names are set by _init, or they are loaded on
+        # demand by _load_names for readers that index lazily
+        self._names = None
+        self._fulldepth_names = None
+        self._names_index = None
         self._artificial_dirs = set()
         self._extractions = set()
         # the python zipfile or tarfile object or None for (dir)
         self._handler = None
         self._workdir = tempfile.mkdtemp()
 
+        self._sorted_names = None
+        self._fulldepth_dirs = None
+
         self._init(*args, **kwds)
 
+        if self._names is not None:
+            self._index_names()
+
+    def _load_names(self):
+        """Set the member name lists of a lazily indexed archive"""
+        self._names = []
+        self._fulldepth_names = []
+
+    def _index_names(self):
         if self._filter is not None:
-            self._names_list = [_f for _f in self._names_list \
-                                if not self._filter(_f)]
+            self._names = [_f for _f in self._names \
+                           if not self._filter(_f)]
+
+        # Indices of the member names, which are used to avoid scanning
+        # the name lists.  The sorted names and the directory index are
+        # only built when they are needed.
+        self._names_index = set(self._names)
+        self._sorted_names = None
+        self._fulldepth_dirs = None
+
+    def _get_names_list(self):
+        if self._names_index is None:
+            if self._names is None:
+                self._load_names()
+            self._index_names()
+        return self._names
+
+    def _set_names_list(self, names):
+        self._names = names
+
+    _names_list = property(_get_names_list, _set_names_list)
+
+    def _get_fulldepth_names_list(self):
+        if self._fulldepth_names is None:
+            self._get_names_list()
+        return self._fulldepth_names
+
+    def _set_fulldepth_names_list(self, names):
+        self._fulldepth_names = names
+
+    _fulldepth_names_list = property(_get_fulldepth_names_list,
+                                     _set_fulldepth_names_list)
+
+    @property
+    def _names_set(self):
+        if self._names_index is None:
+            self._get_names_list()
+        return self._names_index
 
     def name(self):
         return self._archive_name
@@ -243,7 +303,41 @@ class ArchiveReader(object):
         return self._names_list
 
     def contains(self, name):
-        return name in self._names_list
+        return name in self._names_set
+
+    def _add_name(self, name):
+        self._names_list.append(name)
+        self._names_set.add(name)
+        if self._sorted_names is not None:
+            bisect.insort(self._sorted_names, name)
+
+    def _descendants(self, name):
+        """Return the member names that are contained in a directory"""
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self._names_list)
+        prefix = name + _sep
+        names = self._sorted_names
+        ans = []
+        for i in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[i].startswith(prefix):
+                break
+            ans.append(names[i])
+        return ans
+
+    def _is_fulldepth_dir(self, name):
+        """Return True if a name is the parent directory of any member"""
+        if self._fulldepth_dirs is None:
+            dirs = set()
+            for othername in self._fulldepth_names_list:
+                i = othername.rfind(_sep)
+                while i >= 0:
+                    parent = othername[:i]
+                    if parent in dirs:
+                        break
+                    dirs.add(parent)
+                    i = othername.rfind(_sep, 0, i)
+            self._fulldepth_dirs = dirs
+        return name in self._fulldepth_dirs
 
     def _validate_name(self, name):
         name = self._posix_name(name)
@@ -268,13 +362,12 @@ class ArchiveReader(object):
             # name to the _names_list
             #
             checkname = name + _sep
-            if (self._maxdepth is None) or (
-                    checkname.count(_sep) <= self._maxdepth + 1):
-                for othername in self._fulldepth_names_list:
-                    if othername.startswith(checkname):
-                        self._artificial_dirs.add(name)
-                        self._names_list.append(name)
-                        return None, name
+            if ((self._maxdepth is None) or
+                (checkname.count(_sep) <= self._maxdepth + 1)) and \
+               self._is_fulldepth_dir(name):
+                self._artificial_dirs.add(name)
+                self._add_name(name)
+                return None, name
             msg = ("There is no item named '%s' in "
                    "the archive %s" % (name, self._basename))
             if self._subdir is not None:
@@ -290,6 +383,28 @@ class ArchiveReader(object):
     def _openImp(self, name, *args, **kwds):
         raise NotImplementedError("This method has not been " "implemented")
 
+    def iter_members(self):
+        """
+        Generate (name, fileobj) tuples for the file members of the
+        archive, reading them directly from the archive without
+        extracting them.  Each file object is closed when the next
+        member is generated, so it should not be used after that.
+        Directories are skipped.
+        """
+        for name in list(self._names_list):
+            absolute_name, relative_name = self._validate_name(name)
+            if absolute_name is None:
+                continue
+            try:
+                f = self._openImp(absolute_name, relative_name)
+            except (IOError, OSError):
+                # directories cannot be opened
+                continue
+            try:
+                yield relative_name, f
+            finally:
+                f.close()
+
     def extract(self, member=None, path=None, recursive=False, *args, **kwds):
         absolute_name, relative_name = self._validate_name(member)
         dst, children = self._extractImp(absolute_name, relative_name, path,
@@ -330,7 +445,7 @@ class ArchiveReader(object):
             self._extractions.add(dst)
             if len(children):
                 self._extractions.update(children)
-                names = names - set(children)
+                names.difference_update(children)
 
         return dsts
 
@@ -339,38 +454,81 @@ class ArchiveReader(object):
     # occurs by adding new content rather than
     # raising an exception
     @staticmethod
-    def _copytree(src, dst, ignores=None, maxdepth=None):
+    def _copytree(src, dst, ignores=None, maxdepth=None, nthreads=None,
+                  link=False):
 
         assert os.path.exists(src) and os.path.isdir(src)
-        if not os.path.exists(dst):
-            os.makedirs(dst)
-
-        if (maxdepth is None) or (maxdepth > 0):
-
-            if maxdepth is not None:
-                maxdepth -= 1
-
-            names = os.listdir(src)
-            if ignores is not None:
-                ignored_names = ignores
-            else:
-                ignored_names = set()
-
-            for name in names:
-                srcname = posixpath.join(src, name)
+        if ignores is not None:
+            ignored_names = set(ignores)
+        else:
+            ignored_names = set()
+
+        # Create the directory tree first, collecting the files that
+        # are copied afterwards (possibly by several threads)
+        dirs = []
+        files = []
+        stack = [(src, dst, maxdepth)]
+        while stack:
+            srcdir, dstdir, depth = stack.pop()
+            if not os.path.exists(dstdir):
+                os.makedirs(dstdir)
+            dirs.append((srcdir, dstdir))
+            if (depth is not None) and (depth <= 0):
+                continue
+            if depth is not None:
+                depth -= 1
+            for name in os.listdir(srcdir):
+                srcname = posixpath.join(srcdir, name)
                 if srcname in ignored_names:
                     continue
-                dstname = posixpath.join(dst, name)
+                dstname = posixpath.join(dstdir, name)
                 if os.path.isdir(srcname):
-                    ArchiveReader._copytree(
-                        srcname, dstname, ignores=ignores, maxdepth=maxdepth)
+                    stack.append((srcname, dstname, depth))
                 else:
-                    shutil.copy2(srcname, dstname)
+                    files.append((srcname, dstname))
+
+        _copy_files(files, nthreads=nthreads, link=link)
+
+        # Subdirectories are listed after their parents, so this
+        # updates the directory times after their contents are copied
+        for srcdir, dstdir in reversed(dirs):
+            try:
+                shutil.copystat(srcdir, dstdir)
+            except _WindowsError:
+                # can't copy file access times on Windows
+                pass
+
+
+def _copy_file(src, dst, link=False):
+    """
+    Copy a file.  If link is True, a hard link is created instead when
+    the source and destination are on the same file system.
+    """
+    if link and hasattr(os, 'link'):
+        if os.path.lexists(dst):
+            os.remove(dst)
         try:
-            shutil.copystat(src, dst)
-        except _WindowsError:
-            # can't copy file access times on Windows
+            os.link(src, dst)
+            return
+        except OSError:
+            # e.g., a different file system
             pass
+    shutil.copy2(src, dst)
+
+
+def _copy_files(files, nthreads=None, link=False):
+    """Copy a list of (src, dst) files using a bounded thread pool"""
+    if (nthreads is None) or (nthreads <= 1) or (len(files) <= 1):
+        for src, dst in files:
+            _copy_file(src, dst, link)
+        return
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(min(nthreads, len(files)))
+    try:
+        pool.map(lambda args: _copy_file(args[0], args[1], link), files)
+    finally:
+        pool.close()
+        pool.join()
 
 
 class _ziptar_base(ArchiveReader):
@@ -396,50 +554,33 @@ class _ziptar_base(ArchiveReader):
 
     def _extractImp(self, absolute_name, relative_name, path, recursive):
 
-        use_handler = True
-        if absolute_name is None:
-            # This case implies that this was an artificially
-            # added directory that was not appearing in the
-            # archive even though it technically exists
-            # (a rare but possible edge case)
-            use_handler = False
-            absolute_name = relative_name if (
-                self._subdir is None) else self._subdir + relative_name
-
-        tmp_dst = posixpath.join(self._workdir, absolute_name)
-
-        if use_handler:
-            try:
-                self._handler.extract(absolute_name, self._workdir)
-            except KeyError:  # sometimes directories need an _sep ending
-                self._handler.extract(absolute_name + _sep, self._workdir)
+        if path is None:
+            if absolute_name is None:
+                # This case implies that this was an artificially
+                # added directory that was not appearing in the
+                # archive even though it technically exists
+                # (a rare but possible edge case)
+                absolute_name = relative_name if (
+                    self._subdir is None) else self._subdir + relative_name
+                dst = posixpath.join(self._workdir, absolute_name)
+                if not os.path.exists(dst):
+                    os.makedirs(dst)
+            else:
+                dst = posixpath.join(self._workdir, absolute_name)
+                self._extract_member(absolute_name)
         else:
-            if not os.path.exists(tmp_dst):
-                os.makedirs(tmp_dst)
-
-        dst = tmp_dst
-        if path is not None:
-
+            # Members are written directly to the destination,
+            # rather than being extracted into the workdir first
             dst = posixpath.join(path, relative_name)
-            if os.path.isdir(tmp_dst):
-                # updated the timestamp if it exists, otherwise
-                # just create the directory
-                self._copytree(tmp_dst, dst, maxdepth=0)
+            if absolute_name is None:
+                if not os.path.exists(dst):
+                    os.makedirs(dst)
             else:
-                if not os.path.exists(os.path.dirname(dst)):
-                    os.makedirs(os.path.dirname(dst))
-                try:
-                    os.rename(tmp_dst, dst)
-                except OSError:
-                    shutil.copy2(tmp_dst, dst)
+                self._extract_member(absolute_name, path, relative_name)
 
         children = []
         if os.path.isdir(dst) and recursive:
-            new_names = [relname for relname in self._names_list \
-                         if relname.startswith(relative_name)]
-            if relative_name in new_names:
-                new_names.remove(relative_name)
-            for childname in new_names:
+            for childname in self._descendants(relative_name):
                 absolute_childname, relative_childname = self._validate_name(
                     childname)
                 childdst, recursives = self._extractImp(
@@ -449,6 +590,33 @@ class _ziptar_base(ArchiveReader):
 
         return dst, children
 
+    def _extract_member(self, absolute_name, path=None, relative_name=None):
+        """
+        Extract a member into the workdir, or to path/relative_name if
+        a path is specified.
+        """
+        try:
+            self._handler.extract(absolute_name, self._workdir)
+        except KeyError:  # sometimes directories need an _sep ending
+            self._handler.extract(absolute_name + _sep, self._workdir)
+
+
+def _copy_zip_member(handler, info, dst):
+    dirname = os.path.dirname(dst)
+    if dirname and not os.path.exists(dirname):
+        try:
+            os.makedirs(dirname)
+        except OSError:
+            # another thread may have created it
+            if not os.path.isdir(dirname):
+                raise
+    src = handler.open(info)
+    try:
+        with open(dst, 'wb') as OUTPUT:
+            shutil.copyfileobj(src, OUTPUT)
+    finally:
+        src.close()
+
 
 class ZipArchiveReader(_ziptar_base):
 
@@ -467,6 +635,89 @@ class ZipArchiveReader(_ziptar_base):
         self._names_list, self._fulldepth_names_list, self._subdir_depth = \
             self._fixnames(self._handler.namelist(), self._subdir, self._maxdepth)
 
+    def _getinfo(self, absolute_name):
+        try:
+            return self._handler.getinfo(absolute_name)
+        except KeyError:  # sometimes directories need an _sep ending
+            return self._handler.getinfo(absolute_name + _sep)
+
+    def _extract_member(self, absolute_name, path=None, relative_name=None):
+        if path is None:
+            return _ziptar_base._extract_member(self, absolute_name)
+        dst = posixpath.join(path, relative_name)
+        info = self._getinfo(absolute_name)
+        if info.filename.endswith(_sep):
+            if not os.path.exists(dst):
+                os.makedirs(dst)
+        else:
+            _copy_zip_member(self._handler, info, dst)
+
+    def extractall(self, path=None, members=None, recursive=False,
+                   nthreads=None):
+        """
+        Extract the given members (or all members) of the archive.  If
+        a destination path and nthreads > 1 are specified, then file
+        members are decompressed and written by a pool of threads.
+        """
+        if path is None or nthreads is None or nthreads <= 1:
+            return _ziptar_base.extractall(
+                self, path=path, members=members, recursive=recursive)
+        names = set(members) if members is not None \
+                else set(self._names_list)
+        if len(names) == len(self._names_list):
+            recursive = False
+        dsts = []
+        files = []
+        while names:
+            absolute_name, relative_name = self._validate_name(names.pop())
+            todo = [(absolute_name, relative_name)]
+            dst = posixpath.join(path, relative_name)
+            is_dir = absolute_name is None or \
+                     self._getinfo(absolute_name).filename.endswith(_sep)
+            if is_dir and recursive:
+                children = self._descendants(relative_name)
+                names.difference_update(children)
+                todo.extend(self._validate_name(child) for child in children)
+            dsts.append(dst)
+            for absolute_name, relative_name in todo:
+                dst = posixpath.join(path, relative_name)
+                self._extractions.add(dst)
+                info = None
+                if absolute_name is not None:
+                    info = self._getinfo(absolute_name)
+                if info is None or info.filename.endswith(_sep):
+                    if not os.path.exists(dst):
+                        os.makedirs(dst)
+                else:
+                    files.append((info, dst))
+        if files:
+            self._extract_parallel(files, nthreads)
+        return dsts
+
+    def _extract_parallel(self, files, nthreads):
+        from multiprocessing.pool import ThreadPool
+        # Each thread reads from its own ZipFile object
+        local = threading.local()
+        handlers = []
+        lock = threading.Lock()
+
+        def extract(task):
+            handler = getattr(local, 'handler', None)
+            if handler is None:
+                handler = local.handler = zipfile.ZipFile(self._archive_name)
+                with lock:
+                    handlers.append(handler)
+            _copy_zip_member(handler, task[0], task[1])
+
+        pool = ThreadPool(min(nthreads, len(files)))
+        try:
+            pool.map(extract, files)
+        finally:
+            pool.close()
+            pool.join()
+            for handler in handlers:
+                handler.close()
+
     def _openImp(self, absolute_name, relative_name, *args, **kwds):
         f = None
         try:
@@ -495,13 +746,61 @@ class TarArchiveReader(_ziptar_base):
                             (self._archive_name))
 
         self._handler = tarfile.open(self._archive_name, *args, **kwds)
+        # tarfile looks up members by name with a linear search, so
+        # we index them once (later members with the same name win,
+        # as they do in tarfile)
+        self._members = dict((posixpath.normpath(member.name), member)
+                             for member in self._handler.getmembers())
         self._names_list, self._fulldepth_names_list, self._subdir_depth = \
             self._fixnames(self._handler.getnames(), self._subdir, self._maxdepth)
 
+    def _extract_member(self, absolute_name, path=None, relative_name=None):
+        member = self._members.get(absolute_name, None)
+        if path is None:
+            if member is None:
+                _ziptar_base._extract_member(self, absolute_name)
+            else:
+                self._handler.extract(member, self._workdir)
+            return
+        if member is None:
+            member = self._handler.getmember(absolute_name)
+        # Extract the member under its relative name
+        member = copy.copy(member)
+        member.name = relative_name
+        self._handler.extract(member, path)
+
+    def iter_members(self):
+        """
+        Generate (name, fileobj) tuples for the file members of the
+        archive in a single sequential pass over the archive.  Each
+        file object is only valid until the next member is generated.
+        """
+        handler = tarfile.open(self._archive_name, 'r|*')
+        try:
+            for member in handler:
+                if not member.isfile():
+                    continue
+                name = posixpath.normpath(member.name)
+                if self._subdir is not None:
+                    if not name.startswith(self._subdir):
+                        continue
+                    name = name.replace(self._subdir, '')
+                if name not in self._names_set:
+                    continue
+                f = handler.extractfile(member)
+                try:
+                    yield name, f
+                finally:
+                    f.close()
+        finally:
+            handler.close()
+
     def _openImp(self, absolute_name, relative_name, *args, **kwds):
         f = None
         if absolute_name is not None:
-            f = self._handler.extractfile(absolute_name, *args, **kwds)
+            f = self._handler.extractfile(
+                self._members.get(absolute_name, absolute_name), *args,
+                **kwds)
         if f is None:
             # when this method is called we have already verified the name
             # existed in the list, so this must be a directory
@@ -510,13 +809,70 @@ class TarArchiveReader(_ziptar_base):
         return f
 
 
+def _scan_dir(dirname):
+    """
+    List a directory the way os.walk does.  Returns the subdirectory
+    names, the other names and the set of subdirectories that os.walk
+    would descend into (symbolic links to directories are not
+    followed).
+    """
+    dirs = []
+    files = []
+    walkable = set()
+    try:
+        if _scandir is not None:
+            for entry in _scandir(dirname):
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry.name)
+                    continue
+                dirs.append(entry.name)
+                try:
+                    if not entry.is_symlink():
+                        walkable.add(entry.name)
+                except OSError:
+                    pass
+        else:
+            for name in os.listdir(dirname):
+                fullname = posixpath.join(dirname, name)
+                if not os.path.isdir(fullname):
+                    files.append(name)
+                    continue
+                dirs.append(name)
+                if not os.path.islink(fullname):
+                    walkable.add(name)
+    except OSError:
+        # os.walk ignores directories that cannot be listed
+        pass
+    return dirs, files, walkable
+
+
 class DirArchiveReader(ArchiveReader):
+    """
+    An archive reader for a directory.  Directories are listed on
+    demand, so looking up, opening or extracting members does not
+    scan the whole tree.  The complete list of members is built the
+    first time it is needed, e.g., by getnames().
+
+    Extra keyword options:
+        nthreads: The number of threads used to list directories when
+            the member list is built and to copy files when
+            directories are extracted recursively.
+        link: If True, extracted files are hard links to the
+            original files when they are on the same file system.
+            Note that modifying a linked file modifies the original.
+    """
 
     def _init(self, *args, **kwds):
         assert (self._abspath is not None)
         assert (self._basename is not None)
         assert (self._archive_name is not None)
 
+        self._nthreads = kwds.pop('nthreads', None)
+        self._link = kwds.pop('link', False)
         if kwds:
             raise ValueError("Unexpected keyword options found "
                              "while initializing '%s':\n\t%s" %
@@ -532,28 +888,143 @@ class DirArchiveReader(ArchiveReader):
                             (self._archive_name))
 
         rootdir = self._archive_name
+        self._names_maxdepth = self._maxdepth
         if self._subdir is not None:
             rootdir = posixpath.join(rootdir, self._subdir)
             if not os.path.exists(rootdir):
                 raise IOError(
                     "Subdirectory '%s' does not exists in root directory: %s" %
                     (self._subdir, self._archive_name))
-            self._names_list = self._walk(rootdir, maxdepth=self._maxdepth + 1)
-        else:
-            self._names_list = self._walk(rootdir, maxdepth=self._maxdepth)
-        self._fulldepth_names_list = self._walk(rootdir)
+            if self._maxdepth is not None:
+                self._names_maxdepth = self._maxdepth + 1
+        self._rootdir = rootdir
+        # directory listings, keyed by the name relative to rootdir
+        self._listings = {}
+
+    def _listing(self, prefix):
+        try:
+            return self._listings[prefix]
+        except KeyError:
+            pass
+        dirs, files, walkable = _scan_dir(
+            posixpath.join(self._rootdir, prefix) if prefix else self._rootdir)
+        listing = (dirs, files, set(dirs), set(files), walkable)
+        self._listings[prefix] = listing
+        return listing
+
+    def _prefetch_listings(self):
+        """List the directories of the tree concurrently, level by level"""
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(self._nthreads)
+        try:
+            level = ['']
+            while level:
+                todo = [prefix for prefix in level \
+                        if prefix not in self._listings]
+                for prefix, listing in zip(todo,
+                                           pool.map(self._listing, todo)):
+                    self._listings[prefix] = listing
+                nextlevel = []
+                for prefix in level:
+                    dirs, _, _, _, walkable = self._listings[prefix]
+                    nextlevel.extend(posixpath.join(prefix, dname) \
+                                     for dname in dirs if dname in walkable)
+                level = nextlevel
+        finally:
+            pool.close()
+            pool.join()
+
+    def _load_names(self):
+        if (self._nthreads is not None) and (self._nthreads > 1):
+            self._prefetch_listings()
+        self._names = []
+        self._fulldepth_names = []
+        for prefix, dirs, files in self._walk_listings(''):
+            for dname in dirs:
+                name = posixpath.join(prefix, dname)
+                self._names.append(name)
+                self._fulldepth_names.append(name)
+            skip_files = (self._names_maxdepth is not None) and \
+                         (prefix.count(_sep) >= self._names_maxdepth)
+            for fname in files:
+                name = posixpath.join(prefix, fname)
+                if not skip_files:
+                    self._names.append(name)
+                self._fulldepth_names.append(name)
+        # the listings are no longer needed once the names are indexed
+        self._listings = {}
+
+    def _walk_listings(self, top):
+        """
+        Generate (prefix, dirs, files) tuples for the directories below
+        top, in the same order as os.walk.
+        """
+        stack = [top]
+        while stack:
+            prefix = stack.pop()
+            dirs, files, _, _, walkable = self._listing(prefix)
+            yield prefix, dirs, files
+            stack.extend(posixpath.join(prefix, dname) \
+                         for dname in reversed(dirs) if dname in walkable)
+
+    def _member_type(self, name):
+        """
+        Return 'dir' or 'file' if a name is in the (full depth) tree,
+        and None otherwise.  Only the parent directories of the name
+        are listed.
+        """
+        if not name:
+            return None
+        parts = name.split(_sep)
+        prefix = ''
+        for part in parts[:-1]:
+            if part not in self._listing(prefix)[4]:
+                return None
+            prefix = posixpath.join(prefix, part)
+        if parts[-1] in ('', '.', '..'):
+            return None
+        listing = self._listing(prefix)
+        if parts[-1] in listing[2]:
+            return 'dir'
+        if parts[-1] in listing[3]:
+            return 'file'
+        return None
+
+    def contains(self, name):
+        if self._names_index is not None:
+            return name in self._names_index
+        name = self._posix_name(name)
+        kind = self._member_type(name)
+        if kind is None:
+            return False
+        if (kind == 'file') and (self._names_maxdepth is not None) and \
+           (posixpath.dirname(name).count(_sep) >= self._names_maxdepth):
+            return False
+        return (self._filter is None) or (not self._filter(name))
+
+    def _is_fulldepth_dir(self, name):
+        if self._names_index is not None:
+            return ArchiveReader._is_fulldepth_dir(self, name)
+        if self._member_type(name) != 'dir':
+            return False
+        parent, base = posixpath.split(name)
+        if base not in self._listing(parent)[4]:
+            return False
+        listing = self._listing(name)
+        return bool(listing[0] or listing[1])
 
     @staticmethod
     def _walk(rootdir, maxdepth=None):
         names_list = []
-        for root, dirs, files in os.walk(rootdir, topdown=True):
-            prefix = posixpath.relpath(ArchiveReader._posix_name(root), rootdir)
-            if prefix.endswith(_sep):
-                prefix = prefix[:-1]
-            if prefix == '.':
-                prefix = ''
+        stack = ['']
+        while stack:
+            prefix = stack.pop()
+            dirs, files, walkable = _scan_dir(
+                posixpath.join(rootdir, prefix) if prefix else rootdir)
             for dname in dirs:
                 names_list.append(posixpath.join(prefix, dname))
+            stack.extend(posixpath.join(prefix, dname) \
+                         for dname in reversed(dirs) if dname in walkable)
             if maxdepth is not None and prefix.count(_sep) >= maxdepth:
                 continue
             for fname in files:
@@ -575,11 +1046,12 @@ class DirArchiveReader(ArchiveReader):
                 ignores = []
                 for child in self._walk(src):
                     rname = posixpath.join(relative_name, child)
-                    if rname in self._names_list:
+                    if self.contains(rname):
                         children.append(rname)
                     else:
                         ignores.append(posixpath.join(src, child))
-                self._copytree(src, dst, ignores=ignores)
+                self._copytree(src, dst, ignores=ignores,
+                               nthreads=self._nthreads, link=self._link)
 
             elif not os.path.exists(dst):
                 os.makedirs(dst)
@@ -588,7 +1060,7 @@ class DirArchiveReader(ArchiveReader):
         else:
             if not os.path.exists(posixpath.dirname(dst)):
                 os.makedirs(os.path.dirname(dst))
-            shutil.copy2(src, dst)
+            _copy_file(src, dst, self._link)
 
         return dst, children
 
@@ -468,3 +468,101 @@ def compare_large_file(filename1,
     INPUT1.close()
     INPUT2.close()
     return result
+
+
+def _compare_file_pair(args):
+    """
+    Compare a single (filename1, filename2) pair on behalf of
+    compare_files_parallel().  This is a module-level function so
+    that it can be pickled and sent to a worker process.
+    """
+    filename1, filename2, ignore, filter, tolerance = args
+    #
+    # Byte-identical files are equal regardless of the characters that
+    # are ignored, so a size check followed by a direct content check
+    # lets us skip the line-by-line comparison for the common case.
+    #
+    try:
+        if os.path.exists(filename1) and os.path.exists(filename2) and \
+           filecmp.cmp(filename1, filename2, shallow=False):
+            return [False, None, ""]
+        return compare_file(
+            filename1,
+            filename2,
+            ignore=ignore,
+            filter=filter,
+            tolerance=tolerance)
+    except Exception:
+        err = sys.exc_info()[1]
+        return [True, None, "%s: %s" % (type(err).__name__, str(err))]
+
+
+def compare_files_parallel(pairs,
+                           ignore=["\t", " ", "\n", "\r"],
+                           filter=None,
+                           tolerance=None,
+                           nprocs=None,
+                           chunksize=None,
+                           callback=None):
+    """
+    Compare a sequence of (filename1, filename2) pairs using
+    compare_file(), distributing the comparisons over a pool of
+    worker processes.
+
+    The return value is a list with one [status, lineno, diff] entry
+    for each pair, in the same order as 'pairs'.  Errors raised while
+    comparing a pair (e.g. a missing file) do not abort the batch; they
+    are reported as [True, None, <error message>].
+
+    Pairs whose files are byte-identical are detected with a cheap
+    size/content check before any line-oriented comparison is done.
+
+    If 'nprocs' is None, the number of CPUs is used.  If 'nprocs' is 1,
+    or there are fewer than two pairs, the comparisons are performed in
+    the current process.  When a pool is used, the 'filter' function
+    must be picklable (i.e. defined at module level).
+
+    If 'callback' is specified, it is called as callback(index, result)
+    as each comparison completes, which can be used to report progress.
+    Results are not necessarily delivered in order.
+    """
+    pairs = list(pairs)
+    tasks = [(f1, f2, ignore, filter, tolerance) for f1, f2 in pairs]
+    results = [None] * len(tasks)
+    if nprocs is None:
+        try:
+            import multiprocessing
+            nprocs = multiprocessing.cpu_count()
+        except (ImportError, NotImplementedError):
+            nprocs = 1
+    nprocs = min(nprocs, len(tasks))
+    if nprocs <= 1:
+        for i, task in enumerate(tasks):
+            results[i] = _compare_file_pair(task)
+            if callback is not None:
+                callback(i, results[i])
+        return results
+
+    import multiprocessing
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (nprocs * 8))
+    pool = multiprocessing.Pool(nprocs)
+    try:
+        for i, ans in pool.imap_unordered(
+                _indexed_compare_file_pair, enumerate(tasks), chunksize):
+            results[i] = ans
+            if callback is not None:
+                callback(i, ans)
+    except:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return results
+
+
+def _indexed_compare_file_pair(item):
+    i, task = item
+    return i, _compare_file_pair(task)
@@ -7,128 +7,169 @@
 #  the U.S. Government retains certain rights in this software.
 #  _________________________________________________________________________
 
-import sys
+__all__ = ['cross', 'cross_iter', 'flattened_cross_iter', 'CrossProduct']
+
+import itertools
+from six.moves import map
 from pyutilib.misc import misc
 
-if sys.version_info >= (3, 0):
-    xrange = range
+_chain = itertools.chain.from_iterable
+
+
+def _join(values):
+    # Concatenating a few tuples is faster than chaining them
+    return sum(values, ())
+
+
+def _join_many(values):
+    return tuple(_chain(values))
 
 
-def _cross_exec(set_tuple):
+def _flat_values(values):
     """
-    Function used by cross() to generate the cross-product of a tuple
+    Returns the values of a set as tuples, with nested tuples flattened
     """
-    resulting_set = []
-    if len(set_tuple) == 1:
-        for val in set_tuple[0]:
-            resulting_set.append([val])
-    else:
-        tmp_set = _cross_exec(set_tuple[1:])
-        for val in set_tuple[0]:
-            for item in tmp_set:
-                #print val, item
-                resulting_set.append([val] + item)
-    return resulting_set
+    ans = []
+    for val in values:
+        if type(val) is tuple:
+            ans.append(misc.flatten_tuple(val))
+        else:
+            ans.append((val,))
+    return tuple(ans)
 
 
-def cross(set_tuple):
+class CrossProduct(object):
     """
-    Returns the cross-product of a tuple of values
+    A lazy cross product of a tuple of sets.
+
+    The combinations are generated in the same order as
+    :func:`cross_iter` (the last set varies fastest), and they can be
+    accessed by index without generating the preceding combinations.
+    This makes it easy to split the cross product between worker
+    processes, e.g., with :func:`chunks` and :func:`iter_range`.
+
+    If flatten is True, then nested tuples in the combinations are
+    flattened as with :func:`flatten_tuple`.
+
+    Note that len() raises OverflowError for very large products; the
+    size attribute does not.
     """
-    result_set = []
-    tmp_set = _cross_exec(set_tuple)
-    for val in tmp_set:
-        result_set.append(tuple(val))
-    return result_set
 
-#def tmp_cross(*args):
-#    ans = [[]]
-#    for arg in args:
-#      ans = [x+[y] for x in ans for y in arg]
-#    return ans
+    def __init__(self, *sets, **kwds):
+        self.flatten = kwds.pop('flatten', False)
+        if kwds:
+            raise ValueError("Unexpected keyword options: %s" %
+                             ', '.join(sorted(kwds.keys())))
+        if self.flatten:
+            self._sets = tuple(_flat_values(s) for s in sets)
+            self._join = _join if len(sets) <= 8 else _join_many
+        else:
+            self._sets = tuple(tuple(s) for s in sets)
+            self._join = tuple
+        self._radix = tuple(len(s) for s in self._sets)
+        self.size = 1
+        for n in self._radix:
+            self.size *= n
 
-if sys.version_info < (3, 0):
+    def __len__(self):
+        return self.size
 
-    def cross_iter(*sets):
-        """
-        An iterator function that generates a cross product of
-        a set.
+    def _digits(self, index):
+        """Decode an index into the (mixed-radix) index of each set"""
+        digits = [0] * len(self._radix)
+        for i in range(len(self._radix) - 1, -1, -1):
+            index, digits[i] = divmod(index, self._radix[i])
+        return digits
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            if step == 1:
+                return list(self.iter_range(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self.size
+        if (index < 0) or (index >= self.size):
+            raise IndexError("CrossProduct index out of range")
+        return self._join(
+            [s[d] for s, d in zip(self._sets, self._digits(index))])
+
+    def __iter__(self):
+        if self.flatten:
+            return map(self._join, itertools.product(*self._sets))
+        return itertools.product(*self._sets)
 
-        Derived from code developed by Steven Taschuk
+    def iter_range(self, start=0, stop=None):
         """
-        wheels = map(iter, sets)  # wheels like in an odometer
-        digits = [it.next() for it in wheels]
+        Generate the combinations with indices in the range
+        [start, stop).
+        """
+        if stop is None or stop > self.size:
+            stop = self.size
+        if start >= stop:
+            return
+        if not self._sets:
+            yield ()
+            return
+        sets = self._sets
+        last = sets[-1]
+        nlast = len(last)
+        digits = self._digits(start)
+        count = stop - start
         while True:
-            yield tuple(digits[:])
-            for i in xrange(len(digits) - 1, -1, -1):
-                try:
-                    digits[i] = wheels[i].next()
+            # The last set varies fastest, so iterate over it directly
+            prefix = [s[d] for s, d in zip(sets[:-1], digits[:-1])]
+            first = digits[-1]
+            end = min(nlast, first + count)
+            for val in last[first:end]:
+                prefix.append(val)
+                yield self._join(prefix)
+                prefix.pop()
+            count -= end - first
+            if count <= 0:
+                return
+            digits[-1] = 0
+            for i in range(len(digits) - 2, -1, -1):
+                digits[i] += 1
+                if digits[i] < self._radix[i]:
                     break
-                except StopIteration:
-                    wheels[i] = iter(sets[i])
-                    digits[i] = wheels[i].next()
-            else:
-                break
+                digits[i] = 0
 
-    def flattened_cross_iter(*sets):
+    def chunks(self, n):
         """
-        An iterator function that generates a cross product of
-        a set, and flattens it.
+        Returns a list of at most n (start, stop) index ranges with
+        nearly equal sizes that cover the cross product.
         """
-        wheels = map(iter, sets)  # wheels like in an odometer
-        digits = [it.next() for it in wheels]
-        ndigits = len(digits)
-        while True:
-            yield misc.flatten_tuple(tuple(digits[:]))
-            for i in xrange(ndigits - 1, -1, -1):
-                try:
-                    digits[i] = wheels[i].next()
-                    break
-                except StopIteration:
-                    wheels[i] = iter(sets[i])
-                    digits[i] = wheels[i].next()
-            else:
-                break
+        n = max(1, min(n, self.size))
+        size, extra = divmod(self.size, n)
+        ans = []
+        start = 0
+        for i in range(n):
+            stop = start + size + (1 if i < extra else 0)
+            if stop > start:
+                ans.append((start, stop))
+            start = stop
+        return ans
 
-else:
 
-    def cross_iter(*sets):
-        """
-        An iterator function that generates a cross product of
-        a set.
+def cross(set_tuple):
+    """
+    Returns the cross-product of a tuple of values
+    """
+    return list(itertools.product(*set_tuple))
 
-        Derived from code developed by Steven Taschuk
-        """
-        wheels = list(map(iter, sets))  # wheels like in an odometer
-        digits = [next(it) for it in wheels]
-        while True:
-            yield tuple(digits[:])
-            for i in range(len(digits) - 1, -1, -1):
-                try:
-                    digits[i] = next(wheels[i])
-                    break
-                except StopIteration:
-                    wheels[i] = iter(sets[i])
-                    digits[i] = next(wheels[i])
-            else:
-                break
 
-    def flattened_cross_iter(*sets):
-        """
-        An iterator function that generates a cross product of
-        a set, and flattens it.
-        """
-        wheels = list(map(iter, sets))  # wheels like in an odometer
-        digits = [next(it) for it in wheels]
-        ndigits = len(digits)
-        while True:
-            yield misc.flatten_tuple(tuple(digits[:]))
-            for i in range(ndigits - 1, -1, -1):
-                try:
-                    digits[i] = next(wheels[i])
-                    break
-                except StopIteration:
-                    wheels[i] = iter(sets[i])
-                    digits[i] = next(wheels[i])
-            else:
-                break
+def cross_iter(*sets):
+    """
+    An iterator function that generates a cross product of
+    a set.
+    """
+    return itertools.product(*sets)
+
+
+def flattened_cross_iter(*sets):
+    """
+    An iterator function that generates a cross product of
+    a set, and flattens it.
+    """
+    return iter(CrossProduct(*sets, flatten=True))
@@ -1,9 +1,14 @@
+import array
+import itertools
 import sys
 
-__all__ = ['SparseMapping']
+__all__ = ['SparseMapping', 'ArraySparseMapping']
 
 try:
-    from collections import MutableMapping
+    try:
+        from collections.abc import MutableMapping
+    except ImportError:
+        from collections import MutableMapping
 
     class SparseMapping(MutableMapping):
         """
@@ -42,8 +47,10 @@ try:
             return iter(self._index)
 
         def __getitem__(self, key):
-            if key in self._map:
+            try:
                 return self._map[key]
+            except KeyError:
+                pass
             if not self.default is None and (self._index is None or
                                              key in self._index):
                 return self.default
@@ -118,3 +125,150 @@ except ImportError:
 
         def __copy__(self):
             return SparseMapping(self.default, self)
+
+
+class ArraySparseMapping(SparseMapping):
+    """
+    A SparseMapping for a fixed, ordered index that stores the values in
+    a typed array.
+
+    Each key in the index is mapped to a position in an
+    :class:`array.array`, and a mask records the positions whose values
+    have been set.  This uses much less memory than a dictionary when
+    many of the values are set, and mappings over the same index can
+    share the key positions (see :attr:`positions`).  The values must
+    be numbers that can be stored with the given array typecode, and
+    they are returned as the array stores them (e.g., as floats for the
+    default typecode 'd').
+
+    Setting a key to a value (even the default value) makes it a
+    non-default key; deleting it restores the default value.  An index
+    that is a list or tuple is used without copying it, so it must not
+    be modified.
+    """
+
+    def __init__(self, index, default=None, within=None, typecode='d',
+                 positions=None, *args, **kwds):
+        if isinstance(index, (list, tuple)):
+            keys = index
+        else:
+            keys = tuple(index)
+        if positions is None:
+            positions = dict((key, i) for i, key in enumerate(keys))
+            if len(positions) != len(keys):
+                raise ValueError("The index of an ArraySparseMapping "
+                                 "contains duplicate keys")
+        elif len(positions) != len(keys):
+            raise ValueError("The positions do not match the index")
+        self._index = self._keys = keys
+        #: The mapping from keys to positions in the value array.  This
+        #: can be passed to other mappings with the same index.
+        self.positions = positions
+        self.default = default
+        self.within = within
+        fill = 0 if default is None else default
+        self._values = array.array(typecode, [fill]) * len(keys)
+        self._mask = bytearray(len(keys))
+        self.update(dict(*args, **kwds))
+
+    def nondefault_keys(self):
+        return list(self.nondefault_iter())
+
+    def nondefault_iter(self):
+        return itertools.compress(self._keys, self._mask)
+
+    def __len__(self):
+        if self.default is None:
+            return len(self._mask) - self._mask.count(b'\x00')
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def __iter__(self):
+        if self.default is None:
+            return self.nondefault_iter()
+        return iter(self._keys)
+
+    def _position(self, key):
+        try:
+            return self.positions[key]
+        except (KeyError, TypeError):
+            raise KeyError("Unknown key value: %s" % str(key))
+
+    def __getitem__(self, key):
+        i = self._position(key)
+        if self._mask[i]:
+            return self._values[i]
+        if self.default is None:
+            raise ValueError(
+                "Legal key '%s' specified in SparseMapping, but value is uninitialized and there is no default value"
+                % key)
+        return self.default
+
+    def __setitem__(self, key, value):
+        i = self._position(key)
+        if not self.within is None and not value in self.within:
+            raise ValueError("Bad mapping value: %s" % str(value))
+        self._values[i] = value
+        self._mask[i] = 1
+
+    def set_item(self, key, value):
+        i = self._position(key)
+        self._values[i] = value
+        self._mask[i] = 1
+
+    def __delitem__(self, key):
+        i = self._position(key)
+        if not self._mask[i]:
+            raise KeyError(key)
+        self._mask[i] = 0
+        self._values[i] = 0 if self.default is None else self.default
+
+    def get_values(self, keys):
+        """
+        Returns a list with the value of each key in a sequence.
+        """
+        if not isinstance(keys, (list, tuple)):
+            keys = list(keys)
+        positions = [self._position(key) for key in keys]
+        values = self._values
+        mask = self._mask
+        default = self.default
+        if default is None:
+            for key, i in zip(keys, positions):
+                if not mask[i]:
+                    raise ValueError(
+                        "Legal key '%s' specified in SparseMapping, but value is uninitialized and there is no default value"
+                        % key)
+            return [values[i] for i in positions]
+        return [values[i] if mask[i] else default for i in positions]
+
+    def set_values(self, keys, values):
+        """
+        Sets the values of the keys in a sequence.
+        """
+        if not isinstance(keys, (list, tuple)):
+            keys = list(keys)
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        if len(keys) != len(values):
+            raise ValueError(
+                "Cannot set %d values for %d keys" % (len(values), len(keys)))
+        positions = [self._position(key) for key in keys]
+        if not self.within is None:
+            for value in values:
+                if not value in self.within:
+                    raise ValueError("Bad mapping value: %s" % str(value))
+        store = self._values
+        mask = self._mask
+        for i, value in zip(positions, values):
+            store[i] = value
+            mask[i] = 1
+
+    def __copy__(self):
+        ans = ArraySparseMapping(self._index, self.default, self.within,
+                                 self._values.typecode, self.positions)
+        ans._values[:] = self._values
+        ans._mask[:] = self._mask
+        return ans
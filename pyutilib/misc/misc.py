@@ -15,6 +15,7 @@ import re
 import shutil
 import stat
 import sys
+import time
 import warnings
 
 if (sys.platform[0:3] == "win"):  #pragma:nocover
@@ -60,31 +61,43 @@ def tostr(array):
 def flatten(x):
     """Flatten nested iterables"""
 
-    def _flatten(x, ans_):
-        for el in x:
-            if not type(el) is str and hasattr(el, "__iter__"):
-                # NB: isinstance can be SLOW if it is going to return false,
-                # so we will do one extra hasattr() check that will pretty
-                # much assure that it will be True
-                # NB: we will flatten anything that looks iterable, except strings
-                try:
-                    el_it = iter(el)
-                    _flatten(el_it, ans_)
-                except:
-                    ans_.append(el)
-            else:
-                ans_.append(el)
-
-    # flatten() is really just a recursive routine; however, if we do a
-    # naive recursive call, we end up creating small temporary lists and
-    # throwing them away.  We could add an optional second argument
-    # (like _flatten), but then we need to do an "if ans is None: ans =
-    # []" check.  This dual-function approach appears to be the most
-    # efficient.
+    # NB: isinstance can be SLOW if it is going to return false, so we
+    # will do one extra hasattr() check that will pretty much assure
+    # that it will be True
+    # NB: we will flatten anything that looks iterable, except strings
     if type(x) is str or not hasattr(x, "__iter__"):
         return x
+    #
+    # Iterate with an explicit stack of iterators (and the iterables
+    # they came from), so the nesting depth is not limited by the
+    # recursion limit.  If iterating over a nested iterable fails, then
+    # the iterable is added to the result.
+    #
     ans = []
-    _flatten(x, ans)
+    append = ans.append
+    _iters = [iter(x)]
+    _owners = [None]
+    while _iters:
+        try:
+            for el in _iters[-1]:
+                if not type(el) is str and hasattr(el, "__iter__"):
+                    try:
+                        _iters.append(iter(el))
+                    except:
+                        append(el)
+                        continue
+                    _owners.append(el)
+                    break
+                append(el)
+            else:
+                _iters.pop()
+                _owners.pop()
+        except:
+            owner = _owners.pop()
+            if owner is None:
+                raise
+            _iters.pop()
+            append(owner)
     return ans
 
 
@@ -92,14 +105,23 @@ def flatten_list(x):
     """Flatten nested lists"""
     if type(x) is not list:
         return x
-    x_len = len(x)
-    i = 0
-    while i < x_len:
-        if type(x[i]) is list:
-            x_len += len(x[i]) - 1
-            x[i:i + 1] = x[i]
+    for el in x:
+        if type(el) is list:
+            break
+    else:
+        return x
+    ans = []
+    _stack = [iter(x)]
+    while _stack:
+        for el in _stack[-1]:
+            if type(el) is list:
+                _stack.append(iter(el))
+                break
+            ans.append(el)
         else:
-            i += 1
+            _stack.pop()
+    # The list is flattened in place
+    x[:] = ans
     return x
 
 
@@ -120,15 +142,22 @@ def flatten_tuple(x):
     """ Flatten nested tuples """
     if type(x) is not tuple:
         return x
-    x_len = len(x)
-    i = 0
-    while i < x_len:
-        if type(x[i]) is tuple:
-            x_len += len(x[i]) - 1
-            x = x[:i] + x[i] + x[i + 1:]
+    for el in x:
+        if type(el) is tuple:
+            break
+    else:
+        return x
+    ans = []
+    _stack = [iter(x)]
+    while _stack:
+        for el in _stack[-1]:
+            if type(el) is tuple:
+                _stack.append(iter(el))
+                break
+            ans.append(el)
         else:
-            i += 1
-    return x
+            _stack.pop()
+    return tuple(ans)
 
 
 #
@@ -151,6 +180,8 @@ def rmtree(dir):
 
 
 whitespace_re = re.compile('\s+')
+_quote_special_re = re.compile('[\\\\"\']')
+_quote_end_re = {'"': re.compile('[\\\\"]'), "'": re.compile("[\\\\']")}
 
 
 def quote_split(regex_str, src=None):
@@ -171,32 +202,75 @@ def quote_split(regex_str, src=None):
 
     # We need to figure out where the quoted strings are.  Given that
     # lots of things may be escaped (e.g., '\\\"'), we can only find the
-    # "real" quotes by walking the entire string. <sigh>.
+    # "real" quotes by walking the entire string.  We jump between the
+    # quote and escape characters to find the spans where the string
+    # cannot be split: the contents of quotes (including the closing
+    # quote) and escaped characters.
+    spans = []
+    idx = 0
+    special = _quote_special_re
+    while True:
+        g = special.search(src, idx)
+        if g is None:
+            break
+        idx = g.start()
+        if src[idx] == '\\':
+            spans.append((idx + 1, idx + 2))
+            idx += 2
+            continue
+        quote = src[idx]
+        begin = idx + 1
+        while True:
+            g = _quote_end_re[quote].search(src, idx + 1)
+            if g is None:
+                raise ValueError(
+                    "ERROR: unterminated quotation found in quote_split()")
+            idx = g.start()
+            if src[idx] == '\\':
+                # Skip the escaped character
+                idx += 1
+                continue
+            break
+        idx += 1
+        spans.append((begin, idx))
+
+    # Split the string where the separator matches outside of the
+    # spans.  Patterns that depend on the preceding text (e.g., anchors
+    # and lookbehinds) are matched against the remainder of the string.
+    pattern = getattr(regex, 'pattern', '')
+    context_free = isinstance(pattern, str) and \
+        not any(tok in pattern for tok in ('^', '\\A', '\\b', '\\B', '(?<'))
+    n = len(src)
     tokens = []
     start = 0
-    inQuote = ''
-    escaping = False
-    for idx, char in enumerate(src):
-        if escaping:
-            escaping = False
-        elif char == inQuote:
-            inQuote = ''
+    pos = 0
+    k = 0
+    nspans = len(spans)
+    while pos < n:
+        if context_free:
+            g = regex.search(src, pos)
+            if g is None:
+                break
+            idx = g.start()
+            end = g.end()
         else:
-            if not inQuote and start <= idx:
-                g = regex.match(src[idx:])
-                if g:
-                    tokens.append(src[start:idx])
-                    start = idx + len(g.group())
-                    # NB: we still want to parse the remainder of the patern
-                    # for things like escape characters so that we correctly
-                    # parse the entire source string; hence, no 'elif'
-            if char == '\\':
-                escaping = True
-            elif not inQuote and (char == '"' or char == "'"):
-                inQuote = char
-
-    if inQuote:
-        raise ValueError("ERROR: unterminated quotation found in quote_split()")
+            g = regex.match(src[pos:])
+            idx = pos
+            if g is not None:
+                end = pos + len(g.group())
+        if idx >= n:
+            break
+        while k < nspans and spans[k][1] <= idx:
+            k += 1
+        if k < nspans and spans[k][0] <= idx:
+            pos = spans[k][1]
+            continue
+        if g is None:
+            pos += 1
+            continue
+        tokens.append(src[start:idx])
+        start = end
+        pos = end if end > idx else idx + 1
 
     tokens.append(src[start:])
     return tokens
@@ -253,6 +327,59 @@ def find_files(directory, *args):
                     yield filename
 
 
+#
+# Caches used by search_file().  The directory listings are keyed by the
+# directory name, and the search results are keyed by the search
+# arguments.  Both are checked against the status (modification time,
+# size and mode) of the directories and files that were examined before
+# they are reused.  Entries that were modified less than
+# _search_racy_window seconds ago are not cached, since later changes
+# may not change their modification times.
+#
+_search_dir_cache = {}
+_search_file_cache = {}
+_search_racy_window = 2.0
+_search_case_insensitive = sys.platform in ('win32', 'cygwin', 'darwin')
+
+
+def _stat_signature(path):
+    """
+    Returns a tuple (signature, settled) for a path, where the signature
+    is None if the path does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, True
+    signature = (getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size,
+                 st.st_mode)
+    return signature, st.st_mtime < time.time() - _search_racy_window
+
+
+def _search_dir_names(path, signature, settled):
+    """Returns the (normalized) names of the files in a directory"""
+    entry = _search_dir_cache.get(path)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+    try:
+        names = os.listdir(path)
+    except OSError:
+        names = ()
+    if _search_case_insensitive:
+        names = frozenset(name.lower() for name in names)
+    else:
+        names = frozenset(names)
+    if settled:
+        _search_dir_cache[path] = (signature, names)
+    return names
+
+
+def clear_search_cache():
+    """Clear the cached directory listings and results of search_file()"""
+    _search_dir_cache.clear()
+    _search_file_cache.clear()
+
+
 def search_file(filename,
                 search_path=None,
                 implicitExt=executable_extension,
@@ -271,6 +398,11 @@ def search_file(filename,
            implicit extension in the filename
        executable - Test if the file is an executable (default=False)
        isfile - Test if the file is a file (default=True)
+
+    The results are cached, and a cached result is reused while the
+    directories that were searched and the files that were examined are
+    unchanged.  Results are not cached if a validate function is
+    specified, since the function may depend on more than the file.
     """
     if search_path is None:
         #
@@ -283,15 +415,58 @@ def search_file(filename,
     else:
         if isinstance(search_path, six.string_types):
             search_path = (search_path,)
+    search_path = tuple(search_path)
+
+    if validate is None:
+        key = (filename, search_path, implicitExt, executable, isfile)
+        entry = _search_file_cache.get(key)
+    else:
+        key = None
+        entry = None
+    if entry is not None:
+        for path, signature in entry[1]:
+            if _stat_signature(path)[0] != signature:
+                break
+        else:
+            return entry[0]
+
+    # Directory listings are only used for plain file names in absolute
+    # directories; relative directories depend on the working directory.
+    plain = os.path.basename(filename) == filename
+    cacheable = key is not None
+    examined = []
     for path in search_path:
-        for ext in ('', implicitExt):
-            test_fname = os.path.join(path, filename + ext)
+        if plain and os.path.isabs(path):
+            signature, settled = _stat_signature(path)
+            examined.append((path, signature))
+            cacheable = cacheable and settled
+            if signature is None:
+                continue
+            names = _search_dir_names(path, signature, settled)
+            candidates = []
+            for ext in ('', implicitExt):
+                name = filename + ext
+                if (name.lower() if _search_case_insensitive else name) in names:
+                    candidates.append(name)
+        else:
+            cacheable = False
+            candidates = (filename, filename + implicitExt)
+        for name in candidates:
+            test_fname = os.path.join(path, name)
+            if cacheable:
+                signature, settled = _stat_signature(test_fname)
+                examined.append((test_fname, signature))
+                cacheable = settled
             if os.path.exists(test_fname) \
                    and (not isfile or os.path.isfile(test_fname)) \
                    and (not executable or os.access(test_fname, os.X_OK)):
                 file = os.path.abspath(test_fname)
                 if validate is None or validate(file):
+                    if cacheable:
+                        _search_file_cache[key] = (file, tuple(examined))
                     return file
+    if cacheable:
+        _search_file_cache[key] = (None, tuple(examined))
     return None
 
 
@@ -329,6 +504,19 @@ class Bunch(dict):
         self.__dict__.update(kw)
 
 
+def _parse_container_args(args, kw):
+    # Add the 'name=value' items in the argument strings to kw
+    for arg in args:
+        for item in quote_split('[ \t]+', arg):
+            r = item.find('=')
+            if r != -1:
+                try:
+                    val = eval(item[r + 1:])
+                except:
+                    val = item[r + 1:]
+                kw[item[:r]] = val
+
+
 class Container(dict):
     """
     A generalization of Bunch.  This class allows all other attributes to have a
@@ -337,15 +525,7 @@ class Container(dict):
     """
 
     def __init__(self, *args, **kw):
-        for arg in args:
-            for item in quote_split('[ \t]+', arg):
-                r = item.find('=')
-                if r != -1:
-                    try:
-                        val = eval(item[r + 1:])
-                    except:
-                        val = item[r + 1:]
-                    kw[item[:r]] = val
+        _parse_container_args(args, kw)
         dict.__init__(self, kw)
         self.__dict__.update(kw)
         if not '_name_' in kw:
@@ -391,7 +571,7 @@ class Container(dict):
     def __getattr__(self, name):
         try:
             return dict.__getitem__(self, name)
-        except:
+        except KeyError:
             if name[0] == '_':
                 raise AttributeError("Unknown attribute %s" % name)
         return None
@@ -405,30 +585,34 @@ class Container(dict):
         return self.as_string()
 
     def __str__(self, nesting=0, indent=''):
-        attrs = []
-        indentation = indent + "    " * nesting
-        for k, v in self.__dict__.items():
-            if not k.startswith("_"):
-                text = [indentation, k, ":"]
-                if isinstance(v, Container):
-                    if len(v) > 0:
-                        text.append('\n')
-                    text.append(v.__str__(nesting + 1))
-                elif isinstance(v, list):
-                    if len(v) == 0:
-                        text.append(' []')
-                    else:
-                        for v_ in v:
-                            text.append('\n' + indentation + "-")
-                            if isinstance(v_, Container):
-                                text.append('\n' + v_.__str__(nesting + 1))
-                            else:
-                                text.append(" " + repr(v_))
+        return _container_str(self.__dict__.items(), nesting, indent)
+
+
+def _container_str(items, nesting, indent):
+    attrs = []
+    indentation = indent + "    " * nesting
+    for k, v in items:
+        if not k.startswith("_"):
+            text = [indentation, k, ":"]
+            if isinstance(v, (Container, LightContainer)):
+                if len(v) > 0:
+                    text.append('\n')
+                text.append(v.__str__(nesting + 1))
+            elif isinstance(v, list):
+                if len(v) == 0:
+                    text.append(' []')
                 else:
-                    text.append(' ' + repr(v))
-                attrs.append("".join(text))
-        attrs.sort()
-        return "\n".join(attrs)
+                    for v_ in v:
+                        text.append('\n' + indentation + "-")
+                        if isinstance(v_, (Container, LightContainer)):
+                            text.append('\n' + v_.__str__(nesting + 1))
+                        else:
+                            text.append(" " + repr(v_))
+            else:
+                text.append(' ' + repr(v))
+            attrs.append("".join(text))
+    attrs.sort()
+    return "\n".join(attrs)
 
 
 class Options(Container):
@@ -443,6 +627,168 @@ class Options(Container):
         self.set_name('Options')
 
 
+_dict_get = dict.get
+_object_getattribute = object.__getattribute__
+_missing = object()
+
+
+class LightContainer(dict):
+    """
+    A variant of Container that stores each attribute once.
+
+    The dictionary is also the instance dictionary, so public attributes
+    (those that do not start with '_') are read without calling Python
+    code.  Dictionaries that are added with :func:`update` (also in
+    lists) are stored as LightContainer objects that convert their own
+    nested dictionaries when they are first used.  Like Container, a
+    missing public attribute is None, and update() copies lists.
+
+    The only private attributes are those declared in __slots__ (by
+    this class, '_name_').  Since the instance dictionary refers to the
+    object itself, the objects are freed by the garbage collector.
+    """
+
+    __slots__ = ('__dict__', '_name_')
+
+    def __init__(self, *args, **kw):
+        _parse_container_args(args, kw)
+        dict.__init__(self, kw)
+        object.__setattr__(self, '__dict__', self)
+        object.__setattr__(self, '_name_',
+                           kw.get('_name_', self.__class__.__name__))
+
+    def update(self, d):
+        """
+        The update is specialized for JSON-like data.  Dictionaries, and
+        the dictionaries in lists, are replaced with LightContainer
+        objects.  Their nested dictionaries are converted when they are
+        first used.
+        """
+        setattr_ = LightContainer.__setattr__
+        for k in d:
+            setattr_(self, k, _light_value(d[k]))
+
+    def set_name(self, name):
+        object.__setattr__(self, '_name_', name)
+
+    def __getattr__(self, name):
+        if name[0] == '_':
+            raise AttributeError("Unknown attribute %s" % name)
+        return None
+
+    def __getitem__(self, name):
+        val = _dict_get(self, name, _missing)
+        if val is _missing:
+            return LightContainer.__getattr__(self, name)
+        return val
+
+    def __setattr__(self, name, val):
+        if name[0] != '_':
+            dict.__setitem__(self, name, val)
+        elif name == '_name_':
+            object.__setattr__(self, name, val)
+        else:
+            raise AttributeError("Cannot set the private attribute %s of "
+                                 "a LightContainer" % name)
+
+    __setitem__ = __setattr__
+
+    def __delattr__(self, name):
+        if name[0] == '_':
+            object.__delattr__(self, name)
+            return
+        try:
+            dict.__delitem__(self, name)
+        except KeyError:
+            raise AttributeError("Unknown attribute %s" % name)
+
+    def __reduce__(self):
+        return (self.__class__, (), (self._name_, dict(self)))
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '_name_', state[0])
+        dict.clear(self)
+        LightContainer.update(self, state[1])
+
+    def __repr__(self):
+        attrs = sorted("%s = %r" % (k, v) for k, v in dict.items(self))
+        return "%s(%s)" % (self.__class__.__name__, ", ".join(attrs))
+
+    def __str__(self, nesting=0, indent=''):
+        return _container_str(dict.items(self), nesting, indent)
+
+
+class _LazyLightContainer(LightContainer):
+    """
+    A LightContainer whose values are still the values of a dictionary
+    that was added with update().  When the container is first used,
+    its values are converted and the class of the object is changed to
+    LightContainer, so later uses cost nothing.  Uses that only need
+    the keys (e.g. len() and iteration) or the values as they are (e.g.
+    json.dumps() and comparisons) do not convert the values.
+    """
+
+    __slots__ = ()
+
+    def _fill(self):
+        object.__setattr__(self, '__class__', LightContainer)
+        for k, v in list(dict.items(self)):
+            dict.__setitem__(self, k, _light_value(v))
+
+    def __getattribute__(self, name):
+        _LazyLightContainer._fill(self)
+        return _object_getattribute(self, name)
+
+    def __getitem__(self, name):
+        _LazyLightContainer._fill(self)
+        return LightContainer.__getitem__(self, name)
+
+    def __setattr__(self, name, val):
+        _LazyLightContainer._fill(self)
+        LightContainer.__setattr__(self, name, val)
+
+    __setitem__ = __setattr__
+
+    def __delattr__(self, name):
+        _LazyLightContainer._fill(self)
+        LightContainer.__delattr__(self, name)
+
+    def __repr__(self):
+        _LazyLightContainer._fill(self)
+        return LightContainer.__repr__(self)
+
+    def __str__(self, nesting=0, indent=''):
+        _LazyLightContainer._fill(self)
+        return LightContainer.__str__(self, nesting, indent)
+
+
+def _light_value(val):
+    """
+    Returns the value that LightContainer.update() stores for a value.
+    """
+    if type(val) is dict:
+        ans = dict.__new__(_LazyLightContainer)
+        dict.update(ans, val)
+        object.__setattr__(ans, '__dict__', ans)
+        object.__setattr__(ans, '_name_', 'LightContainer')
+        return ans
+    if type(val) is list:
+        return [_light_value(i) if type(i) is dict else i for i in val]
+    return val
+
+
+class LightOptions(LightContainer):
+    """
+    A variant of Options based on LightContainer.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kw):
+        LightContainer.__init__(self, *args, **kw)
+        object.__setattr__(self, '_name_', 'Options')
+
+
 def create_hardlink(src, dst):
     """
     Create a hard link where dst points to src.
@@ -6,17 +6,26 @@
 #
 
 __all__ = ['yaml_fix', 'json_fix', 'load_yaml', 'load_json', 'extract_subtext',
-           'compare_repn', 'compare_strings', 'compare_yaml_files',
-           'compare_json_files', 'simple_yaml_parser']
+           'compare_repn', 'find_repn_difference', 'RepnDifference',
+           'compare_strings', 'compare_yaml_files',
+           'compare_json_files', 'simple_yaml_parser', 'load_repn_file',
+           'set_baseline_cache_dir']
 
+import ast
+import bisect
+import hashlib
+import os
 import pprint
 import math
 import re
 import sys
+import tempfile
 try:
     unicode
 except:
     basestring = str
+if sys.version_info >= (3, 0):
+    xrange = range
 try:  # pragma no cover
     from collections import OrderedDict
 except ImportError:  # pragma no cover
@@ -25,6 +34,10 @@ try:
     from StringIO import StringIO
 except:
     from io import StringIO
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 try:
     import json
     json_available = True
@@ -38,79 +51,209 @@ except:  #pragma:nocover
 from pyutilib.misc.comparison import open_possibly_compressed_file
 
 
+_int_p = re.compile(r'[-+]?\d+\Z')
+_number_chars = frozenset('0123456789+-.iInN')
+_literal_chars = frozenset('[({\'"')
+_constants = {'True': True, 'False': False, 'None': None}
+
+
+def _is_complex_literal(node):
+    """
+    Returns True if a BinOp node is a complex number (e.g. 1+2j), which
+    ast.literal_eval() accepts in all Python versions.
+    """
+    if not isinstance(node.op, (ast.Add, ast.Sub)):
+        return False
+    left = node.left
+    if isinstance(left, ast.UnaryOp):
+        left = left.operand
+    return isinstance(_number(left), (int, float)) and \
+        isinstance(_number(node.right), complex)
+
+
+def _number(node):
+    """Returns the value of a number node, or None"""
+    if hasattr(node, 'value'):
+        # ast.Constant (Python 3.8+)
+        return node.value
+    return getattr(node, 'n', None)
+
+
+def _literal_eval(tmp):
+    """
+    Evaluate a Python literal.  ast.literal_eval() evaluates arithmetic
+    (e.g. 1+2) in some Python versions, so the expressions other than
+    complex numbers are rejected.
+    """
+    tree = ast.parse(tmp, mode='eval')
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp) and not _is_complex_literal(node):
+            raise ValueError("Not a literal: %s" % tmp)
+    return ast.literal_eval(tree)
+
+
 def yaml_eval(str):
+    """
+    Convert a scalar string to an int, float, bool, None or Python
+    literal.  If the string cannot be converted, then it is returned
+    unchanged.  Unlike eval(), only literal values are accepted.
+    """
+    if not isinstance(str, basestring):
+        return str
+    tmp = str.strip()
+    if not tmp:
+        return str
+    c = tmp[0]
+    if c in _number_chars:
+        if _int_p.match(tmp):
+            return int(tmp)
+        if '_' in tmp:
+            # Python 3.6+ accepts underscores in integer literals
+            try:
+                return int(tmp)
+            except ValueError:
+                pass
+        try:
+            return float(tmp)
+        except ValueError:
+            pass
+        if tmp in _constants:
+            return _constants[tmp]
+    elif tmp in _constants:
+        return _constants[tmp]
+    elif c not in _literal_chars:
+        return str
+    #
+    # Other literals (e.g. quoted strings, lists and hex values)
+    #
     try:
-        val = int(str)
-        return val
-    except:
-        pass
-    try:
-        val = float(str)
-        return val
-    except:
-        pass
-    try:
-        val = eval(str)
-        return val
-    except:
-        pass
-    return str
+        return _literal_eval(tmp)
+    except Exception:
+        return str
 
 
-def recursive_yaml_parser(stream, _depth=-1):
-    depth = -1
-    data = None
-    for Line in stream:
-        line = Line
-        flag = True
-        while flag:
-            flag = False
-            if line.strip() == '':
-                continue
-            if line.strip() == '---':
-                continue
-            if line.strip() == '...':
+def _yaml_tokens(stream):
+    """
+    Generate the (lineno, indent, is_item, key, value) tuples for the
+    non-empty lines in a stream.
+    """
+    lineno = 0
+    for line in stream:
+        lineno += 1
+        content = line.lstrip(' ')
+        tmp = content.rstrip()
+        if not tmp or tmp == '---' or tmp == '...' or tmp[0] == '#':
+            continue
+        indent = len(line) - len(content)
+        if tmp[0] == '-':
+            yield lineno, indent, True, None, tmp[1:].strip()
+        else:
+            key, sep, value = tmp.partition(':')
+            if not sep:
+                raise ValueError(
+                    "Line %d: expected a mapping entry or list item: %s" %
+                    (lineno, tmp))
+            yield lineno, indent, False, key.strip(), value.strip()
+
+
+def _yaml_entries(stream):
+    """
+    Parse a simple YAML stream, and generate the (key, value) tuples for
+    the top-level entries.  The key is the list index for top-level list
+    items.  Entries are generated as soon as they have been parsed.
+    """
+    #
+    # Each frame is [parent_indent, indent, data, container, key].  The
+    # indent is set by the first line in the block, and the value of a
+    # block is stored in container[key] when the block is complete.  The
+    # root frame has no data, since its entries are generated.
+    #
+    root = [-1, -1, None, None, None]
+    stack = [root]
+    count = 0
+    for lineno, d, is_item, key, value in _yaml_tokens(stream):
+        while True:
+            frame = stack[-1]
+            if frame[1] == -1:
+                if d > frame[0]:
+                    frame[1] = d
+                    break
+            elif d >= frame[1]:
                 break
-            d = 0
-            while d < len(line) and line[d] == ' ':
-                d += 1
-            if line[d] == '#':
-                continue
-            if depth == -1:
-                if d <= _depth:
-                    return None, line
-                depth = d
-            #if d >= depth:
-            #depth = d
-            if d < depth:
-                return data, line
-            if d >= depth:
-                if line[d] == '-':
-                    if data is None:
-                        data = []
-                    value = line[d + 1:].strip()
-                    if len(value) > 0:
-                        data.append(yaml_eval(value))
-                    else:
-                        value, line = recursive_yaml_parser(stream, d)
-                        flag = True
-                        data.append(value)
-                else:
-                    if data is None:
-                        data = {}
-                    tokens = line.split(':')
-                    key = tokens[0].strip()
-                    value = tokens[1].strip()
-                    if len(value) > 0:
-                        data[key] = yaml_eval(value)
-                    else:
-                        value, line = recursive_yaml_parser(stream, d)
-                        flag = True
-                        data[key] = value
-    return data, line
-
-
-def simple_yaml_parser(stream):
+            if frame is root:
+                # Lines after the end of the top-level block are ignored
+                return
+            stack.pop()
+            if frame[3] is None:
+                yield frame[4], frame[2]
+            else:
+                frame[3][frame[4]] = frame[2]
+        kind = list if is_item else dict
+        data = frame[2]
+        if frame is root:
+            if data is None:
+                frame[2] = kind
+            elif data is not kind:
+                raise ValueError(
+                    "Line %d: cannot mix list items and mapping entries" %
+                    (lineno,))
+            container = None
+            if is_item:
+                key = count
+                count += 1
+        else:
+            if data is None:
+                data = frame[2] = kind()
+            elif type(data) is not kind:
+                raise ValueError(
+                    "Line %d: cannot mix list items and mapping entries" %
+                    (lineno,))
+            container = data
+            if is_item:
+                key = len(data)
+                data.append(None)
+        if value:
+            if container is None:
+                yield key, yaml_eval(value)
+            else:
+                container[key] = yaml_eval(value)
+        else:
+            if container is not None:
+                container[key] = None
+            stack.append([d, -1, None, container, key])
+    while len(stack) > 1:
+        frame = stack.pop()
+        if frame[3] is None:
+            yield frame[4], frame[2]
+        else:
+            frame[3][frame[4]] = frame[2]
+
+
+def recursive_yaml_parser(stream):
+    data = None
+    for key, value in _yaml_entries(stream):
+        if data is None:
+            data = [] if type(key) is int else {}
+        if type(data) is list:
+            data.append(value)
+        else:
+            data[key] = value
+    return data, None
+
+
+def simple_yaml_parser(stream, iterate=False):
+    """
+    Parse a simple subset of YAML: nested mappings and lists in block
+    style, with scalar values.  The stream may be a file object or a
+    filename.
+
+    If 'iterate' is True, then a generator is returned that yields the
+    (key, value) tuples for the top-level entries as they are parsed,
+    without building the entire data representation.  The key is the
+    list index if the top-level block is a list.
+    """
+    if iterate:
+        return _iterate_yaml(stream)
     if isinstance(stream, basestring):
         _stream = open_possibly_compressed_file(stream)
         repn = recursive_yaml_parser(_stream)[0]
@@ -119,6 +262,19 @@ def simple_yaml_parser(stream):
     return recursive_yaml_parser(stream)[0]
 
 
+def _iterate_yaml(stream):
+    if isinstance(stream, basestring):
+        _stream = open_possibly_compressed_file(stream)
+        try:
+            for entry in _yaml_entries(_stream):
+                yield entry
+        finally:
+            _stream.close()
+    else:
+        for entry in _yaml_entries(stream):
+            yield entry
+
+
 def yaml_fix(val):
     if not isinstance(val, basestring):
         return val
@@ -139,13 +295,14 @@ def extract_subtext(stream, begin_str='', end_str=None, comment='#'):
     ans = []
     status = len(begin_str) == 0
     for line in _stream:
-        tokens = re.split('[\t ]+', line.strip())
         if not status and line.startswith(begin_str):
             status = True
         elif not end_str is None and end_str != '' and line.startswith(end_str):
             break
         elif status:
-            if tokens[0] != comment:
+            tmp = line.strip()
+            if not tmp.startswith(comment) or \
+               re.split('[\t ]+', tmp)[0] != comment:
                 ans.append(line)
     if isinstance(stream, basestring):
         _stream.close()
@@ -213,113 +370,347 @@ def load_json(str):
 
     # Use specialized decoders because JSON returns UNICODE strings,
     # regardless of what string was originally encoded.  We convert 
-    # all unicode back to plain str.
+    # all unicode back to plain str.  This is not needed in Python 3,
+    # where the decoder already returns str objects.
+    if sys.version_info >= (3, 0):
+        return json.loads(str)
     return json.loads(str, object_hook=_to_dict)
 
 
+_numeric_types = (int, float)
+_mapping_types = (dict, OrderedDict)
+
+
+class RepnDifference(object):
+    """
+    A description of the first difference found by
+    find_repn_difference().
+
+    The 'kind' attribute is one of 'type', 'list_length',
+    'list_longer', 'list_item', 'keys', 'missing_key', 'float' or
+    'value'.  The error message is only formatted when message() is
+    called, and it only includes the values at the point where the
+    difference was found.
+    """
+
+    __slots__ = ('kind', 'prefix', 'path', 'baseline', 'output', 'key',
+                 'tolerance', 'detail')
+
+    def __init__(self,
+                 kind,
+                 prefix,
+                 path,
+                 baseline,
+                 output,
+                 key=None,
+                 tolerance=None,
+                 detail=None):
+        self.kind = kind
+        self.prefix = prefix
+        self.path = path
+        self.baseline = baseline
+        self.output = output
+        self.key = key
+        self.tolerance = tolerance
+        self.detail = detail
+
+    def location(self):
+        """Return the string representation of the path to this difference"""
+        names = []
+        node = self.path
+        while node is not None:
+            parent, key, is_index = node[:3]
+            if is_index:
+                names.append("[" + str(key) + "]")
+            else:
+                names.append("." + str(key))
+            node = parent
+        names.append(self.prefix)
+        names.reverse()
+        return "".join(names)
+
+    def message(self):
+        where = self.location()
+        if self.kind == 'type':
+            return "(%s) Structural difference:\nbaseline:\n%s\noutput:\n%s" % (
+                where, pprint.pformat(self.baseline),
+                pprint.pformat(self.output))
+        elif self.kind == 'list_length':
+            return "(%s) Baseline list length does not equal output list: " \
+                   "%d != %d" % (where, len(self.baseline), len(self.output))
+        elif self.kind == 'list_longer':
+            return "(%s) Baseline has longer list than output: %d > %d" % (
+                where, len(self.baseline), len(self.output))
+        elif self.kind == 'list_item':
+            if self.detail is None:
+                error = "No output item has a matching type"
+            else:
+                error = self.detail.message()
+            return "(%s) Could not find item %d in output list:\n" \
+                   "baseline item:\n%s\nERROR: %s" % (
+                       where, self.key, pprint.pformat(self.baseline[self.key]),
+                       error)
+        elif self.kind == 'keys':
+            return "(%s) Baseline and output have different keys:\n" \
+                   "missing from output:\n%s\nnot in baseline:\n%s" % (
+                       where,
+                       pprint.pformat(_ordered_difference(self.baseline,
+                                                          self.output)),
+                       pprint.pformat(_ordered_difference(self.output,
+                                                          self.baseline)))
+        elif self.kind == 'missing_key':
+            return "(%s) Baseline key %s that does not exist in output:\n" \
+                   "output keys:\n%s" % (where, self.key,
+                                         pprint.pformat(list(self.output)))
+        elif self.kind == 'float':
+            return "(%s) Floating point values differ: baseline=%.17g and " \
+                   "output=%.17g (tolerance=%.17g)" % (
+                       where, self.baseline, self.output, self.tolerance)
+        else:
+            return "(%s) Values differ:\nbaseline:\n%s\noutput:\n%s" % (
+                where, pprint.pformat(self.baseline),
+                pprint.pformat(self.output))
+
+    def exception(self):
+        """Return the exception that compare_repn() raises for this difference"""
+        if self.kind in ('float', 'value'):
+            return ValueError(self.message())
+        return IOError(self.message())
+
+    def __str__(self):
+        return self.message()
+
+
+def _ordered_difference(a, b):
+    missing = set(a).difference(b)
+    return [key for key in a if key in missing]
+
+
+class _MissingKey(object):
+    """A placeholder for a baseline key that is missing in the output"""
+
+    __slots__ = ('baseline', 'output')
+
+    def __init__(self, baseline, output):
+        self.baseline = baseline
+        self.output = output
+
+
+class _ListIndex(object):
+    """
+    An index of the positions of the items in an output list, which is
+    used to align baseline items with output items when exact=False
+    without trying every output item.
+    """
+
+    __slots__ = ('by_kind', 'by_value')
+
+    def __init__(self, data):
+        self.by_kind = {}
+        self.by_value = {}
+        for i, val in enumerate(data):
+            val_type = type(val)
+            if val_type in _numeric_types:
+                self.by_kind.setdefault(float, []).append(i)
+                continue
+            self.by_kind.setdefault(val_type, []).append(i)
+            if val_type is list or val_type in _mapping_types:
+                continue
+            try:
+                self.by_value.setdefault((val_type, val), []).append(i)
+            except TypeError:
+                pass
+
+    def candidates(self, item, start):
+        item_type = type(item)
+        if item_type in _numeric_types:
+            positions = self.by_kind.get(float, ())
+        elif item_type is list or item_type in _mapping_types:
+            positions = self.by_kind.get(item_type, ())
+        else:
+            try:
+                positions = self.by_value.get((item_type, item), ())
+            except TypeError:
+                positions = self.by_kind.get(item_type, ())
+        return positions[bisect.bisect_left(positions, start):]
+
+
+def _match_list(baseline, output, tolerance, prefix, path):
+    """
+    Verify that the baseline list is an ordered subsequence of the
+    output list.  Baseline items are matched greedily with the first
+    matching output item that follows the previous match.
+    """
+    if len(baseline) > len(output):
+        return RepnDifference('list_longer', prefix, path, baseline, output)
+    index = _ListIndex(output)
+    i = 0
+    for j, item in enumerate(baseline):
+        item_type = type(item)
+        item_keys = None
+        if item_type in _mapping_types:
+            item_keys = set(item)
+        last = None
+        match = None
+        for p in index.candidates(item, i):
+            val = output[p]
+            last = p
+            if item_type in _numeric_types:
+                if item_type is float or type(val) is float:
+                    if tolerance is None or \
+                       math.fabs(item - val) <= tolerance:
+                        match = p
+                        break
+                elif item == val:
+                    match = p
+                    break
+            elif item_type is list or item_keys is not None:
+                if item_keys is not None and item_keys.difference(val):
+                    continue
+                if _find_difference(item, val, tolerance, prefix,
+                                    (path, p, True, None), False) is None:
+                    match = p
+                    break
+            elif item == val:
+                match = p
+                break
+        if match is None:
+            detail = None
+            if last is not None:
+                detail = _find_difference(item, output[last], tolerance,
+                                          prefix, (path, last, True, None),
+                                          False)
+            return RepnDifference(
+                'list_item', prefix, path, baseline, output, key=j,
+                detail=detail)
+        i = match + 1
+    return None
+
+
+def _find_difference(baseline, output, tolerance, prefix, root, exact):
+    #
+    # Each stack entry is (baseline, output, path), where the path is a
+    # linked list of (parent, key, is_index, baseline_list) nodes.  The
+    # path string is only constructed if a difference is reported.
+    #
+    stack = [(baseline, output, root)]
+    while stack:
+        b, o, path = stack.pop()
+        ans = None
+        b_type = type(b)
+        o_type = type(o)
+        if b_type is _MissingKey:
+            key = _ordered_difference(b.baseline, b.output)[0]
+            ans = RepnDifference('missing_key', prefix, path, b.baseline,
+                                 b.output, key=key)
+        elif b_type is not o_type and not (b_type in _numeric_types and
+                                           o_type in _numeric_types):
+            ans = RepnDifference('type', prefix, path, b, o)
+        elif b_type is list:
+            if not exact:
+                ans = _match_list(b, o, tolerance, prefix, path)
+            elif len(b) != len(o):
+                ans = RepnDifference('list_length', prefix, path, b, o)
+            else:
+                for i in xrange(len(b) - 1, -1, -1):
+                    stack.append((b[i], o[i], (path, i, True, b)))
+        elif b_type in _mapping_types:
+            if exact and len(b) != len(o):
+                ans = RepnDifference('keys', prefix, path, b, o)
+            else:
+                keys = list(b)
+                if set(b).difference(o):
+                    #
+                    # Values for the keys before the first missing key
+                    # are compared before the missing key is reported.
+                    #
+                    keys = keys[:keys.index(_ordered_difference(b, o)[0])]
+                    stack.append((_MissingKey(b, o), None, path))
+                keys.reverse()
+                for key in keys:
+                    stack.append((b[key], o[key], (path, key, False, None)))
+        elif b_type is float or o_type is float:
+            if tolerance is not None and math.fabs(b - o) > tolerance:
+                ans = RepnDifference(
+                    'float', prefix, path, b, o, tolerance=tolerance)
+        elif b != o:
+            ans = RepnDifference('value', prefix, path, b, o)
+        if ans is None:
+            continue
+        #
+        # Differences within items of exact lists are reported as
+        # missing list items, for each enclosing list.
+        #
+        while path is not root:
+            parent, key, is_index, container = path
+            if container is not None:
+                ans = RepnDifference(
+                    'list_item', prefix, parent, container, None, key=key,
+                    detail=ans)
+            path = parent
+        return ans
+    return None
+
+
+def find_repn_difference(baseline,
+                         output,
+                         tolerance=0.0,
+                         prefix="<root>",
+                         exact=True):
+    """
+    Compare two data representations (e.g. loaded from YAML or JSON),
+    and return a RepnDifference object describing the first difference
+    that is found.  If the representations match, then return None.
+
+    If 'exact' is False, then the baseline may be a subset of the
+    output:  dictionaries in the output may have additional keys, and
+    lists in the baseline must appear as an ordered subsequence of the
+    output lists.  Numeric values are compared within the specified
+    tolerance if either of them is a float.
+    """
+    return _find_difference(baseline, output, tolerance, prefix, None, exact)
+
+
 def compare_repn(baseline,
                  output,
                  tolerance=0.0,
                  prefix="<root>",
                  exact=True,
                  using_yaml=True):
-    if type(baseline) != type(output) and not (
-            type(baseline) in [int, float] and type(output) in [int, float]):
-        raise IOError(
-            "(%s) Structural difference:\nbaseline:\n%s\noutput:\n%s" %
-            (prefix, pprint.pformat(baseline), pprint.pformat(output)))
-    #
-    if type(baseline) is list:
-        if not exact and len(baseline) > len(output):
-            raise IOError(
-                "(%s) Baseline has longer list than output:\nbaseline:\n%s\noutput:\n%s"
-                % (prefix, pprint.pformat(baseline), pprint.pformat(output)))
-        if exact and len(baseline) != len(output):
-            raise IOError(
-                "(%s) Baseline list length does not equal output list:\nbaseline:\n%s\noutput:\n%s"
-                % (prefix, pprint.pformat(baseline), pprint.pformat(output)))
-        j = 0
-        i = 0
-        msg = ''
-        while j < len(baseline) and i < len(output):
-            try:
-                compare_repn(
-                    baseline[j],
-                    output[i],
-                    tolerance=tolerance,
-                    prefix=prefix + "[" + str(i) + "]",
-                    exact=exact,
-                    using_yaml=using_yaml)
-                j += 1
-            except Exception:
-                msg = sys.exc_info()[1]
-                print(msg)
-                pass
-            i += 1
-        if j < len(baseline):
-            raise IOError(
-                "(%s) Could not find item %d in output list:\nbaseline:\n%s\noutput:\n%s\nERROR: %s"
-                % (prefix, j, pprint.pformat(baseline), pprint.pformat(output),
-                   msg))
-    #
-    elif type(baseline) is dict or type(baseline) is OrderedDict:
-        if exact and len(baseline.keys()) != len(output.keys()):
-            raise IOError(
-                "(%s) Baseline and output have different keys:\nbaseline:\n%s\noutput:\n%s"
-                % (prefix, pprint.pformat(baseline.keys()),
-                   pprint.pformat(output.keys())))
-        for key in baseline:
-            if not key in output:
-                raise IOError(
-                    "(%s) Baseline key %s that does not exist in output:baseline:\n%s\noutput:\n%s"
-                    % (prefix, key, pprint.pformat(baseline.keys()),
-                       pprint.pformat(output.keys())))
-            compare_repn(
-                baseline[key],
-                output[key],
-                tolerance=tolerance,
-                prefix=prefix + "." + str(key),
-                exact=exact,
-                using_yaml=using_yaml)
-    #
-    elif (type(baseline) is float or type(output) is float
-         ) and type(baseline) in [int, float] and type(output) in [int, float]:
-        if not tolerance is None and math.fabs(baseline - output) > tolerance:
-            raise ValueError(
-                "(%s) Floating point values differ: baseline=%.17g and output=%.17g (tolerance=%.17g)"
-                % (prefix, baseline, output, tolerance))
-    elif baseline != output:  #pragma:nocover
-        raise ValueError("(%s) Values differ:\nbaseline:\n%s\noutput:\n%s" % (
-            prefix, pprint.pformat(baseline), pprint.pformat(output)))
+    ans = find_repn_difference(
+        baseline, output, tolerance=tolerance, prefix=prefix, exact=exact)
+    if ans is not None:
+        raise ans.exception()
 
 
-def compare_strings(baseline,
-                    output,
-                    tolerance=0.0,
-                    exact=True,
-                    using_yaml=True):
+def _check_available(using_yaml):
     if using_yaml and not yaml_available:  #pragma:nocover
         raise IOError(
             "Cannot compare YAML strings because YAML is not available")
     if not using_yaml and not json_available:
         raise IOError(
             "Cannot compare JSON strings because JSON is not available")
+
+
+def _load_string(data, using_yaml, label):
     if using_yaml:
-        baseline_repn = load_yaml(baseline)
-        output_repn = load_yaml(output)
-    else:
-        try:
-            baseline_repn = load_json(baseline)
-        except Exception:
-            print("Problem parsing JSON baseline")
-            print(baseline)
-            raise
-        try:
-            output_repn = load_json(output)
-        except Exception:
-            print("Problem parsing JSON output")
-            print(output)
-            raise
+        return load_yaml(data)
+    try:
+        return load_json(data)
+    except Exception:
+        print("Problem parsing JSON %s" % (label,))
+        print(data)
+        raise
+
+
+def compare_strings(baseline,
+                    output,
+                    tolerance=0.0,
+                    exact=True,
+                    using_yaml=True):
+    _check_available(using_yaml)
+    baseline_repn = _load_string(baseline, using_yaml, 'baseline')
+    output_repn = _load_string(output, using_yaml, 'output')
     compare_repn(
         baseline_repn,
         output_repn,
@@ -328,6 +719,98 @@ def compare_strings(baseline,
         using_yaml=using_yaml)
 
 
+#
+# The directory where parsed baseline files are cached.  If this is
+# None, then baselines are parsed every time they are loaded.
+#
+baseline_cache_dir = os.environ.get('PYUTILIB_BASELINE_CACHE', None)
+
+# Increment this when the format of the cached data changes
+_baseline_cache_version = 1
+
+
+def set_baseline_cache_dir(dirname):
+    """
+    Set the directory where parsed baseline files are cached by
+    compare_yaml_files() and compare_json_files().  If dirname is None,
+    then caching is disabled.  The default value is taken from the
+    PYUTILIB_BASELINE_CACHE environment variable.
+    """
+    global baseline_cache_dir
+    baseline_cache_dir = dirname
+
+
+def _read_subtext(fname, begin_str, end_str):
+    INPUT = open_possibly_compressed_file(fname)
+    try:
+        if begin_str == '' and not end_str:
+            #
+            # Read the whole file at once, and only filter comment
+            # lines if the file could contain them.
+            #
+            data = INPUT.read()
+            if '#' in data:
+                data = extract_subtext(StringIO(data))
+            return data
+        return extract_subtext(INPUT, begin_str=begin_str, end_str=end_str)
+    finally:
+        INPUT.close()
+
+
+def load_repn_file(fname,
+                   begin_str='',
+                   end_str='',
+                   using_yaml=True,
+                   cache_dir=None,
+                   label='file'):
+    """
+    Load the YAML or JSON data representation in a file, optionally
+    restricted to the text between begin_str and end_str.
+
+    If cache_dir is not None, then the parsed data is pickled in that
+    directory.  Cached data is reused while the path, modification time
+    and size of the file are unchanged.
+    """
+    _check_available(using_yaml)
+    cache_file = None
+    if cache_dir is not None:
+        try:
+            info = os.stat(fname)
+        except OSError:
+            raise IOError("cannot find file `" + fname + "'")
+        key = repr((_baseline_cache_version, os.path.abspath(fname),
+                    info.st_mtime, info.st_size, begin_str, end_str,
+                    using_yaml, sys.version_info[0]))
+        cache_file = os.path.join(
+            cache_dir,
+            hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pickle')
+        try:
+            with open(cache_file, 'rb') as INPUT:
+                return pickle.load(INPUT)
+        except Exception:
+            pass
+    repn = _load_string(
+        _read_subtext(fname, begin_str, end_str), using_yaml, label)
+    if cache_file is not None:
+        #
+        # Write to a temporary file and then rename it, so concurrent
+        # test processes never see a partially written cache file.
+        #
+        try:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            fd, tmpname = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as OUTPUT:
+                pickle.dump(repn, OUTPUT, pickle.HIGHEST_PROTOCOL)
+            try:
+                os.rename(tmpname, cache_file)
+            except OSError:
+                os.remove(tmpname)
+        except (IOError, OSError, pickle.PicklingError):
+            pass
+    return repn
+
+
 def compare_files(baseline_fname,
                   output_fname,
                   tolerance=0.0,
@@ -337,16 +820,22 @@ def compare_files(baseline_fname,
                   output_end=None,
                   exact=True,
                   using_yaml=True):
-    INPUT = open_possibly_compressed_file(baseline_fname)
-    baseline = extract_subtext(
-        INPUT, begin_str=baseline_begin, end_str=baseline_end)
-    INPUT.close()
-    INPUT = open_possibly_compressed_file(output_fname)
-    output = extract_subtext(INPUT, begin_str=output_begin, end_str=output_end)
-    INPUT.close()
-    compare_strings(
-        baseline,
-        output,
+    baseline_repn = load_repn_file(
+        baseline_fname,
+        begin_str=baseline_begin,
+        end_str=baseline_end,
+        using_yaml=using_yaml,
+        cache_dir=baseline_cache_dir,
+        label='baseline')
+    output_repn = load_repn_file(
+        output_fname,
+        begin_str=output_begin,
+        end_str=output_end,
+        using_yaml=using_yaml,
+        label='output')
+    compare_repn(
+        baseline_repn,
+        output_repn,
         tolerance=tolerance,
         exact=exact,
         using_yaml=using_yaml)
@@ -7,6 +7,8 @@ import os
 import sys
 import fnmatch
 import posixpath
+import shutil
+import tempfile
 
 import pyutilib.th as unittest
 
@@ -150,6 +152,33 @@ class _TestArchiveReaderBaseNested(object):
             f.close()
         a.close()
 
+    def test_iter_members(self):
+        a = self._a = self.archive_class(
+            os.path.join(testdatadir, self.archive_name),
+            **self.archive_class_kwds)
+        ans = dict((name, f.read().strip().decode())
+                   for name, f in a.iter_members())
+        self.assertEqual(ans, {
+            posixpath.join('directory', 'fileA.txt'): 'this is fileA',
+            posixpath.join('directory', 'fileB.txt'): 'this is fileB'
+        })
+        self.assertEqual(os.listdir(a.getExtractionDir()), [])
+
+    def test_extract_path(self):
+        a = self._a = self.archive_class(
+            os.path.join(testdatadir, self.archive_name),
+            **self.archive_class_kwds)
+        dstdir = tempfile.mkdtemp()
+        try:
+            dst = a.extract('directory', path=dstdir, recursive=True)
+            self.assertEqual(dst, posixpath.join(dstdir, 'directory'))
+            with open(os.path.join(dst, 'fileA.txt'), 'rb') as f:
+                self.assertEqual(f.read().strip().decode(), 'this is fileA')
+            self.assertTrue(os.path.exists(os.path.join(dst, 'fileB.txt')))
+            self.assertEqual(os.listdir(a.getExtractionDir()), [])
+        finally:
+            shutil.rmtree(dstdir, True)
+
     def test_maxdepth0(self):
         a = self._a = self.archive_class(
             os.path.join(testdatadir, self.archive_name),
@@ -316,6 +345,67 @@ class TestDirArchiveReaderWin(_TestArchiveReaderBaseNested, unittest.TestCase):
     archive_class_kwds = {'filter': dir_svn_junk_filter}
 
 
+class TestDirArchiveReaderThreads(_TestArchiveReaderBaseNested,
+                                  unittest.TestCase):
+
+    archive_class = DirArchiveReader
+    archive_name = 'archive_directory'
+    archive_class_kwds = {'filter': dir_svn_junk_filter, 'nthreads': 4}
+
+
+class TestDirArchiveReaderIndex(unittest.TestCase):
+
+    def setUp(self):
+        self._tmpdir = tempfile.mkdtemp()
+        self._archive = os.path.join(self._tmpdir, 'archive')
+        for name in ('top/sub/fileA.txt', 'top/sub/fileB.txt',
+                     'top/subfile.txt', 'other.txt'):
+            fname = os.path.join(self._archive, name)
+            if not os.path.exists(os.path.dirname(fname)):
+                os.makedirs(os.path.dirname(fname))
+            with open(fname, 'w') as f:
+                f.write(name)
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, True)
+
+    def test_lazy_index(self):
+        a = DirArchiveReader(self._archive, maxdepth=1)
+        try:
+            self.assertTrue(a.contains('top/subfile.txt'))
+            self.assertTrue(a.contains('top/sub'))
+            self.assertFalse(a.contains('top/sub/fileA.txt'))
+            self.assertFalse(a.contains('top/su'))
+            with a.open('other.txt') as f:
+                self.assertEqual(f.read(), b'other.txt')
+            # the member list has not been built
+            self.assertIsNone(a._names_index)
+            self.assertEqual(
+                sorted(a.getnames()),
+                ['other.txt', 'top', 'top/sub', 'top/subfile.txt'])
+            self.assertTrue(a.contains('top/sub'))
+            self.assertFalse(a.contains('top/sub/fileA.txt'))
+        finally:
+            a.close()
+
+    def test_extract_link(self):
+        a = DirArchiveReader(self._archive, nthreads=4, link=True)
+        dstdir = os.path.join(self._tmpdir, 'dst')
+        try:
+            dst = a.extract('top', path=dstdir, recursive=True)
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(dst, 'sub'))),
+                ['fileA.txt', 'fileB.txt'])
+            src = os.path.join(self._archive, 'top', 'subfile.txt')
+            dst = os.path.join(dst, 'subfile.txt')
+            if hasattr(os, 'link'):
+                self.assertTrue(os.path.samefile(src, dst))
+            os.remove(dst)
+            self.assertTrue(os.path.exists(src))
+        finally:
+            a.close()
+
+
 @unittest.skipUnless(tarfile_available, "tarfile support is disabled")
 class TestTarArchiveReader1(_TestArchiveReaderBaseNested, unittest.TestCase):
 
@@ -351,6 +441,56 @@ class TestZipArchiveReaderWin(_TestArchiveReaderBaseNested, unittest.TestCase):
     archive_name = 'win_archive_directory.zip'
 
 
+@unittest.skipUnless(zipfile_available, "zipfile support is disabled")
+class TestZipArchiveReaderIndex(unittest.TestCase):
+
+    def setUp(self):
+        import zipfile
+        self._tmpdir = tempfile.mkdtemp()
+        self._archive = os.path.join(self._tmpdir, 'archive.zip')
+        # An archive without directory entries
+        z = zipfile.ZipFile(self._archive, 'w')
+        for name in ('top/sub/fileA.txt', 'top/sub/fileB.txt',
+                     'top/subfile.txt', 'other.txt'):
+            z.writestr(name, name)
+        z.close()
+
+    def tearDown(self):
+        shutil.rmtree(self._tmpdir, True)
+
+    def test_extractall_threads(self):
+        a = ZipArchiveReader(self._archive)
+        dstdir = os.path.join(self._tmpdir, 'dst')
+        try:
+            dsts = a.extractall(path=dstdir, nthreads=4)
+            self.assertEqual(len(dsts), 4)
+            for name in ('top/sub/fileA.txt', 'top/sub/fileB.txt',
+                         'top/subfile.txt', 'other.txt'):
+                with open(os.path.join(dstdir, name)) as f:
+                    self.assertEqual(f.read(), name)
+            a.clear_extractions()
+            self.assertFalse(os.path.exists(os.path.join(dstdir, 'other.txt')))
+        finally:
+            a.close()
+
+    def test_artificial_dirs(self):
+        a = ZipArchiveReader(self._archive)
+        try:
+            self.assertFalse(a.contains('top/sub'))
+            tmpdir = a.extract('top/sub', recursive=True)
+            self.assertTrue(a.contains('top/sub'))
+            self.assertTrue(os.path.isdir(tmpdir))
+            self.assertEqual(
+                sorted(os.listdir(tmpdir)), ['fileA.txt', 'fileB.txt'])
+            self.assertRaises(KeyError, a.extract, 'top/su')
+            dsts = a.extractall(members=['top'], recursive=True)
+            self.assertEqual(len(dsts), 1)
+            self.assertTrue(
+                os.path.exists(os.path.join(dsts[0], 'subfile.txt')))
+        finally:
+            a.close()
+
+
 class _TestFileArchiveReaderBase(object):
 
     archive_class = None
@@ -363,6 +503,13 @@ class _TestFileArchiveReaderBase(object):
         if self._a is not None:
             self._a.close()
 
+    def test_iter_members(self):
+        a = self._a = self.archive_class(
+            os.path.join(testdatadir, self.archive_name))
+        ans = [(name, f.read().strip().decode())
+               for name, f in a.iter_members()]
+        self.assertEqual(ans, [('fileC.txt', 'this is fileC')])
+
     def test1(self):
         a = self._a = self.archive_class(
             os.path.join(testdatadir, self.archive_name))
@@ -44,6 +44,37 @@ class CrossDebug(unittest.TestCase):
         ans.sort()
         self.assertEqual(ans, self.ttmp)
 
+    def test_CrossProduct(self):
+        # Access the combinations of a CrossProduct by index
+        ans = pyutilib.misc.CrossProduct((10, 11), (22, 23), (31, 32, 33))
+        self.assertEqual(len(ans), 12)
+        self.assertEqual(list(ans), self.tmp)
+        self.assertEqual([ans[i] for i in range(12)], self.tmp)
+        self.assertEqual(ans[-1], (11, 23, 33))
+        self.assertEqual(ans[4:9], self.tmp[4:9])
+        self.assertEqual(ans[::5], self.tmp[::5])
+        self.assertEqual(list(ans.iter_range(2, 10)), self.tmp[2:10])
+        self.assertRaises(IndexError, ans.__getitem__, 12)
+        chunks = ans.chunks(5)
+        self.assertEqual(chunks, [(0, 3), (3, 6), (6, 8), (8, 10), (10, 12)])
+        self.assertEqual(
+            [item for start, stop in chunks
+             for item in ans.iter_range(start, stop)], self.tmp)
+        # Very large products are not generated
+        ans = pyutilib.misc.CrossProduct(*([range(1000)] * 10))
+        self.assertEqual(ans.size, 1000**10)
+        self.assertEqual(ans[1000**10 - 2], (999,) * 9 + (998,))
+
+    def test_CrossProduct_flatten(self):
+        # Flatten the combinations of a CrossProduct
+        ans = pyutilib.misc.CrossProduct(
+            (10, 11), ((22, 31), (23, (32,))), flatten=True)
+        self.assertEqual(list(ans), self.ttmp)
+        self.assertEqual(ans[3], (11, 23, 32))
+        self.assertEqual(list(ans.iter_range(1, 3)), self.ttmp[1:3])
+        self.assertRaises(ValueError, pyutilib.misc.CrossProduct, (1,),
+                          sort=True)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,8 @@
 #
 
 import os
+import shutil
+import tempfile
 from os.path import abspath, dirname
 currdir = dirname(abspath(__file__)) + os.sep
 import pyutilib.th as unittest
@@ -145,6 +147,79 @@ class Test(unittest.TestCase):
         pyutilib.misc.compare_json_files(
             currdir + 'jsondata2.jsn.gz', currdir + 'jsondata2.jsn', exact=True)
 
+    def test_find_repn_difference(self):
+        # Verify the structured description of a difference
+        baseline = {'a': [1, {'b': 1.0}], 'c': 'x'}
+        self.assertIsNone(
+            pyutilib.misc.find_repn_difference(baseline, baseline))
+        ans = pyutilib.misc.find_repn_difference(
+            baseline, {'a': [1, {'b': 2.0}], 'c': 'x'})
+        self.assertEqual(ans.kind, 'list_item')
+        self.assertEqual(ans.location(), '<root>.a')
+        self.assertEqual(ans.key, 1)
+        self.assertEqual(ans.detail.kind, 'float')
+        self.assertEqual(ans.detail.location(), '<root>.a[1].b')
+        self.assertIs(type(ans.exception()), IOError)
+        self.assertIs(type(ans.detail.exception()), ValueError)
+        ans = pyutilib.misc.find_repn_difference(
+            baseline, {'a': [1, {'b': 1.0}]})
+        self.assertEqual(ans.kind, 'keys')
+        self.assertIn("missing from output:\n['c']", ans.message())
+
+    def test_find_repn_difference_subset(self):
+        # Verify that non-exact lists are matched as ordered subsequences
+        output = [{'n': i, 'v': float(i)} for i in range(100)] + ['a', 'b']
+        baseline = [output[5], output[50], 'b']
+        self.assertIsNone(
+            pyutilib.misc.find_repn_difference(
+                baseline, output, exact=False))
+        ans = pyutilib.misc.find_repn_difference(
+            [output[50], output[5]], output, exact=False)
+        self.assertEqual(ans.kind, 'list_item')
+        self.assertEqual(ans.key, 1)
+        ans = pyutilib.misc.find_repn_difference(
+            ['c'], output, exact=False)
+        self.assertEqual(ans.kind, 'list_item')
+        self.assertIsNone(ans.detail)
+
+    def test_baseline_cache(self):
+        # Verify that parsed baselines are cached and invalidated
+        cache_dir = tempfile.mkdtemp()
+        baseline = os.path.join(cache_dir, 'baseline.jsn')
+        shutil.copyfile(currdir + 'jsondata1.jsn', baseline)
+        pyutilib.misc.set_baseline_cache_dir(cache_dir)
+        try:
+            pyutilib.misc.compare_json_files(
+                baseline, currdir + 'jsondata2.jsn', exact=False)
+            cached = [f for f in os.listdir(cache_dir)
+                      if f.endswith('.pickle')]
+            self.assertEqual(len(cached), 1)
+            pyutilib.misc.compare_json_files(
+                baseline, currdir + 'jsondata2.jsn', exact=False)
+            self.assertEqual(
+                len([f for f in os.listdir(cache_dir)
+                     if f.endswith('.pickle')]), 1)
+            # Changing the baseline invalidates the cached data
+            shutil.copyfile(currdir + 'jsondata10.jsn', baseline)
+            self.assertRaises(
+                ValueError,
+                pyutilib.misc.compare_json_files,
+                baseline,
+                currdir + 'jsondata1.jsn',
+                exact=True)
+        finally:
+            pyutilib.misc.set_baseline_cache_dir(None)
+            shutil.rmtree(cache_dir)
+
+    def test_load_repn_file(self):
+        # Verify that subtext is loaded from a file
+        ans = pyutilib.misc.load_repn_file(
+            currdir + 'jsondata4.txt',
+            begin_str='BEGIN',
+            end_str='END',
+            using_yaml=False)
+        self.assertEqual(sorted(ans.keys()), ['a', 'd', 'g'])
+        self.assertEqual(ans['a'], {'b': 1, 'c': 1.3})
 
 if __name__ == "__main__":
     unittest.main()
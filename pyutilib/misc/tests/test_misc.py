@@ -3,6 +3,8 @@
 #
 #
 
+import copy
+import json
 import pickle
 import sys
 import os
@@ -88,6 +90,25 @@ class Test(unittest.TestCase):
         self.assertEqual([], pyutilib.misc.flatten_list([[[[], []], []], []]))
         self.assertEqual([], pyutilib.misc.flatten_list([[], [[], [[],]]]))
 
+    def test_flatten_deep(self):
+        # Verify that deeply nested values are flattened in place
+        tmp = [0]
+        for i in range(1, 5000):
+            tmp = [tmp, i]
+        inner = tmp[0]
+        ans = pyutilib.misc.flatten_list(tmp)
+        self.assertIs(ans, tmp)
+        self.assertEqual(ans, list(range(5000)))
+        self.assertEqual(len(inner), 2)
+        tmp = (0,)
+        for i in range(1, 5000):
+            tmp = (tmp, i)
+        self.assertEqual(pyutilib.misc.flatten_tuple(tmp), tuple(range(5000)))
+        tmp = [0]
+        for i in range(1, 5000):
+            tmp = [tmp, (i,)]
+        self.assertEqual(pyutilib.misc.flatten(tmp), list(range(5000)))
+
     def test_Bunch(self):
         a = 1
         b = "b"
@@ -151,6 +172,83 @@ yy: 2""")
         o2 = pickle.loads(s)
         self.assertEqual(o1, o2)
 
+    def test_LightContainer_compat(self):
+        # Verify that LightContainer behaves like Container
+        data = {'a': 1, 'b': {'c': 2, 'd': [{'e': 3}, 4]}, 'f': [1, {}]}
+        ans = []
+        for cls in (pyutilib.misc.Container, pyutilib.misc.LightContainer):
+            opt = cls('a=None c=d e="1 2 3"', foo=1, bar='x')
+            opt.xx = 1
+            opt['yy'] = 2
+            opt.x = cls(a=1, b=2)
+            opt.update(data)
+            opt._name_ = 'CONTAINER'
+            ans.append([
+                opt.ll, opt['ll'], opt.a, opt.c, opt.e, opt['yy'],
+                sorted(opt.keys()), len(opt), 'x' in opt, opt._name_,
+                json.dumps(opt.b, sort_keys=True),
+                isinstance(opt.b, cls), isinstance(opt.b.d[0], cls),
+                opt.f is data['f'], opt.b.d is data['b']['d'],
+                opt == cls(**opt), opt.b.d[0].e,
+                opt.f, sorted(opt.b.items()), opt.get('zz', 5),
+                str(opt), repr(opt).split('(', 1)[1],
+                pickle.loads(pickle.dumps(opt)) == opt
+            ])
+            self.assertRaises(AttributeError, getattr, opt, '_missing')
+            # Lists are copied, so the data is not modified
+            opt.f.append(2)
+            opt.b.d.append(5)
+            self.assertEqual(data['f'], [1, {}])
+            self.assertEqual(data['b']['d'], [{'e': 3}, 4])
+        self.assertEqual(ans[0][:16], ans[1][:16])
+        self.assertEqual(ans[1][11:16], [True, True, False, False, True])
+        self.assertEqual(
+            repr(ans[0][16:]),
+            repr(ans[1][16:]).replace('LightContainer', 'Container'))
+        opt = pyutilib.misc.LightOptions(a=1)
+        self.assertEqual(opt._name_, 'Options')
+        self.assertEqual(repr(opt), "LightOptions(a = 1)")
+
+    def test_LightContainer(self):
+        opt = pyutilib.misc.LightContainer()
+        # Nested dictionaries are filled when they are first used
+        inner = {'a': {'b': 1}}
+        opt.update({'x': inner, 'y': [inner]})
+        x = dict.__getitem__(opt, 'x')
+        self.assertIsInstance(x, pyutilib.misc.LightContainer)
+        self.assertIs(type(dict.__getitem__(x, 'a')), dict)
+        self.assertEqual(opt.x.a.b, 1)
+        self.assertIs(type(x), pyutilib.misc.LightContainer)
+        self.assertIsInstance(dict.__getitem__(x, 'a'),
+                              pyutilib.misc.LightContainer)
+        self.assertIs(opt.x, x)
+        self.assertIsInstance(opt.get('y')[0], pyutilib.misc.LightContainer)
+        self.assertEqual(opt.y[0], inner)
+        self.assertEqual(inner, opt.y[0])
+        self.assertEqual(len(opt.y[0]), 1)
+        self.assertIs(type(inner['a']), dict)
+        opt.update({'z': {}})
+        opt.z = 1
+        self.assertEqual(opt.z, 1)
+        lazy = pyutilib.misc.LightContainer()
+        lazy.update({'a': {'b': [{'c': 1}]}})
+        self.assertEqual(json.dumps(lazy), '{"a": {"b": [{"c": 1}]}}')
+        self.assertEqual(pickle.loads(pickle.dumps(lazy)), lazy)
+        # There is a single storage: the dictionary is the instance
+        # dictionary
+        self.assertIs(opt.__dict__, opt)
+        self.assertRaises(AttributeError, setattr, opt, '_private', 1)
+        del opt.z
+        self.assertEqual(opt.z, None)
+        self.assertRaises(AttributeError, delattr, opt, 'z')
+        # Like Container, attributes hide the dict methods
+        opt['keys'] = 1
+        self.assertEqual(opt.keys, 1)
+        self.assertEqual(sorted(dict.keys(opt)), ['keys', 'x', 'y'])
+        opt2 = copy.deepcopy(opt)
+        self.assertEqual(opt2, opt)
+        self.assertIsNot(opt2.x, opt.x)
+
     def test_flatten1(self):
         # Test that flatten works correctly
         self.assertEqual("abc", pyutilib.misc.flatten("abc"))
@@ -162,6 +260,14 @@ yy: 2""")
         self.assertEqual([1, 2, 'abc'], pyutilib.misc.flatten((1, 2, ('abc',))))
         a = [0, 9, 8]
         self.assertEqual([1, 2, 0, 9, 8], pyutilib.misc.flatten((1, 2, a)))
+
+        class Broken(object):
+            def __iter__(self):
+                yield 1
+                raise ValueError()
+        b = Broken()
+        # Iterables that cannot be iterated are not flattened
+        self.assertEqual([1, 1, b, 3], pyutilib.misc.flatten((1, [b], 3)))
         self.assertEqual([1, 2, 3, 4, 5], pyutilib.misc.flatten(
             [[], 1, [], 2, [[], 3, [[], 4, []], []], 5, []]))
         self.assertEqual([], pyutilib.misc.flatten([[[[], []], []], []]))
@@ -208,6 +314,34 @@ yy: 2""")
         ans = pyutilib.misc.quote_split(' ', "a b\ c")
         self.assertEqual(ans, ["a", 'b\ c'])
 
+    def test_quote_split_corpus(self):
+        # Verify quote and escape handling at the edges of separators
+        corpus = [
+            (None, '', ['']),
+            (None, ' a  b ', ['', 'a', 'b', '']),
+            (None, 'a\\ b', ['a\\ b']),
+            (None, 'a\\  b', ['a\\ ', 'b']),
+            (None, "a'b c'd e", ["a'b c'd", 'e']),
+            (None, "'a \\' b' c", ["'a \\' b'", 'c']),
+            (None, '"a \'" b', ['"a \'"', 'b']),
+            (None, 'a\\', ['a\\']),
+            ('x*', 'ab', ['', 'a', 'b']),
+            ('b', '"b"b', ['"b"', '']),
+            ('[ \t]+', 'a \t"b\tc"\td', ['a', '"b\tc"', 'd']),
+            ('^a', 'aa a', ['', '', ' ', '']),
+        ]
+        for regex, src, ans in corpus:
+            if regex is None:
+                self.assertEqual(pyutilib.misc.quote_split(src), ans)
+            else:
+                self.assertEqual(pyutilib.misc.quote_split(regex, src), ans)
+        self.assertRaises(ValueError, pyutilib.misc.quote_split, "'a\\'")
+        # Long strings are split in linear time
+        src = ' '.join('"a %d" b\\ c' % i for i in range(20000))
+        ans = pyutilib.misc.quote_split(src)
+        self.assertEqual(len(ans), 40000)
+        self.assertEqual(ans[-2:], ['"a 19999"', 'b\\ c'])
+
     def test_tuplize(self):
         ans = pyutilib.misc.tuplize([0, 1, 2, 3, 4, 5], 2, "a")
         self.assertEqual(ans, [(0, 1), (2, 3), (4, 5)])
@@ -262,6 +396,70 @@ yy: 2""")
         os.environ["PATH"] = tmp
         self.assertEqual(ans, None)
 
+    def test_search_file_cache(self):
+        # Test that search results are cached until the directories change
+        import tempfile, shutil, time
+        from pyutilib.misc.misc import _search_file_cache
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dirs = [os.path.join(tmpdir, name) for name in ('a', 'b')]
+            for dname in dirs:
+                os.mkdir(dname)
+            fname = os.path.join(dirs[1], 'tool')
+            open(fname, 'w').close()
+            os.chmod(fname, 0o755)
+            calls = []
+
+            def validate(filename):
+                calls.append(filename)
+                return True
+
+            def settle():
+                # Mark the files as old, so they are cached
+                old = time.time() - 3600
+                for dname in dirs:
+                    for name in os.listdir(dname):
+                        os.utime(os.path.join(dname, name), (old, old))
+                    os.utime(dname, (old, old))
+
+            settle()
+            pyutilib.misc.clear_search_cache()
+            for i in range(3):
+                ans = pyutilib.misc.search_file(
+                    'tool', search_path=dirs, executable=True)
+                self.assertEqual(ans, fname)
+            self.assertEqual(len(_search_file_cache), 1)
+            # Results are not cached with a validate function
+            for i in range(3):
+                ans = pyutilib.misc.search_file(
+                    'tool', search_path=dirs, executable=True,
+                    validate=validate)
+                self.assertEqual(ans, fname)
+            self.assertEqual(calls, [fname] * 3)
+            self.assertEqual(len(_search_file_cache), 1)
+            # A new file in an earlier directory is found
+            fname = os.path.join(dirs[0], 'tool')
+            open(fname, 'w').close()
+            os.chmod(fname, 0o644)
+            settle()
+            ans = pyutilib.misc.search_file(
+                'tool', search_path=dirs, executable=True)
+            self.assertEqual(ans, os.path.join(dirs[1], 'tool'))
+            if sys.platform[0:3] != "win":
+                # ... after it is made executable
+                os.chmod(fname, 0o755)
+                ans = pyutilib.misc.search_file(
+                    'tool', search_path=dirs, executable=True)
+                self.assertEqual(ans, fname)
+            os.remove(os.path.join(dirs[1], 'tool'))
+            os.remove(fname)
+            ans = pyutilib.misc.search_file(
+                'tool', search_path=dirs, executable=True)
+            self.assertEqual(ans, None)
+        finally:
+            pyutilib.misc.clear_search_cache()
+            shutil.rmtree(tmpdir)
+
     def test_file_compare1(self):
         # Test that file comparison works
         [flag, lineno, diffstr] = pyutilib.misc.compare_file(
@@ -403,6 +601,32 @@ yy: 2""")
                 "test_file_compare1b - unexpected differences in filecmp6.txt and filecmp8.txt at line %d"
                 % lineno)
 
+    def test_file_compare_parallel(self):
+        # Test that batch file comparison matches compare_file()
+        pairs = [(currdir + "filecmp1.txt", currdir + "filecmp1.txt"),
+                 (currdir + "filecmp1.txt", currdir + "filecmp2.txt"),
+                 (currdir + "filecmp1.txt", currdir + "filecmp3.txt"),
+                 (currdir + "filecmp1.txt", currdir + "filecmp4.txt"),
+                 (currdir + "filecmp1.txt", currdir + "bar.txt")]
+        progress = []
+        for nprocs in (1, 2):
+            del progress[:]
+            ans = pyutilib.misc.compare_files_parallel(
+                pairs,
+                nprocs=nprocs,
+                callback=lambda i, res: progress.append(i))
+            self.assertEqual(sorted(progress), list(range(len(pairs))))
+            self.assertEqual([x[:2] for x in ans[:4]],
+                             [[False, None], [False, None], [True, 4],
+                              [True, 3]])
+            self.assertTrue(ans[4][0])
+            self.assertIn("bar.txt", ans[4][2])
+        ans = pyutilib.misc.compare_files_parallel(
+            [(currdir + "filecmp6.txt", currdir + "filecmp8.txt")] * 3,
+            tolerance=1e-2,
+            nprocs=2)
+        self.assertEqual(ans, [[False, None, ""]] * 3)
+
     def test_file_compare2(self):
         # Test that large file comparison works
         flag = pyutilib.misc.compare_large_file(currdir + "filecmp1.txt",
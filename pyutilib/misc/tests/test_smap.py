@@ -146,5 +146,75 @@ class Test(unittest.TestCase):
         self.assertEqual(smap['b'], 3)
 
 
+class TestArraySparseMapping(unittest.TestCase):
+
+    def test_default(self):
+        # Validate behavior for an array-backed map with a default value
+        smap = pyutilib.misc.ArraySparseMapping(
+            ['a', 'b', 'z'], default=0, typecode='l', a=1, b=2)
+        self.assertEqual(len(smap), 3)
+        self.assertTrue('z' in smap)
+        self.assertFalse('c' in smap)
+        self.assertEqual(list(smap), ['a', 'b', 'z'])
+        self.assertEqual(smap['z'], 0)
+        self.assertRaises(KeyError, smap.__getitem__, 'c')
+        self.assertRaises(KeyError, smap.__getitem__, [])
+        self.assertRaises(KeyError, smap.__setitem__, 'c', 1)
+        self.assertEqual(list(smap.nondefault_iter()), ['a', 'b'])
+        del smap['b']
+        self.assertRaises(KeyError, smap.__delitem__, 'b')
+        self.assertEqual(smap['b'], 0)
+        self.assertEqual(smap.nondefault_keys(), ['a'])
+        smap['z'] = 3
+        self.assertEqual(smap.nondefault_keys(), ['a', 'z'])
+        self.assertEqual(dict(smap), {'a': 1, 'b': 0, 'z': 3})
+
+    def test_no_default(self):
+        # Validate behavior for an array-backed map without a default value
+        smap = pyutilib.misc.ArraySparseMapping(('a', 'b', 'z'), a=1.5)
+        self.assertEqual(len(smap), 1)
+        self.assertEqual(list(smap), ['a'])
+        self.assertEqual(smap['a'], 1.5)
+        self.assertRaises(ValueError, smap.__getitem__, 'b')
+        smap['z'] = 2
+        self.assertEqual(len(smap), 2)
+        self.assertEqual(smap['z'], 2.0)
+        self.assertEqual(smap.index(), ('a', 'b', 'z'))
+        self.assertRaises(ValueError, pyutilib.misc.ArraySparseMapping,
+                          ['a', 'a'])
+
+    def test_bulk(self):
+        # Validate bulk access to an array-backed map
+        index = list(range(100))
+        smap = pyutilib.misc.ArraySparseMapping(
+            index, default=-1, within=range(10), typecode='i')
+        smap.set_values(range(0, 100, 10), range(10))
+        self.assertEqual(smap.get_values([10, 11, 90]), [1, -1, 9])
+        self.assertEqual(smap.nondefault_keys(), list(range(0, 100, 10)))
+        self.assertRaises(ValueError, smap.set_values, [1], [10])
+        self.assertRaises(ValueError, smap.set_values, [1, 2], [1])
+        self.assertRaises(KeyError, smap.set_values, [100], [1])
+        self.assertRaises(KeyError, smap.get_values, [100])
+        self.assertEqual(smap[1], -1)
+        # Mappings over the same index can share the key positions
+        other = pyutilib.misc.ArraySparseMapping(
+            index, positions=smap.positions, typecode='i')
+        other.set_values([5], [5])
+        self.assertEqual(other.get_values([5]), [5])
+        self.assertRaises(ValueError, other.get_values, [4, 5])
+        self.assertEqual(list(other.items()), [(5, 5)])
+        from copy import copy
+        ans = copy(smap)
+        ans[1] = 1
+        self.assertEqual(smap[1], -1)
+        self.assertEqual(ans.get_values([1, 10]), [1, 1])
+        # A copy has the keys of a mapping that was built from an iterator
+        smap = pyutilib.misc.ArraySparseMapping(
+            (key for key in 'abc'), default=0)
+        smap['b'] = 2
+        ans = copy(smap)
+        self.assertEqual(sorted(ans.items()), [('a', 0), ('b', 2), ('c', 0)])
+
+
 if __name__ == "__main__":
     unittest.main()
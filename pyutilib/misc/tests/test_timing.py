@@ -0,0 +1,139 @@
+#
+# Unit Tests for pyutilib.misc.timing
+#
+
+import json
+import threading
+
+from six import StringIO
+
+import pyutilib.th as unittest
+from pyutilib.misc.timing import TicTocTimer, HierarchicalTimer
+
+
+class TestTicTocTimer(unittest.TestCase):
+
+    def test_toc_location(self):
+        out = StringIO()
+        timer = TicTocTimer(ostream=out)
+        timer.tic()
+        delta = timer.toc()
+        self.assertGreaterEqual(delta, 0)
+        lines = out.getvalue().splitlines()
+        self.assertIn("Resetting the tic/toc delta timer", lines[0])
+        self.assertIn('test_timing.py", line', lines[1])
+        self.assertIn("in test_toc_location", lines[1])
+
+
+class TestHierarchicalTimer(unittest.TestCase):
+
+    def test_nested_regions(self):
+        timer = HierarchicalTimer()
+        for i in range(3):
+            with timer.region('outer'):
+                with timer.region('inner'):
+                    pass
+                timer.start('other')
+                timer.stop('other')
+        ans = timer.to_dict()
+        self.assertEqual([r['name'] for r in ans['regions']], ['outer'])
+        outer = ans['regions'][0]
+        self.assertEqual(outer['calls'], 3)
+        self.assertEqual([(r['name'], r['calls']) for r in outer['children']],
+                         [('inner', 3), ('other', 3)])
+        inner = outer['children'][0]
+        self.assertLessEqual(inner['min'], inner['max'])
+        self.assertLessEqual(inner['total'], outer['total'])
+        self.assertAlmostEqual(
+            outer['self'],
+            outer['total'] - sum(r['total'] for r in outer['children']))
+        self.assertEqual(json.loads(timer.to_json()), ans)
+
+        out = StringIO()
+        timer.report(ostream=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['Region', 'Calls', 'Total', 'Self', 'Min', 'Max'])
+        self.assertEqual(lines[2].split()[:2], ['outer', '3'])
+        self.assertTrue(lines[3].startswith('  '))
+        self.assertEqual(len(lines), 5)
+
+        timer.reset()
+        self.assertEqual(timer.to_dict(), {'regions': []})
+
+    def test_stop_errors(self):
+        timer = HierarchicalTimer()
+        self.assertRaises(ValueError, timer.stop, 'a')
+        timer.start('a')
+        timer.start('b')
+        self.assertRaises(ValueError, timer.stop, 'a')
+        timer.stop('b')
+        timer.stop('a')
+
+    def test_timed(self):
+        timer = HierarchicalTimer()
+
+        @timer.timed
+        def fib(n):
+            return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+        @timer.timed('named')
+        def f(x):
+            raise ValueError(x)
+
+        self.assertEqual(fib(4), 3)
+        self.assertEqual(fib.__name__, 'fib')
+        self.assertRaises(ValueError, f, 1)
+        regions = timer.to_dict()['regions']
+        self.assertEqual(regions[0]['name'][-3:], 'fib')
+        self.assertEqual(regions[0]['calls'], 1)
+        self.assertEqual(regions[0]['children'][0]['calls'], 2)
+        self.assertEqual(regions[1]['name'], 'named')
+        self.assertEqual(regions[1]['calls'], 1)
+
+    def test_disabled(self):
+        timer = HierarchicalTimer(enabled=False)
+
+        @timer.timed
+        def f(x):
+            return x + 1
+
+        with timer.region('a'):
+            timer.start('b')
+            self.assertEqual(f(1), 2)
+            self.assertIsNone(timer.stop('b'))
+        self.assertEqual(timer.to_dict(), {'regions': []})
+        timer.enabled = True
+        self.assertEqual(f(1), 2)
+        self.assertEqual(timer.to_dict()['regions'][0]['calls'], 1)
+
+    def test_threads(self):
+        timer = HierarchicalTimer()
+
+        def work():
+            with timer.region('work'):
+                with timer.region('step'):
+                    pass
+
+        threads = [threading.Thread(target=work, name='T%d' % i)
+                   for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        work()
+        regions = timer.to_dict()['regions']
+        self.assertEqual(regions[0]['calls'], 5)
+        self.assertEqual(regions[0]['children'][0]['calls'], 5)
+        ans = timer.to_dict(threads=True)['threads']
+        self.assertEqual(sorted(t['thread'] for t in ans),
+                         ['MainThread', 'T0', 'T1', 'T2', 'T3'])
+        for t in ans:
+            self.assertEqual(t['regions'][0]['calls'], 1)
+        out = StringIO()
+        timer.report(ostream=out, threads=True)
+        self.assertEqual(out.getvalue().count('Thread: '), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import pyutilib.misc
 import pyutilib.th as unittest
-from pyutilib.misc.visitor import SimpleVisitor, ValueVisitor
+from pyutilib.misc.visitor import SimpleVisitor, ValueVisitor, VisitCache
 
 
 class Node(object):
@@ -35,6 +35,19 @@ class CollectVisitor(SimpleVisitor):
     def finalize(self):
         return self.ans
 
+class SlotsVisitor(SimpleVisitor):
+
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def visit(self, node):
+        self.count += 1
+
+    def finalize(self):
+        return self.count
+
 class SumVisitor(ValueVisitor):
 
     def __init__(self):
@@ -111,6 +124,31 @@ class Test(unittest.TestCase):
         ans = visitor.dfs_postorder_stack(root)
         self.assertEqual(ans, 1)
 
+    def test_retval_dfs_postorder_dag(self):
+        visitor = SumVisitor()
+        ans = visitor.dfs_postorder_dag(self.root)
+        self.assertEqual(ans, 820)
+        # A chain of nodes that share both of their children
+        node = Node()
+        node.num = 1
+        for i in range(30):
+            parent = Node()
+            parent.children = [node, node]
+            node = parent
+        cache = VisitCache()
+        visitor = SumVisitor()
+        self.assertEqual(visitor.dfs_postorder_dag(node, cache), 2**30)
+        self.assertEqual(cache.hits, 29)
+        self.assertEqual(cache.misses, 30)
+        self.assertEqual(len(cache), 30)
+        # The values are reused by later searches
+        visitor.dfs_postorder_dag(node.children[0], cache)
+        self.assertEqual(cache.hits, 30)
+        cache = VisitCache(key=lambda node: id(node), maxsize=2)
+        self.assertEqual(visitor.dfs_postorder_dag(node, cache), 2**30)
+        self.assertEqual(len(cache), 2)
+        self.assertRaises(ValueError, VisitCache, maxsize=0)
+
     def test_count_bfs(self):
         cvisitor = CountVisitor()
         ans = cvisitor.bfs(self.root)
@@ -120,6 +158,26 @@ class Test(unittest.TestCase):
         cvisitor = CountVisitor()
         ans = cvisitor.xbfs(self.root)
         self.assertEqual(ans,40)
+
+    def test_walk(self):
+        visitor = CollectVisitor()
+        ans = list(visitor.walk(self.root))
+        self.assertEqual(len(ans), 80)
+        self.assertEqual([node.num for event, node in ans if event == 'enter'],
+                         visitor.dfs_preorder(self.root))
+        visitor = CollectVisitor()
+        self.assertEqual([node.num for event, node in ans if event == 'exit'],
+                         visitor.dfs_postorder(self.root))
+        self.assertEqual(ans[:3], [('enter', self.root),
+                                   ('enter', self.root.children[0]),
+                                   ('enter', self.root.children[0].children[0])])
+        self.assertEqual([(event, node.num) for event, node in visitor.walk(Node())],
+                         [('enter', 0), ('exit', 0)])
+
+    def test_slots(self):
+        visitor = SlotsVisitor()
+        self.assertFalse(hasattr(visitor, '__dict__'))
+        self.assertEqual(visitor.dfs_postorder(self.root), 40)
         
 
 if __name__ == "__main__":
@@ -151,6 +151,28 @@ class Test(unittest.TestCase):
             tolerance=1.0,
             exact=True)
 
+    def test_parse(self):
+        # Verify that repeated elements are converted consistently
+        from pyutilib.misc.xmltodict import parse
+        with open(currdir + 'xmldata7.xml', 'rb') as INPUT:
+            ans = parse(INPUT, chunk_size=16)
+        self.assertEqual(ans['root']['a']['_'][2:], [1.3, 'x', 'y'])
+        ans = parse(
+            '<a p="1"><b>1</b><b>2</b><b>3</b></a>', coerce_values=False)
+        self.assertEqual(ans['a']['@p'], '1')
+        self.assertEqual(ans['a']['b'], ['1', '2', '3'])
+
+    def test_iterparse(self):
+        # Verify that items are generated at the given depth
+        from pyutilib.misc.xmltodict import iterparse
+        with open(currdir + 'xmldata7.xml', 'rb') as INPUT:
+            ans = list(iterparse(INPUT, item_depth=3, chunk_size=16))
+        self.assertEqual([item for path, item in ans],
+                         ['1', {'c': 'ccc', 'd': 'ddd', 'e': 'eee'}, '1.3', 'x',
+                          'y'])
+        self.assertEqual([name for name, attrs in ans[0][0]],
+                         ['root', 'a', '_'])
+
 
 if __name__ == "__main__":
     unittest.main()
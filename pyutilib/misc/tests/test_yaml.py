@@ -4,7 +4,9 @@
 #
 
 import os
+import sys
 from os.path import abspath, dirname
+from six import StringIO
 currdir = dirname(abspath(__file__)) + os.sep
 import pyutilib.th as unittest
 import pyutilib.misc
@@ -225,6 +227,56 @@ class TestSimple(unittest.TestCase):
         # Parse yamldata14.yml
         pyutilib.misc.simple_yaml_parser(currdir + 'yamldata14.yml').keys()
 
+    def test15(self):
+        # Parse a nested block at the end of the stream
+        self.assertEqual({
+            'a': {'b': 1,
+                  'c': 'x:y'}
+        }, pyutilib.misc.simple_yaml_parser(StringIO("a:\n  b: 1\n  c: 'x:y'")))
+
+    def test16(self):
+        # Iterate over the top-level entries
+        self.assertEqual(
+            [('a', {'b': 1,
+                    'c': 1.3}), ('d', {'e': 'the rain in spain',
+                                       'f': 'is mostly on the plain'}),
+             ('g', 'again')],
+            list(
+                pyutilib.misc.simple_yaml_parser(
+                    currdir + 'yamldata2.yml', iterate=True)))
+        self.assertEqual(
+            [(0, 'a'), (1, 'b'), (2, 'c')],
+            list(
+                pyutilib.misc.simple_yaml_parser(
+                    currdir + 'yamldata3.yml', iterate=True)))
+
+    def test17(self):
+        # Verify that mixed lists and mappings are rejected
+        self.assertRaises(ValueError, pyutilib.misc.simple_yaml_parser,
+                          currdir + 'yamldata8.yml')
+
+    def test_yaml_eval(self):
+        # Verify the conversion of scalar values
+        from pyutilib.misc.pyyaml_util import yaml_eval
+        self.assertEqual(yaml_eval('1'), 1)
+        self.assertEqual(yaml_eval('-1.5e3'), -1500.0)
+        self.assertEqual(yaml_eval('None'), None)
+        self.assertEqual(yaml_eval('True'), True)
+        self.assertEqual(yaml_eval("'a b'"), 'a b')
+        self.assertEqual(yaml_eval('[1, 2]'), [1, 2])
+        self.assertEqual(yaml_eval('0x10'), 16)
+        self.assertEqual(yaml_eval('abc'), 'abc')
+        if sys.version_info >= (3, 6):
+            self.assertIs(type(yaml_eval('1_000')), int)
+            self.assertEqual(yaml_eval('1_000'), 1000)
+        else:
+            self.assertEqual(yaml_eval('1_000'), '1_000')
+        # Expressions are not evaluated
+        self.assertEqual(yaml_eval('1+2'), '1+2')
+        self.assertEqual(yaml_eval('[1, -2+3]'), '[1, -2+3]')
+        self.assertEqual(yaml_eval('1+2j'), 1+2j)
+        self.assertEqual(yaml_eval('abs'), 'abs')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,13 +8,24 @@
 #  _________________________________________________________________________
 #
 
+import functools
+import json
 import sys
+import threading
 import time
-import traceback
+try:
+    from collections import OrderedDict
+except ImportError:                                 #pragma:nocover
+    from ordereddict import OrderedDict
 
-__all__ = ('TicTocTimer', 'tic', 'toc')
+__all__ = ('TicTocTimer', 'tic', 'toc', 'HierarchicalTimer')
 
-_loadTime = time.time()
+try:
+    default_timer = time.perf_counter
+except AttributeError:                              #pragma:nocover
+    default_timer = time.time
+
+_loadTime = default_timer()
 
 class TicTocTimer(object):
     """A class to calculate and report elapsed time.
@@ -35,7 +46,7 @@ class TicTocTimer(object):
            logging package. Note: timing logged using logger.info
     """
     def __init__(self, ostream=None, logger=None):
-        self._lastTime = time.time()
+        self._lastTime = default_timer()
         self._ostream = ostream
         self._logger = logger
 
@@ -56,7 +67,7 @@ class TicTocTimer(object):
                 logging package (overrides the ostream provided when the
                 class was constructed). Note: timing logged using logger.info
         """
-        self._lastTime = time.time()
+        self._lastTime = default_timer()
         if msg is None:
             msg = "Resetting the tic/toc delta timer"
         if msg:
@@ -85,7 +96,7 @@ class TicTocTimer(object):
                 logging package (overrides the ostream provided when the
                 class was constructed). Note: timing logged using logger.info
         """
-        now = time.time()
+        now = default_timer()
         if delta:
             ans = now - self._lastTime
             self._lastTime = now
@@ -93,8 +104,12 @@ class TicTocTimer(object):
             ans = now - _loadTime
 
         if msg is None:
-            msg = 'File "%s", line %s in %s' % \
-                  traceback.extract_stack(limit=2)[0][:3]
+            # Only the calling frame is needed, so look at it directly
+            # instead of extracting (and reading the source of) the stack
+            frame = sys._getframe(1)
+            msg = 'File "%s", line %s in %s' % (
+                frame.f_code.co_filename, frame.f_lineno,
+                frame.f_code.co_name)
         if msg:
             if ostream is None:
                 ostream = self._ostream
@@ -121,3 +136,289 @@ class TicTocTimer(object):
 _globalTimer = TicTocTimer()
 tic = _globalTimer.tic
 toc = _globalTimer.toc
+
+
+class _TimerRegion(object):
+    """The statistics of a timed region (for one thread)."""
+
+    __slots__ = ('name', 'count', 'total', 'min', 'max', 'children')
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        # The children are kept in the order that they are first started
+        self.children = OrderedDict()
+
+    def merge(self, other):
+        if other.count:
+            if not self.count or other.min < self.min:
+                self.min = other.min
+            if not self.count or other.max > self.max:
+                self.max = other.max
+            self.count += other.count
+            self.total += other.total
+        for name, child in other.children.items():
+            if name not in self.children:
+                self.children[name] = _TimerRegion(name)
+            self.children[name].merge(child)
+
+    @property
+    def self_time(self):
+        return self.total - sum(child.total
+                                for child in self.children.values())
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'calls': self.count,
+            'total': self.total,
+            'self': self.self_time,
+            'min': self.min,
+            'max': self.max,
+            'children': [child.to_dict() for child in self.children.values()]
+        }
+
+
+class _RegionContext(object):
+    """A context manager that times a region of a HierarchicalTimer."""
+
+    __slots__ = ('_timer', '_name')
+
+    def __init__(self, timer, name):
+        self._timer = timer
+        self._name = name
+
+    def __enter__(self):
+        self._timer.start(self._name)
+        return self
+
+    def __exit__(self, et, ev, tb):
+        self._timer.stop(self._name)
+
+
+class _NullContext(object):
+    """A context manager that does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, et, ev, tb):
+        pass
+
+_null_context = _NullContext()
+
+
+class HierarchicalTimer(object):
+    """A timer that collects statistics for nested, named regions.
+
+    Regions are timed with :func:`start` and :func:`stop`, with the
+    context manager returned by :func:`region`, or with the
+    :func:`timed` decorator.  A region started while another region is
+    running is recorded as a child of that region, so the same name can
+    appear in several places in the hierarchy.  Each region records the
+    number of calls and the total, minimum and maximum elapsed time;
+    the self time is the total time less the time in child regions.
+
+    Examples:
+       >>> from pyutilib.misc.timing import HierarchicalTimer
+       >>> timer = HierarchicalTimer()
+       >>> with timer.region('solve'):
+       ...     with timer.region('setup'):
+       ...         pass # do setup
+       >>> timer.report() # prints a table of the region statistics
+
+    Each thread has its own stack of running regions and its own
+    statistics, which are combined in the report unless the threads
+    are reported separately.  When the timer is disabled, regions are
+    not timed and the cost of :func:`region` and :func:`timed` is an
+    attribute check.  The timer should not be enabled or disabled while
+    regions are running.
+
+    Args:
+        enabled (bool): if :const:`False`, then the timer does not
+            record anything until it is enabled.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._contexts = {}
+        self.reset()
+
+    def reset(self):
+        """Discard the statistics of all regions.
+
+        This should not be called while regions are running.
+        """
+        with self._lock:
+            # list of (thread name, root region) tuples
+            self._roots = []
+            self._local = threading.local()
+
+    def _thread_stack(self):
+        root = _TimerRegion(None)
+        stack = self._local.stack = [(root, None)]
+        with self._lock:
+            self._roots.append((threading.current_thread().name, root))
+        return stack
+
+    def start(self, name):
+        """Start timing a region within the current region."""
+        if not self.enabled:
+            return
+        try:
+            stack = self._local.stack
+        except AttributeError:
+            stack = self._thread_stack()
+        children = stack[-1][0].children
+        try:
+            node = children[name]
+        except KeyError:
+            node = children[name] = _TimerRegion(name)
+        stack.append((node, default_timer()))
+
+    def stop(self, name):
+        """Stop timing the current region and return the elapsed time.
+
+        Raises:
+            ValueError: if the current region is not named *name*.
+        """
+        if not self.enabled:
+            return None
+        now = default_timer()
+        stack = getattr(self._local, 'stack', None)
+        if not stack or len(stack) == 1:
+            raise ValueError(
+                "Cannot stop timer region '%s': no region is running"
+                % (name,))
+        node, start = stack[-1]
+        if node.name != name:
+            raise ValueError(
+                "Cannot stop timer region '%s': the current region is '%s'"
+                % (name, node.name))
+        stack.pop()
+        elapsed = now - start
+        if node.count:
+            if elapsed < node.min:
+                node.min = elapsed
+            elif elapsed > node.max:
+                node.max = elapsed
+        else:
+            node.min = node.max = elapsed
+        node.count += 1
+        node.total += elapsed
+        return elapsed
+
+    def region(self, name):
+        """Return a context manager that times a region."""
+        if not self.enabled:
+            return _null_context
+        try:
+            return self._contexts[name]
+        except KeyError:
+            ctx = self._contexts[name] = _RegionContext(self, name)
+            return ctx
+
+    def timed(self, name=None):
+        """A decorator that times each call of a function.
+
+        This can be used as ``@timer.timed`` or ``@timer.timed('name')``;
+        the default region name is the qualified name of the function.
+        """
+        if callable(name):
+            return self.timed()(name)
+
+        def decorator(func):
+            region = name
+            if region is None:
+                region = getattr(func, '__qualname__', func.__name__)
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwds):
+                if not self.enabled:
+                    return func(*args, **kwds)
+                self.start(region)
+                try:
+                    return func(*args, **kwds)
+                finally:
+                    self.stop(region)
+
+            return wrapper
+
+        return decorator
+
+    def _collect(self, threads):
+        with self._lock:
+            roots = list(self._roots)
+        if threads:
+            return roots
+        merged = _TimerRegion(None)
+        for thread, root in roots:
+            merged.merge(root)
+        return [(None, merged)]
+
+    def to_dict(self, threads=False):
+        """Return the region statistics as nested dictionaries.
+
+        The result maps 'regions' to a list of the top-level regions,
+        or, if *threads* is :const:`True`, maps 'threads' to a list of
+        the statistics of each thread.  Each region is a dictionary
+        with the keys 'name', 'calls', 'total', 'self', 'min', 'max'
+        and 'children'.
+        """
+        def regions(root):
+            return [child.to_dict() for child in root.children.values()]
+
+        collected = self._collect(threads)
+        if not threads:
+            return {'regions': regions(collected[0][1])}
+        return {'threads': [{'thread': thread, 'regions': regions(root)}
+                            for thread, root in collected]}
+
+    def to_json(self, threads=False, **kwds):
+        """Return the region statistics as a JSON string.
+
+        Additional keyword arguments are passed to :func:`json.dumps`.
+        """
+        return json.dumps(self.to_dict(threads=threads), **kwds)
+
+    def report(self, ostream=None, threads=False):
+        """Print a table of the region statistics.
+
+        Args:
+            ostream (FILE): the output stream (default: sys.stdout)
+            threads (bool): if :const:`True`, then print a table for each
+                thread instead of combining the statistics of the threads.
+        """
+        if ostream is None:
+            ostream = sys.stdout
+        for thread, root in self._collect(threads):
+            if threads:
+                ostream.write("Thread: %s\n" % (thread,))
+            rows = []
+            self._report_rows(root, 0, rows)
+            width = max([len(row[0]) for row in rows] + [len("Region")])
+            fmt = "%%-%ds %%8s %%10s %%10s %%10s %%10s\n" % (width,)
+            ostream.write(fmt % ("Region", "Calls", "Total", "Self",
+                                 "Min", "Max"))
+            ostream.write("-" * (width + 53) + "\n")
+            for row in rows:
+                ostream.write(fmt % row)
+
+    def _report_rows(self, node, depth, rows):
+        for child in sorted(node.children.values(),
+                            key=lambda x: x.total, reverse=True):
+            if child.count:
+                rows.append(("  " * depth + str(child.name), child.count,
+                             "%.4f" % child.total, "%.4f" % child.self_time,
+                             "%.4f" % child.min, "%.4f" % child.max))
+            else:
+                rows.append(("  " * depth + str(child.name), 0, "-",
+                             "-", "-", "-"))
+            self._report_rows(child, depth + 1, rows)
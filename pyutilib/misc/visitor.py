@@ -1,8 +1,11 @@
-from collections import deque
+from collections import deque, OrderedDict
 
 
 class SimpleVisitor(object):
 
+    # Sub-classes can define __slots__ to avoid per-instance dictionaries
+    __slots__ = ()
+
     def visit(self, node):  #pragma: no cover
         """
 	    Visit a node in a tree and perform some operation on
@@ -111,19 +114,24 @@ class SimpleVisitor(object):
         Perform depth-first search starting at a node,
         where nodes are visited before their children.
 
+        This method uses a stack of iterators over the
+        children of the nodes being explored.
+
         Args:
             node: a node in a tree
 
         Returns:
             The value of the :func:`finalize` method.
         """
-        dq = deque([node])
-        while dq:
-            current = dq.pop()
-            self.visit(current)
-            if not self.is_leaf(current):
-                for c in reversed(self.children(current)):
-                    dq.append(c)
+        _stack = [iter((node,))]
+        while _stack:
+            for current in _stack[-1]:
+                self.visit(current)
+                if not self.is_leaf(current):
+                    _stack.append(iter(self.children(current)))
+                    break
+            else:
+                _stack.pop()
         return self.finalize()
 
     dfs = dfs_preorder
@@ -133,23 +141,24 @@ class SimpleVisitor(object):
         Perform depth-first search starting at a node,
         where nodes are visited after their children.
 
+        This method uses a stack of iterators over the
+        children of the nodes being explored.
+
         Args:
             node: a node in a tree
 
         Returns:
             The value of the :func:`finalize` method.
         """
-        expanded = set()
-        dq = deque([node])
-        while dq:
-            current = dq[-1]
-            if id(current) in expanded:
-                dq.pop()
-                self.visit(current)
+        _stack = [(node, iter(self.children(node)))]
+        while _stack:
+            current, _children = _stack[-1]
+            for c in _children:
+                _stack.append((c, iter(self.children(c))))
+                break
             else:
-                for c in reversed(self.children(current)):
-                    dq.append(c)
-                expanded.add(id(current))
+                _stack.pop()
+                self.visit(current)
         return self.finalize()
 
     def dfs_inorder(self, node):
@@ -164,26 +173,130 @@ class SimpleVisitor(object):
         Returns:
             The value of the :func:`finalize` method.
         """
-        expanded = set()
-        dq = deque([node])
-        while dq:
-            current = dq.pop()
-            if id(current) in expanded or self.is_leaf(current):
+        if self.is_leaf(node):
+            self.visit(node)
+            return self.finalize()
+        _stack = [(node, self.children(node), 0)]
+        while _stack:
+            current, _children, _idx = _stack.pop()
+            if _idx == len(_children):
+                continue
+            if _idx:
                 self.visit(current)
+            _stack.append((current, _children, _idx + 1))
+            c = _children[_idx]
+            if self.is_leaf(c):
+                self.visit(c)
             else:
-                first = True
-                for c in reversed(self.children(current)):
-                    if first:
-                        first = False
-                    else:
-                        dq.append(current)
-                    dq.append(c)
-                expanded.add(id(current))
+                _stack.append((c, self.children(c), 0))
         return self.finalize()
 
+    def walk(self, node):
+        """
+        Generate the events of a depth-first search starting at a node.
+
+        Each node generates an ``('enter', node)`` tuple before the
+        events of its children and an ``('exit', node)`` tuple after
+        them.  The :func:`visit` and :func:`finalize` methods are
+        not called.
+
+        Args:
+            node: a node in a tree
+
+        Returns:
+            A generator of ``(event, node)`` tuples.
+        """
+        yield 'enter', node
+        if self.is_leaf(node):
+            yield 'exit', node
+            return
+        _stack = [(node, iter(self.children(node)))]
+        while _stack:
+            current, _children = _stack[-1]
+            for c in _children:
+                yield 'enter', c
+                if self.is_leaf(c):
+                    yield 'exit', c
+                else:
+                    _stack.append((c, iter(self.children(c))))
+                    break
+            else:
+                _stack.pop()
+                yield 'exit', current
+
+
+class VisitCache(object):
+    """
+    A cache of the node values computed by
+    :func:`ValueVisitor.dfs_postorder_dag`.
+
+    Args:
+        key: a function that maps a node to a hashable key.  By
+            default, nodes are identified by :func:`id`, and the
+            cache keeps a reference to each node.
+        maxsize: the maximum number of values that are cached.  The
+            least recently used values are discarded first.  By
+            default, the cache is not bounded.
+
+    Attributes:
+        hits: the number of values found in the cache
+        misses: the number of values that were not found in the cache
+    """
+
+    __slots__ = ('key', 'maxsize', 'hits', 'misses', '_data')
+
+    def __init__(self, key=None, maxsize=None):
+        if (maxsize is not None) and (maxsize < 1):
+            raise ValueError("maxsize must be >= 1")
+        self.key = key
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = {} if maxsize is None else OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        """Remove the cached values and reset the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, node):
+        """
+        Return a tuple: ``(flag, value)``.  If ``flag`` is False, then
+        the node's value is not in the cache.
+        """
+        k = id(node) if self.key is None else self.key(node)
+        try:
+            entry = self._data[k]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        if self.maxsize is not None:
+            # mark the entry as recently used
+            del self._data[k]
+            self._data[k] = entry
+        return True, entry[1]
+
+    def store(self, node, value):
+        """Add the value of a node to the cache."""
+        if self.key is None:
+            # keep the node, so its id is not reused
+            self._data[id(node)] = (node, value)
+        else:
+            self._data[self.key(node)] = (None, value)
+        if (self.maxsize is not None) and (len(self._data) > self.maxsize):
+            self._data.popitem(last=False)
+
 
 class ValueVisitor(object):
 
+    # Sub-classes can define __slots__ to avoid per-instance dictionaries
+    __slots__ = ()
+
     def visit(self, node, values):  #pragma: no cover
         """
 	    Visit a node in a tree and compute its value using
@@ -291,11 +404,14 @@ class ValueVisitor(object):
         if flag:
             return value
         _values = [[]]
-        expanded = set()
-        dq = deque([node])
+        #
+        # Each entry is a node and a flag that indicates whether the
+        # node's children have been added to the deque
+        #
+        dq = deque([(node, False)])
         while dq:
-            current = dq[-1]
-            if id(current) in expanded:
+            current, expanded = dq[-1]
+            if expanded:
                 dq.pop()
                 values = _values.pop()
                 _values[-1].append( self.visit(current, values) )
@@ -305,9 +421,9 @@ class ValueVisitor(object):
                 _values[-1].append(value)
                 dq.pop()
             else:
+                dq[-1] = (current, True)
                 for c in reversed(self.children(current)):
-                    dq.append(c)
-                expanded.add(id(current))
+                    dq.append((c, False))
                 _values.append( [] )
         return self.finalize(_values[-1][0])
 
@@ -374,4 +490,59 @@ class ValueVisitor(object):
             else:
                 return self.finalize(ans)
 
+    def dfs_postorder_dag(self, node, cache=None):
+        """
+        Perform depth-first search starting at a node,
+        where nodes are visited after their children.
+
+        This method is like :func:`dfs_postorder_stack`, but the
+        values of non-leaf nodes are cached.  A node that is shared
+        by several parents is only visited once (while its value
+        remains in the cache), so the search is linear in the size
+        of a directed acyclic graph.
 
+        Args:
+            node: a node in a tree or a directed acyclic graph
+            cache: a :class:`VisitCache` object.  A cache that is
+                reused by several searches keeps the values computed
+                by earlier searches.  By default, an unbounded cache
+                that identifies nodes by :func:`id` is used.
+
+        Returns:
+            The value of the :func:`finalize` method.
+        """
+        if cache is None:
+            cache = VisitCache()
+        flag, value = self.visiting_potential_leaf(node)
+        if flag:
+            return value
+        flag, value = cache.lookup(node)
+        if flag:
+            return self.finalize(value)
+        _argList = self.children(node)
+        _stack = [ (node, _argList, 0, len(_argList), [])]
+        while 1:
+            _obj, _argList, _idx, _len, _result = _stack.pop()
+            while _idx < _len:
+                _sub = _argList[_idx]
+                _idx += 1
+                flag, value = self.visiting_potential_leaf(_sub)
+                if flag:
+                    _result.append( value )
+                    continue
+                flag, value = cache.lookup(_sub)
+                if flag:
+                    _result.append( value )
+                    continue
+                _stack.append( (_obj, _argList, _idx, _len, _result) )
+                _obj                    = _sub
+                _argList                = self.children(_sub)
+                _idx                    = 0
+                _len                    = len(_argList)
+                _result                 = []
+            ans = self.visit(_obj, _result)
+            cache.store(_obj, ans)
+            if _stack:
+                _stack[-1][-1].append( ans )
+            else:
+                return self.finalize(ans)
@@ -53,9 +53,12 @@ class _DictSAXHandler:
                  attr_prefix='@',
                  cdata_key='#text',
                  force_cdata=False,
-                 cdata_separator=''):
+                 cdata_separator='',
+                 coerce_values=True):
         self.path = []
         self.stack = []
+        # The character data for the current element is accumulated
+        # in a list, which is joined when the element ends.
         self.data = None
         self.item = None
         self.item_depth = item_depth
@@ -65,26 +68,33 @@ class _DictSAXHandler:
         self.cdata_key = cdata_key
         self.force_cdata = force_cdata
         self.cdata_separator = cdata_separator
+        self.coerce = yaml_eval if coerce_values else _identity
 
     def startElement(self, name, attrs):
         self.path.append((name, attrs or None))
         if len(self.path) > self.item_depth:
             self.stack.append((self.item, self.data))
-            attrs = OrderedDict((self.attr_prefix + key, yaml_eval(value))
-                                for (key, value) in attrs.items())
-            self.item = self.xml_attribs and attrs or None
+            if self.xml_attribs and attrs:
+                coerce = self.coerce
+                self.item = OrderedDict((self.attr_prefix + key, coerce(value))
+                                        for (key, value) in attrs.items())
+            else:
+                self.item = None
             self.data = None
 
     def endElement(self, name):
+        data = self.data
+        if data is not None:
+            data = self.cdata_separator.join(data)
         if len(self.path) == self.item_depth:
             item = self.item
             if item is None:
-                item = self.data
+                item = data
             should_continue = self.item_callback(self.path, item)
             if not should_continue:
                 raise ParsingInterrupted()
         if len(self.stack):
-            item, data = self.item, self.data
+            item = self.item
             self.item, self.data = self.stack.pop()
             if data and self.force_cdata and item is None:
                 item = OrderedDict()
@@ -100,22 +110,56 @@ class _DictSAXHandler:
 
     def characters(self, data):
         if data.strip():
-            if not self.data:
-                self.data = data
+            if self.data is None:
+                self.data = [data]
             else:
-                self.data += self.cdata_separator + data
+                self.data.append(data)
 
     def push_data(self, key, data):
         if self.item is None:
             self.item = OrderedDict()
+        data = self.coerce(data)
         try:
             value = self.item[key]
             if isinstance(value, list):
                 value.append(data)
             else:
-                self.item[key] = [value, yaml_eval(data)]
+                self.item[key] = [value, data]
         except KeyError:
-            self.item[key] = yaml_eval(data)
+            self.item[key] = data
+
+
+def _identity(value):
+    return value
+
+
+def _create_parser(handler):
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = handler.startElement
+    parser.EndElementHandler = handler.endElement
+    parser.CharacterDataHandler = handler.characters
+    return parser
+
+
+def _feed(parser, xml_input, chunk_size):
+    """
+    Feed the XML input to the parser, yielding after each chunk.
+    """
+    if hasattr(xml_input, 'read'):
+        while True:
+            chunk = xml_input.read(chunk_size)
+            if not chunk:
+                break
+            parser.Parse(chunk, False)
+            yield
+        parser.Parse('', True)
+    else:
+        parser.Parse(xml_input, True)
+    yield
+
+
+# The size of the chunks read from file-like inputs
+_chunk_size = 1 << 16
 
 
 def parse(xml_input, *args, **kwargs):
@@ -148,7 +192,12 @@ def parse(xml_input, *args, **kwargs):
     The callback function receives two parameters: the `path` from the document
     root to the item (name-attribs pairs), and the `item` (dict). If the
     callback's return value is false-ish, parsing will be stopped with the
-    :class:`ParsingInterrupted` exception.
+    :class:`ParsingInterrupted` exception.  See :func:`iterparse` for a
+    generator version of this mode.
+
+    File-like inputs are read and parsed in chunks of `chunk_size`.  If
+    `coerce_values` is `False`, then attribute and element values are
+    left as strings instead of being converted with `yaml_eval`.
 
     Streaming example::
 
@@ -165,13 +214,39 @@ def parse(xml_input, *args, **kwargs):
         path:[(u'a', {u'prop': u'x'}), (u'b', None)] item:2
 
     """
+    chunk_size = kwargs.pop('chunk_size', _chunk_size)
     handler = _DictSAXHandler(*args, **kwargs)
-    parser = expat.ParserCreate()
-    parser.StartElementHandler = handler.startElement
-    parser.EndElementHandler = handler.endElement
-    parser.CharacterDataHandler = handler.characters
-    if hasattr(xml_input, 'read'):
-        parser.ParseFile(xml_input)
-    else:
-        parser.Parse(xml_input, True)
+    parser = _create_parser(handler)
+    for _ in _feed(parser, xml_input, chunk_size):
+        pass
     return handler.item
+
+
+def iterparse(xml_input, item_depth=1, chunk_size=_chunk_size, **kwargs):
+    """Generate the items at the given depth of an XML input.
+
+    This is a generator version of the streaming mode of :func:`parse`.
+    It yields `(path, item)` tuples for each item at `item_depth`, where
+    `path` is a copy of the list of name-attribs pairs from the document
+    root.  File-like inputs are read in chunks of `chunk_size`, so only
+    the items found in one chunk are held in memory at a time.
+
+    Other keyword arguments are passed to the SAX handler, like the
+    keyword arguments of :func:`parse` (e.g. `attr_prefix`,
+    `cdata_key`).
+    """
+    if item_depth < 1:
+        raise ValueError("iterparse() requires an item_depth of at least 1")
+    items = []
+
+    def callback(path, item):
+        items.append((list(path), item))
+        return True
+
+    handler = _DictSAXHandler(
+        item_depth=item_depth, item_callback=callback, **kwargs)
+    parser = _create_parser(handler)
+    for _ in _feed(parser, xml_input, chunk_size):
+        for entry in items:
+            yield entry
+        del items[:]
@@ -14,6 +14,7 @@ import sys
 import uuid
 from collections import defaultdict
 
+from pyutilib.common.trace import traced
 from pyutilib.pyro.util import get_nameserver, using_pyro3, using_pyro4
 from pyutilib.pyro.util import Pyro as _pyro
 from pyutilib.pyro.util import set_maxconnections, get_dispatchers
@@ -93,6 +94,7 @@ class Dispatcher(base):
             self._pyroDaemon.shutdown()
 
     @oneway
+    @traced('Dispatcher.add_task', 'pyro')
     def add_task(self, task, type=None):
         if self._verbose:
             print("Received request to add task=<Task id=" + str(task['id']) +
@@ -103,6 +105,7 @@ class Dispatcher(base):
     # is a dictionary from queue type (including None)
     # to a list of tasks to be added to that queue.
     @oneway
+    @traced('Dispatcher.add_tasks', 'pyro')
     def add_tasks(self, tasks):
         if self._verbose:
             print("Received request to add bulk task set. Task ids=%s" % (dict(
@@ -114,6 +117,7 @@ class Dispatcher(base):
                 task_queue.put(task)
 
     @oneway
+    @traced('Dispatcher.add_result', 'pyro')
     def add_result(self, result, type=None):
         if self._verbose:
             print("Received request to add result with "
@@ -124,6 +128,7 @@ class Dispatcher(base):
     # is a dictionary from queue type (including None)
     # to a list of results to be added to that queue.
     @oneway
+    @traced('Dispatcher.add_results', 'pyro')
     def add_results(self, results):
         if self._verbose:
             print("Received request to add bulk result set for task ids=%s" %
@@ -216,6 +221,7 @@ class Dispatcher(base):
             return True
         return False
 
+    @traced('Dispatcher.get_task', 'pyro')
     def get_task(self, type=None, block=True, timeout=5):
         if self._verbose:
             print("Received request to get a task from "
@@ -227,6 +233,7 @@ class Dispatcher(base):
         except Queue.Empty:
             return None
 
+    @traced('Dispatcher.get_tasks', 'pyro')
     def get_tasks(self, type_block_timeout_list):
         if self._verbose:
             print("Received request to get tasks in bulk. "
@@ -252,6 +259,7 @@ class Dispatcher(base):
 
         return ret
 
+    @traced('Dispatcher.get_result', 'pyro')
     def get_result(self, type=None, block=True, timeout=5):
         if self._verbose:
             print("Received request to get a result from "
@@ -262,6 +270,7 @@ class Dispatcher(base):
         except Queue.Empty:
             return None
 
+    @traced('Dispatcher.get_results', 'pyro')
     def get_results(self, type_block_timeout_list):
         if self._verbose:
             print("Received request to get results in bulk. "
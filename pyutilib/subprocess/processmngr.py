@@ -17,7 +17,7 @@ import os
 import sys
 import tempfile
 import subprocess
-from six import itervalues
+from six import itervalues, string_types
 from threading import Thread
 
 _mswindows = sys.platform.startswith('win')
@@ -51,7 +51,7 @@ except:
     _peek_available = False
 
 import pyutilib.services
-from pyutilib.common import ApplicationError
+from pyutilib.common import ApplicationError, trace
 from pyutilib.misc import quote_split
 
 try:
@@ -410,26 +410,39 @@ def _pseudo_merged_reader(*args):
 # After this is finished, we can get the output from this command from
 # the process.stdout file descriptor.
 #
-def run_command(cmd,
-                outfile=None,
-                cwd=None,
-                ostream=None,
-                stdin=None,
-                stdout=None,
-                stderr=None,
-                valgrind=False,
-                valgrind_log=None,
-                valgrind_options=None,
-                memmon=False,
-                env=None,
-                define_signal_handlers=True,
-                debug=False,
-                verbose=True,
-                timelimit=None,
-                tee=None,
-                ignore_output=False,
-                shell=False,
-                thread_reader=None):
+def run_command(cmd, *args, **kwds):
+    if not trace._sinks:
+        return _run_command(cmd, *args, **kwds)
+    if isinstance(cmd, string_types):
+        cmd_str = cmd
+    else:
+        cmd_str = ' '.join(cmd)
+    with trace.span('run_command', 'subprocess', cmd=cmd_str) as span:
+        ans = _run_command(cmd, *args, **kwds)
+        span.set_attribute('rc', ans[0])
+        return ans
+
+
+def _run_command(cmd,
+                 outfile=None,
+                 cwd=None,
+                 ostream=None,
+                 stdin=None,
+                 stdout=None,
+                 stderr=None,
+                 valgrind=False,
+                 valgrind_log=None,
+                 valgrind_options=None,
+                 memmon=False,
+                 env=None,
+                 define_signal_handlers=True,
+                 debug=False,
+                 verbose=True,
+                 timelimit=None,
+                 tee=None,
+                 ignore_output=False,
+                 shell=False,
+                 thread_reader=None):
     #
     # Move to the specified working directory
     #
@@ -25,3 +25,7 @@ try:
     import pyutilib.th.nose_timeout
 except ImportError:
     pass
+try:
+    import pyutilib.th.nose_durations
+except ImportError:
+    pass
@@ -0,0 +1,249 @@
+"""This module defines a nose plugin that keeps a history of the
+duration of each test, and functions that use the history to schedule
+tests across parallel workers.
+
+Use the following command-line options with nosetests ::
+
+    nosetests --with-durations --durations-file=durations.json
+
+The history is a JSON file that maps each test id to the smoothed
+duration of the test (in seconds) and the group of the test.  A group
+is a test class ('path/to/module.py:Class') or, for test functions, a
+module file.  Groups are nose test names, so they are passed to the
+workers as the tests to run.  The tests in a group share their
+fixtures, so they are always scheduled on the same worker.  If nose
+is run with --collect-only, then the tests are recorded without
+durations.
+
+The plugin is not registered as a nose entry point; the module can be
+executed to run nose with the plugin enabled ::
+
+    python -m pyutilib.th.nose_durations --with-durations [nose options]
+
+"""
+
+__all__ = ['DurationHistory', 'TestDurations', 'lpt_schedule',
+           'schedule_groups']
+
+import heapq
+import json
+import os
+from time import time
+
+from nose.plugins.base import Plugin
+
+
+class DurationHistory(object):
+    """The durations of the tests in previous runs.
+
+    A new duration is averaged with the previous duration of a test
+    using exponential smoothing, so a test that slows down (or speeds
+    up) is estimated accurately after a few runs.
+
+    Args:
+        filename (str): a history file that is loaded, if it exists
+        alpha (float): the weight of a new duration in the average
+    """
+
+    def __init__(self, filename=None, alpha=0.5):
+        self.alpha = alpha
+        self.tests = {}
+        # The time that a worker process spends outside of the tests
+        self.overhead = None
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+
+    def load(self, filename):
+        """Add the tests in a history file."""
+        with open(filename, 'r') as INPUT:
+            data = json.load(INPUT)
+        for test_id, info in data.get('tests', {}).items():
+            self.record(test_id, info.get('time', None),
+                        info.get('group', None))
+        self.record_overhead(data.get('overhead', None))
+
+    def save(self, filename):
+        """Write the history to a file."""
+        with open(filename, 'w') as OUTPUT:
+            json.dump({'version': 1, 'overhead': self.overhead,
+                       'tests': self.tests}, OUTPUT, indent=1, sort_keys=True)
+
+    def record(self, test_id, seconds, group=None):
+        """Record the duration of a test.
+
+        If seconds is None, then the test is recorded (or its group is
+        updated) without changing its duration.
+        """
+        info = self.tests.get(test_id, None)
+        if info is None:
+            info = self.tests[test_id] = {'time': None, 'group': group}
+        elif group is not None:
+            info['group'] = group
+        if seconds is None:
+            return
+        if info['time'] is None:
+            info['time'] = seconds
+        else:
+            info['time'] += self.alpha * (seconds - info['time'])
+
+    def record_overhead(self, seconds):
+        """Record the time that a worker spent outside of the tests."""
+        if seconds is None:
+            return
+        if self.overhead is None:
+            self.overhead = seconds
+        else:
+            self.overhead += self.alpha * (seconds - self.overhead)
+
+    def merge(self, other):
+        """Record the durations of the tests in another history."""
+        for test_id, info in other.tests.items():
+            self.record(test_id, info['time'], info['group'])
+        self.record_overhead(other.overhead)
+
+    def total(self):
+        """Returns the sum of the durations of the tests."""
+        return sum(info['time'] for info in self.tests.values()
+                   if info['time'] is not None)
+
+    def estimate(self, test_id, default=None):
+        """Returns the estimated duration of a test."""
+        info = self.tests.get(test_id, None)
+        if info is None or info['time'] is None:
+            return default
+        return info['time']
+
+    def mean(self, default=1.0):
+        """Returns the mean duration of the tests."""
+        times = [info['time'] for info in self.tests.values()
+                 if info['time'] is not None]
+        if not times:
+            return default
+        return sum(times) / len(times)
+
+    def __len__(self):
+        return len(self.tests)
+
+
+def lpt_schedule(durations, nbins):
+    """Assign jobs to bins with the longest-processing-time-first rule.
+
+    The jobs are sorted by decreasing duration, and each job is added
+    to the bin with the smallest total duration.  The makespan (the
+    largest total) is at most 4/3 of the optimal makespan.
+
+    Args:
+        durations (dict): the estimated duration of each job
+        nbins (int): the number of bins
+
+    Returns:
+        A tuple (bins, loads), where bins is a list of the jobs in each
+        bin and loads is a list of the total durations of the bins.
+    """
+    bins = [[] for i in range(nbins)]
+    loads = [0.0] * nbins
+    heap = [(0.0, i) for i in range(nbins)]
+    # Sorting by the job as well makes the schedule deterministic
+    for job, duration in sorted(durations.items(),
+                                key=lambda x: (-x[1], x[0])):
+        load, i = heapq.heappop(heap)
+        bins[i].append(job)
+        loads[i] = load + duration
+        heapq.heappush(heap, (loads[i], i))
+    return bins, loads
+
+
+def schedule_groups(collected, history, nbins):
+    """Schedule the groups of collected tests on a number of workers.
+
+    The duration of a group is the sum of the estimated durations of
+    its tests.  Tests that are not in the history are estimated with
+    the mean duration in the history.  The predicted load of each
+    worker includes the overhead of a worker process in the history.
+    Tests without a group (i.e., tests that nose cannot locate in a
+    file) are not scheduled; the caller must report them.
+
+    Args:
+        collected (DurationHistory): the tests to run, with their groups
+        history (DurationHistory): the durations of previous runs
+        nbins (int): the number of workers
+
+    Returns:
+        A tuple (bins, loads) like :func:`lpt_schedule`.  Empty bins
+        are omitted.
+    """
+    default = history.mean()
+    durations = {}
+    for test_id, info in collected.tests.items():
+        group = info['group']
+        if group is None:
+            continue
+        durations[group] = durations.get(group, 0.0) + \
+            history.estimate(test_id, default)
+    bins, loads = lpt_schedule(durations, nbins)
+    overhead = history.overhead or 0.0
+    return ([b for b in bins if b],
+            [l + overhead for b, l in zip(bins, loads) if b])
+
+
+def get_test_group(test):
+    """Returns the group of a nose test, or None if the test is not
+    in a file."""
+    try:
+        address = test.address()
+    except Exception:
+        address = None
+    if not address or address[0] is None:
+        return None
+    path, call = address[0], address[2]
+    if call and '.' in call:
+        return path + ':' + call.split('.')[0]
+    return path
+
+
+class TestDurations(Plugin):
+    """Keep a history of the duration of each test."""
+    name = 'durations'
+    score = 2000
+
+    def options(self, parser, env):
+        """Sets additional command line options."""
+        Plugin.options(self, parser, env)
+        parser.add_option(
+            '--durations-file',
+            action='store',
+            dest='durations_file',
+            metavar="FILE",
+            default=env.get('NOSE_DURATIONS_FILE', 'durations.json'),
+            help=("Path to the JSON file with the history of the test "
+                  "durations.  Default is durations.json in the working "
+                  "directory [NOSE_DURATIONS_FILE]"))
+
+    def configure(self, options, config):
+        """Configures the durations plugin."""
+        Plugin.configure(self, options, config)
+        if self.enabled:
+            self.filename = options.durations_file
+            self.collect_only = getattr(options, 'collect_only', False)
+            self.history = DurationHistory(self.filename)
+
+    def startTest(self, test):
+        """Initializes a timer before starting a test."""
+        self._timer = time()
+
+    def stopTest(self, test):
+        """Records the duration of a test."""
+        if self.collect_only or not hasattr(self, '_timer'):
+            seconds = None
+        else:
+            seconds = time() - self._timer
+        self.history.record(test.id(), seconds, get_test_group(test))
+
+    def finalize(self, result):
+        """Writes the history file."""
+        self.history.save(self.filename)
+
+
+if __name__ == '__main__':
+    import nose
+    nose.main(addplugins=[TestDurations()])
@@ -5,12 +5,30 @@ Use the following command-line option with nosetests ::
 
     nosetests --test-timeout=###
 
+The timeouts are enforced by a watchdog thread, so tests may run in
+any thread and several tests may run concurrently in one process.
+When a test exceeds the timeout, the watchdog dumps the stack of each
+thread to stderr (with faulthandler, if it is available), kills the
+processes that were started by the test, and raises a Timeout
+exception in the thread that is running the test.  A test that is
+running in the main thread is interrupted with a signal, so blocking
+calls like time.sleep() are interrupted.  Tests in other threads are
+interrupted when they next execute Python code.
+
+The descendants of the test process are found with psutil or, on
+Linux, by reading /proc.  If other tests are running when a test
+times out, then the processes are not killed, since they may belong
+to the other tests.
 """
 
-__all__ = ['Timeout', 'TestTimeout']
+__all__ = ['Timeout', 'TestTimeout', 'Watchdog', 'kill_descendants']
 
+import heapq
 import os
 import signal
+import sys
+import threading
+from time import time
 from nose.plugins.base import Plugin
 try:
     from psutil import Process
@@ -19,10 +37,223 @@ except ImportError:
     _psutil_avail = False
 except NotImplementedError:
     _psutil_avail = False
+try:
+    import faulthandler
+except ImportError:  #pragma:nocover
+    faulthandler = None
+try:
+    import ctypes
+    _set_async_exc = ctypes.pythonapi.PyThreadState_SetAsyncExc
+    if sys.version_info >= (3, 7):
+        _thread_id = ctypes.c_ulong
+    else:  #pragma:nocover
+        _thread_id = ctypes.c_long
+except (ImportError, AttributeError):  #pragma:nocover
+    _set_async_exc = None
+
+try:
+    _get_ident = threading.get_ident
+except AttributeError:  #pragma:nocover
+    _get_ident = threading._get_ident
+
+
+def _main_thread_ident():
+    try:
+        return threading.main_thread().ident
+    except AttributeError:  #pragma:nocover
+        # Python 2
+        for thread in threading.enumerate():
+            if isinstance(thread, threading._MainThread):
+                return thread.ident
 
 
 class Timeout(Exception):
-    pass
+
+    def __init__(self, *args):
+        # Exceptions raised with PyThreadState_SetAsyncExc are created
+        # without arguments
+        if not args:
+            args = ("Test exceeded timeout",)
+        Exception.__init__(self, *args)
+
+
+class Watchdog(object):
+    """A thread that calls a function when a deadline expires.
+
+    Deadlines are added with :func:`add` and removed with
+    :func:`cancel`.  When a deadline expires, the callback is called
+    with the key of the deadline, from the watchdog thread.  The thread
+    is started when the first deadline is added.  The callback is
+    called without holding the watchdog lock, so deadlines can be added
+    and cancelled while it runs.
+
+    Args:
+        callback: the function that is called with the key of each
+            expired deadline
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._cond = threading.Condition()
+        self._heap = []
+        self._active = {}
+        self._counter = 0
+        self._thread = None
+
+    def add(self, timeout, key):
+        """Add a deadline, which expires after timeout seconds.
+
+        Returns a token that is used to cancel the deadline.
+        """
+        with self._cond:
+            self._counter += 1
+            token = self._counter
+            deadline = time() + timeout
+            self._active[token] = key
+            heapq.heappush(self._heap, (deadline, token))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='pyutilib.th.Watchdog')
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+        return token
+
+    def cancel(self, token):
+        """Remove a deadline.  Returns False if it already expired."""
+        with self._cond:
+            return self._active.pop(token, None) is not None
+
+    def active(self):
+        """Returns the number of deadlines that have not expired."""
+        return len(self._active)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                key = self._next_expired()
+            try:
+                self.callback(key)
+            except Exception:  #pragma:nocover
+                pass
+
+    def _next_expired(self):
+        """Wait for the next deadline to expire, and return its key.
+        The caller holds the lock."""
+        heap = self._heap
+        while True:
+            # Discard the deadlines that were cancelled
+            while heap and heap[0][1] not in self._active:
+                heapq.heappop(heap)
+            if not heap:
+                self._cond.wait()
+                continue
+            delay = heap[0][0] - time()
+            if delay > 0:
+                self._cond.wait(delay)
+                continue
+            deadline, token = heapq.heappop(heap)
+            return self._active.pop(token)
+
+
+def _children_from_proc():
+    """Returns the pids of the descendants of this process, by reading
+    the parent pids in /proc."""
+    children = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open('/proc/%s/stat' % name) as INPUT:
+                stat = INPUT.read()
+        except (IOError, OSError):
+            continue
+        # The command name is in parentheses, and may contain spaces
+        ppid = int(stat[stat.rfind(')') + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(name))
+    ans = []
+    queue = [os.getpid()]
+    while queue:
+        pid = queue.pop()
+        for child in children.get(pid, ()):
+            ans.append(child)
+            queue.append(child)
+    return ans
+
+
+def descendants():
+    """Returns the pids of the descendants of this process."""
+    if _psutil_avail:
+        proc = Process(os.getpid())
+        if hasattr(proc, 'children'):
+            return [p.pid for p in proc.children(recursive=True)]
+        # psutil < 2.0
+        ans = []
+        queue = [proc]
+        while queue:
+            for child in queue.pop().get_children():
+                ans.append(child.pid)
+                queue.append(child)
+        return ans
+    if os.path.isdir('/proc'):
+        return _children_from_proc()
+    return []
+
+
+def kill_descendants():
+    """Kill the descendants of this process.
+
+    The process groups that are led by descendants are also killed, so
+    processes that were started in a new process group are killed
+    along with the processes that they started.
+    """
+    pids = descendants()
+    if not pids or not hasattr(os, 'killpg'):
+        sig = getattr(signal, 'SIGKILL', signal.SIGTERM)
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except OSError:
+                pass
+        return pids
+    mygroup = os.getpgid(0)
+    groups = set()
+    for pid in pids:
+        try:
+            group = os.getpgid(pid)
+        except OSError:
+            continue
+        if group != mygroup:
+            groups.add(group)
+    for group in groups:
+        try:
+            os.killpg(group, signal.SIGKILL)
+        except OSError:
+            pass
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+    return pids
+
+
+def _format_timeout(timeout):
+    hour = int(timeout / 3600)
+    min = int(timeout / 60) - hour * 60
+    sec = timeout % 60
+    txt = ""
+    if hour:
+        txt = "%d hour%s" % (hour, hour > 1 and "s" or "")
+    if min:
+        if txt:
+            txt += ", "
+        txt += "%d minute%s" % (min, min > 1 and "s" or "")
+    if sec:
+        if txt:
+            txt += ", "
+        txt += "%g second%s" % (sec, sec != 1 and "s" or "")
+    return txt
 
 
 class TestTimeout(Plugin):
@@ -42,46 +273,119 @@ class TestTimeout(Plugin):
             "[NOSE_TEST_TIMEOUT]")
 
     def configure(self, options, config):
-        self.timeout = int(options.test_timeout)
+        self.timeout = float(options.test_timeout)
         self.enabled = self.timeout > 0
-        if self.enabled and not _psutil_avail:
-            self.enabled = False
-            raise ImportError(
-                "The nose Timeout plugin requires the psutil package.")
+        if self.enabled:
+            self.watchdog = Watchdog(self._expired)
+            # The lock guards the running tests and the interrupts, so a
+            # test is never interrupted after stopTest() is called.
+            self._lock = threading.Lock()
+            # The key and watchdog token of the test running in each thread
+            self._running = {}
+            # The threads that were sent a Timeout that was not raised yet
+            self._pending = set()
+            self._count = 0
+            self._message = "Test exceeded timeout (%s)" % \
+                _format_timeout(self.timeout)
 
     def startTest(self, test):
-        signal.signal(signal.SIGALRM, self._killTest)
-        signal.alarm(self.timeout)
+        ident = _get_ident()
+        if self._use_signal(ident):
+            self._handler = signal.signal(signal.SIGALRM, self._killTest)
+        with self._lock:
+            self._count += 1
+            key = (ident, self._count)
+            self._running[ident] = (key, self.watchdog.add(self.timeout, key))
 
     def stopTest(self, test):
-        signal.alarm(0)
-
-    def _all_children(self, p):
-        ans = p.get_children()
-        i = 0
-        while i < len(ans):
-            ans.extend(self._all_children(ans[i]))
-            i += 1
-        return ans
+        ident = _get_ident()
+        try:
+            self._stop(ident)
+        except Timeout:
+            # The test timed out as it finished.  The Timeout is raised
+            # only once, so stopping the test again does not raise it.
+            self._stop(ident)
 
-    def _killTest(self, signum, frame):
-        for p in self._all_children(Process(os.getpid())):
+    def _stop(self, ident):
+        with self._lock:
+            entry = self._running.pop(ident, None)
+            interrupted = ident in self._pending
+            self._pending.discard(ident)
+        if entry is not None and not self.watchdog.cancel(entry[1]):
+            # The deadline expired, so a Timeout may have been sent
+            # that is not raised yet
+            if interrupted:
+                self._absorb(ident)
+        if self._use_signal(ident):
+            signal.signal(signal.SIGALRM, self._handler)
+
+    def _expired(self, key):
+        """Called by the watchdog thread when a test times out."""
+        ident = key[0]
+        with self._lock:
+            if self._running.get(ident, (None,))[0] != key:
+                # The test finished
+                return
+            alone = len(self._running) == 1
+        stream = sys.__stderr__
+        stream.write("\n%s; the threads are executing:\n" % self._message)
+        stream.flush()
+        if faulthandler is not None:
             try:
-                p.kill()
-            except:
+                faulthandler.dump_traceback(stream, all_threads=True)
+            except (AttributeError, ValueError, IOError):
                 pass
-        hour = int(self.timeout / 3600)
-        min = int(self.timeout / 60) - hour * 60
-        sec = self.timeout % 60
-        txt = ""
-        if hour:
-            txt = "%d hour%s" % (hour, hour > 1 and "s" or "")
-        if min:
-            if txt:
-                txt += ", "
-            txt += "%d minute%s" % (min, min > 1 and "s" or "")
-        if sec:
-            if txt:
-                txt += ", "
-            txt += "%d second%s" % (sec, sec > 1 and "s" or "")
-        raise Timeout("Test exceeded timeout (%s)" % txt)
+        if alone:
+            kill_descendants()
+        with self._lock:
+            if self._running.get(ident, (None,))[0] == key:
+                self._pending.add(ident)
+                self._interrupt(ident)
+
+    def _use_signal(self, ident):
+        """Returns True if a thread is interrupted with a signal."""
+        return ident == _main_thread_ident() and \
+            (hasattr(signal, 'pthread_kill') or
+             hasattr(signal, 'setitimer') or hasattr(signal, 'alarm'))
+
+    def _interrupt(self, ident):
+        """Raise a Timeout exception in a thread."""
+        if self._use_signal(ident):
+            if hasattr(signal, 'pthread_kill'):
+                signal.pthread_kill(ident, signal.SIGALRM)
+            elif hasattr(signal, 'setitimer'):
+                # Python 2 cannot signal a thread, but the SIGALRM of a
+                # timer is delivered to the main thread, which also
+                # interrupts a blocking call.
+                signal.setitimer(signal.ITIMER_REAL, 0.001)
+            else:
+                signal.alarm(1)
+        elif _set_async_exc is not None:
+            _set_async_exc(_thread_id(ident), ctypes.py_object(Timeout))
+
+    def _absorb(self, ident):
+        """Discard a Timeout that was sent to a thread, but not raised."""
+        if self._use_signal(ident) and not hasattr(signal, 'pthread_kill'):
+            # Cancel the timer.  A signal that was already received is
+            # handled without raising the Timeout.
+            if hasattr(signal, 'setitimer'):
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            else:
+                signal.alarm(0)
+        elif self._use_signal(ident):
+            # Changing the signal mask calls the handlers of the signals
+            # that were received, and a signal that was not received yet
+            # is blocked and then accepted.  The handler does not raise
+            # the Timeout, since the thread is no longer pending.
+            mask = signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGALRM])
+            if signal.SIGALRM in signal.sigpending():
+                signal.sigwait([signal.SIGALRM])
+            signal.pthread_sigmask(signal.SIG_SETMASK, mask)
+        elif _set_async_exc is not None:
+            _set_async_exc(_thread_id(ident), None)
+
+    def _killTest(self, signum, frame):
+        ident = _get_ident()
+        if ident in self._pending:
+            self._pending.discard(ident)
+            raise Timeout(self._message)
@@ -363,6 +363,29 @@ class TestCase(unittest.TestCase):
                       baseline + "\nDiffs:\n" + diffs)
         return [flag, lineno]
 
+    def assertFilesEqualBaselines(self,
+                                  pairs,
+                                  filter=None,
+                                  delete=True,
+                                  tolerance=None,
+                                  nprocs=None):
+        import pyutilib.misc
+        pairs = list(pairs)
+        results = pyutilib.misc.compare_files_parallel(
+            pairs, filter=filter, tolerance=tolerance, nprocs=nprocs)
+        msgs = []
+        for (testfile, baseline), (flag, lineno, diffs) in zip(pairs, results):
+            if not flag:
+                if delete:
+                    os.remove(testfile)
+            else:  #pragma:nocover
+                msgs.append("Unexpected output difference at line " + str(
+                    lineno) + ":\n   testfile=" + testfile + "\n   baseline="
+                            + baseline + "\nDiffs:\n" + diffs)
+        if msgs:  #pragma:nocover
+            self.fail("\n".join(msgs))
+        return results
+
     def assertFileEqualsLargeBaseline(self, testfile, baseline, delete=True):
         import pyutilib.misc
         flag = pyutilib.misc.compare_large_file(testfile, baseline)
@@ -0,0 +1,127 @@
+#
+# Unit Tests for pyutilib.th.nose_durations
+#
+
+import os
+from os.path import abspath, dirname
+currdir = dirname(abspath(__file__)) + os.sep
+
+import pyutilib.th as unittest
+try:
+    from pyutilib.th import nose_durations
+    nose_available = True
+except ImportError:
+    nose_available = False
+
+
+class FakeTest(object):
+
+    def __init__(self, test_id, address):
+        self._id = test_id
+        self._address = address
+
+    def id(self):
+        return self._id
+
+    def address(self):
+        return self._address
+
+
+@unittest.skipIf(not nose_available, "Nose is not available")
+class TestDurations(unittest.TestCase):
+
+    def test_history(self):
+        history = nose_durations.DurationHistory(alpha=0.5)
+        history.record('a.T.test1', 2.0, 'a:T')
+        history.record('a.T.test1', 4.0)
+        history.record('a.test2', None, 'a')
+        self.assertEqual(history.estimate('a.T.test1'), 3.0)
+        self.assertEqual(history.tests['a.T.test1']['group'], 'a:T')
+        self.assertIsNone(history.estimate('a.test2'))
+        self.assertEqual(history.estimate('b.test', 1.5), 1.5)
+        self.assertEqual(history.mean(), 3.0)
+        self.assertEqual(len(history), 2)
+        history.record_overhead(1.0)
+        history.record_overhead(2.0)
+        self.assertEqual(history.overhead, 1.5)
+
+        other = nose_durations.DurationHistory()
+        other.record('a.test2', 1.0)
+        other.record_overhead(0.5)
+        history.merge(other)
+        self.assertEqual(history.estimate('a.test2'), 1.0)
+        self.assertEqual(history.tests['a.test2']['group'], 'a')
+        self.assertEqual(history.total(), 4.0)
+        self.assertEqual(history.overhead, 1.0)
+
+        history.save(currdir + 'durations.json')
+        try:
+            copy = nose_durations.DurationHistory(currdir + 'durations.json')
+        finally:
+            os.remove(currdir + 'durations.json')
+        self.assertEqual(copy.tests, history.tests)
+        self.assertEqual(copy.overhead, history.overhead)
+        self.assertEqual(len(nose_durations.DurationHistory(
+            currdir + 'durations.json')), 0)
+
+    def test_lpt_schedule(self):
+        bins, loads = nose_durations.lpt_schedule(
+            {'a': 5, 'b': 4, 'c': 3, 'd': 3, 'e': 3, 'f': 2}, 2)
+        self.assertEqual(bins, [['a', 'd', 'f'], ['b', 'c', 'e']])
+        self.assertEqual(loads, [10, 10])
+        bins, loads = nose_durations.lpt_schedule({'a': 1}, 3)
+        self.assertEqual(bins, [['a'], [], []])
+        self.assertEqual(loads, [1, 0, 0])
+
+    def test_schedule_groups(self):
+        collected = nose_durations.DurationHistory()
+        for name in ('m1.A.t1', 'm1.A.t2', 'm2.t3', 'm3.B.t4', 'm4.t5'):
+            group = name.rsplit('.', 1)[0].replace('.', '.py:')
+            if ':' not in group:
+                group += '.py'
+            collected.record(name, None, group)
+        # Tests without a group are not scheduled
+        collected.record('x', None, None)
+        history = nose_durations.DurationHistory()
+        history.record('m1.A.t1', 3.0)
+        history.record('m1.A.t2', 1.0)
+        history.record('m2.t3', 2.0)
+        # 'm3.B.t4' and 'm4.t5' are estimated with the mean (2.0)
+        history.record_overhead(0.5)
+        bins, loads = nose_durations.schedule_groups(collected, history, 3)
+        self.assertEqual(bins, [['m1.py:A'], ['m2.py', 'm4.py'], ['m3.py:B']])
+        self.assertEqual(loads, [4.5, 4.5, 2.5])
+        bins, loads = nose_durations.schedule_groups(collected, history, 10)
+        self.assertEqual(len(bins), 4)
+
+    def test_plugin(self):
+        self.assertEqual(
+            nose_durations.get_test_group(
+                FakeTest('m.T.test', ('m.py', 'm', 'T.test'))), 'm.py:T')
+        self.assertEqual(
+            nose_durations.get_test_group(
+                FakeTest('m.test', ('m.py', 'm', 'test'))), 'm.py')
+        self.assertIsNone(
+            nose_durations.get_test_group(FakeTest('x', None)))
+        self.assertIsNone(
+            nose_durations.get_test_group(FakeTest('x', (None, 'x', None))))
+
+        plugin = nose_durations.TestDurations()
+        plugin.collect_only = False
+        plugin.history = nose_durations.DurationHistory()
+        test = FakeTest('m.T.test', ('m.py', 'm', 'T.test'))
+        plugin.startTest(test)
+        plugin.stopTest(test)
+        self.assertGreaterEqual(plugin.history.estimate('m.T.test'), 0)
+        self.assertEqual(plugin.history.tests['m.T.test']['group'], 'm.py:T')
+
+        plugin.collect_only = True
+        test = FakeTest('m.test', ('m.py', 'm', 'test'))
+        plugin.startTest(test)
+        plugin.stopTest(test)
+        self.assertIsNone(plugin.history.estimate('m.test'))
+        self.assertEqual(plugin.history.tests['m.test']['group'], 'm.py')
+
+
+if __name__ == "__main__":
+    unittest.main()
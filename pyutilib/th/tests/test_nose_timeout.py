@@ -0,0 +1,168 @@
+#
+# Unit Tests for pyutilib.th.nose_timeout
+#
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pyutilib.th as unittest
+from pyutilib.misc import Options
+try:
+    from pyutilib.th import nose_timeout
+    nose_available = True
+except ImportError:
+    nose_available = False
+
+
+def _plugin(timeout):
+    plugin = nose_timeout.TestTimeout()
+    plugin.configure(Options(test_timeout=timeout), None)
+    return plugin
+
+
+@unittest.skipIf(not nose_available, "Nose is not available")
+class TestTimeout(unittest.TestCase):
+
+    def test_watchdog(self):
+        expired = []
+        watchdog = nose_timeout.Watchdog(expired.append)
+        t1 = watchdog.add(0.05, 'a')
+        t2 = watchdog.add(0.01, 'b')
+        t3 = watchdog.add(10, 'c')
+        self.assertTrue(watchdog.cancel(t1))
+        time.sleep(0.2)
+        self.assertEqual(expired, ['b'])
+        self.assertFalse(watchdog.cancel(t2))
+        self.assertEqual(watchdog.active(), 1)
+        self.assertTrue(watchdog.cancel(t3))
+        self.assertEqual(watchdog.active(), 0)
+
+    @unittest.skipIf(not (hasattr(signal, 'pthread_kill') or
+                          hasattr(signal, 'setitimer') or
+                          hasattr(signal, 'alarm')),
+                     "Main-thread timeouts require signals")
+    def test_main_thread(self):
+        plugin = _plugin(0.2)
+        start = time.time()
+        plugin.startTest(None)
+        try:
+            self.assertRaises(nose_timeout.Timeout, time.sleep, 5)
+        finally:
+            plugin.stopTest(None)
+        self.assertLess(time.time() - start, 4)
+
+    @unittest.skipIf(not hasattr(signal, 'pthread_sigmask'),
+                     "Blocking a received signal requires pthread_sigmask")
+    def test_absorb(self):
+        # A timeout signal that is received after the test finished does
+        # not raise a Timeout or reach the previous signal handler
+        received = []
+        handler = signal.signal(signal.SIGALRM,
+                                lambda signum, frame: received.append(signum))
+        plugin = _plugin(0.05)
+        try:
+            plugin.startTest(None)
+            mask = signal.pthread_sigmask(signal.SIG_BLOCK, [signal.SIGALRM])
+            try:
+                end = time.time() + 5
+                while not plugin._pending and time.time() < end:
+                    time.sleep(0.01)
+                self.assertTrue(plugin._pending)
+                plugin.stopTest(None)
+            finally:
+                signal.pthread_sigmask(signal.SIG_SETMASK, mask)
+            time.sleep(0.1)
+        finally:
+            signal.signal(signal.SIGALRM, handler)
+        self.assertEqual(received, [])
+
+    def test_threads(self):
+        plugin = _plugin(0.2)
+        results = {}
+
+        def run(name, seconds):
+            plugin.startTest(None)
+            end = time.time() + seconds
+            try:
+                while time.time() < end:
+                    pass
+                results[name] = 'ok'
+            except nose_timeout.Timeout:
+                results[name] = 'timeout'
+            finally:
+                plugin.stopTest(None)
+
+        threads = [threading.Thread(target=run, args=('short', 0.01)),
+                   threading.Thread(target=run, args=('long', 5))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {'short': 'ok', 'long': 'timeout'})
+
+    def test_deadline(self):
+        # A test that finishes while its timeout is being processed is
+        # not interrupted, and stopTest() does not wait for the watchdog
+        plugin = _plugin(0.05)
+        expired = threading.Event()
+        kill = nose_timeout.kill_descendants
+
+        def slow_kill():
+            expired.set()
+            time.sleep(0.5)
+
+        def run(results):
+            plugin.startTest(None)
+            try:
+                expired.wait(5)
+            finally:
+                start = time.time()
+                plugin.stopTest(None)
+                results.append(time.time() - start)
+            # The Timeout is not raised after the test finished
+            time.sleep(0.7)
+            results.append('ok')
+
+        nose_timeout.kill_descendants = slow_kill
+        try:
+            for main in (True, False):
+                expired.clear()
+                results = []
+                if main:
+                    run(results)
+                else:
+                    thread = threading.Thread(target=run, args=(results,))
+                    thread.start()
+                    thread.join()
+                self.assertTrue(expired.is_set())
+                self.assertLess(results[0], 0.3)
+                self.assertEqual(results[1], 'ok')
+        finally:
+            nose_timeout.kill_descendants = kill
+
+    @unittest.skipIf(not (nose_available and nose_timeout._psutil_avail) and
+                     not os.path.isdir('/proc'),
+                     "Finding the child processes requires psutil or /proc")
+    def test_kill_descendants(self):
+        kwds = {}
+        if hasattr(os, 'setsid'):
+            kwds['preexec_fn'] = os.setsid
+        child = subprocess.Popen(
+            [sys.executable, '-c', 'import time; time.sleep(30)'], **kwds)
+        self.assertIn(child.pid, nose_timeout.descendants())
+        nose_timeout.kill_descendants()
+        self.assertNotEqual(child.wait(), 0)
+
+    def test_format(self):
+        self.assertEqual(nose_timeout._format_timeout(3725),
+                         "1 hour, 2 minutes, 5 seconds")
+        self.assertEqual(nose_timeout._format_timeout(1.5), "1.5 seconds")
+        self.assertEqual(str(nose_timeout.Timeout()), "Test exceeded timeout")
+
+
+if __name__ == "__main__":
+    unittest.main()
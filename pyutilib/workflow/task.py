@@ -14,6 +14,7 @@ __all__ = ['Task', 'EmptyTask', 'Component', 'Port', 'Ports', 'InputPorts',
 import argparse
 import pprint
 import weakref
+from pyutilib.common import trace
 from pyutilib.misc import Options
 from pyutilib.workflow import globals
 
@@ -121,9 +122,11 @@ class Task(object):
         Copy the inputs into this Task's dictionary, then execute the task, then copy
         the outputs out of the dictionary.
         """
-        self._call_init(*options, **kwds)
-        self.execute()
-        return self._call_fini(*options, **kwds)
+        with trace.span(self.name, 'workflow', id=self.id,
+                        type=type(self).__name__):
+            self._call_init(*options, **kwds)
+            self.execute()
+            return self._call_fini(*options, **kwds)
 
     def _call_init(self, *options, **kwds):
         self._call_start()